@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import datetime
+import tempfile
+import subprocess
+import tracemalloc
+
+from services.CheckCatalog import CheckCatalog
+from services.Reporter import reporter
+from services.PageBuilder import PageBuilder
+from services.Finding import Finding, FindingStatus
+import constants as _C
+
+## How reporting scales: synthetic findings for the real checks of a service (reporter.json),
+## spread over many regions, timed through reporter.process / getSummary / getDetails and
+## PageBuilder.buildPage, with the tracemalloc peak of each stage. Every run is appended to
+## RESULTS_FILE with the commit it ran on and compared with the last run of another commit.
+##   python3 -m benchmarks.reporting --sizes 1000 10000 --service iam
+SIZES = [1000, 10000, 100000, 1000000]
+REGIONS = [
+    'us-east-1', 'us-east-2', 'us-west-1', 'us-west-2', 'ca-central-1', 'sa-east-1',
+    'eu-west-1', 'eu-west-2', 'eu-west-3', 'eu-central-1', 'eu-north-1', 'ap-south-1',
+    'ap-southeast-1', 'ap-southeast-2', 'ap-northeast-1', 'ap-northeast-2'
+]
+STAGES = ['process', 'getSummary', 'getDetails', 'buildPage']
+RESULTS_FILE = _C.FORK_DIR + '/benchmarks.ndjson'
+
+## inline detail pages above this many resources are GBs of HTML, they are built chunked
+INLINE_MAX = 100000
+FAIL_RATE = 0.3
+
+## {region: {identifier: {check: Finding}}}, one region at a time so the input never sits in
+## memory whole; seeded, the same size gives the same findings on every run
+def generateFindings(checks, size, regions, seed=42):
+    rnd = random.Random(seed)
+    perRegion, extra = divmod(size, len(regions))
+    values = ['Off', 365, ['policyA', 'policyB'], {'MaxSessionDuration': 43200}]
+
+    for idx, region in enumerate(regions):
+        objs = {}
+        for i in range(perRegion + (1 if idx < extra else 0)):
+            results = {}
+            for check in checks:
+                if rnd.random() < FAIL_RATE:
+                    results[check] = Finding(check, FindingStatus.FAIL, values[i % len(values)])
+                else:
+                    results[check] = Finding(check, FindingStatus.PASS, 'On')
+            objs['{}-res-{:07d}'.format(region, i)] = results
+
+        yield region, objs
+
+class ReportingBenchmark:
+    def __init__(self, service, size, regions=REGIONS, detailMode=None, trackMemory=True):
+        self.service = service
+        self.size = size
+        self.regions = regions[:max(1, min(len(regions), size))]
+        self.detailMode = detailMode or ('inline' if size <= INLINE_MAX else 'chunked')
+        self.trackMemory = trackMemory
+        self.checks = sorted(CheckCatalog.load().getChecks(service))
+        self.stages = {}
+
+    ## seconds and peak bytes traced while fn runs
+    def stage(self, name, fn):
+        if self.trackMemory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+        t = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t
+
+        entry = self.stages.setdefault(name, {'seconds': 0.0, 'peakBytes': 0})
+        entry['seconds'] += elapsed
+        if self.trackMemory:
+            entry['peakBytes'] = max(entry['peakBytes'], tracemalloc.get_traced_memory()[1] - base)
+
+        return result
+
+    def run(self):
+        outputDir = tempfile.mkdtemp(prefix='screener-bench-')
+        if self.trackMemory:
+            tracemalloc.start()
+
+        try:
+            rep = reporter(self.service)
+            ## generating the input is not part of the measure
+            for region, objs in generateFindings(self.checks, self.size, self.regions):
+                self.stage('process', lambda: rep.process({region: objs}))
+                del objs
+
+            self.stage('getSummary', rep.getSummary)
+            self.stage('getDetails', rep.getDetails)
+
+            pb = PageBuilder(self.service, rep, {self.service: self.size}, self.regions)
+            pb.outputDir = outputDir
+            pb.detailMode = self.detailMode
+            self.stage('buildPage', pb.buildPage)
+
+            findings = len(rep.findings)
+            outputBytes = sum(os.path.getsize(os.path.join(root, name)) for root, dirs, files in os.walk(outputDir) for name in files)
+        finally:
+            if self.trackMemory:
+                tracemalloc.stop()
+            shutil.rmtree(outputDir, ignore_errors=True)
+
+        return {
+            'service': self.service,
+            'size': self.size,
+            'regions': len(self.regions),
+            'checks': len(self.checks),
+            'findings': findings,
+            'detailMode': self.detailMode,
+            'trackMemory': self.trackMemory,
+            'outputBytes': outputBytes,
+            'stages': self.stages
+        }
+
+## commit hash, with a + when the tree has local changes
+def gitRevision():
+    try:
+        rev = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+        dirty = subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'], stderr=subprocess.DEVNULL).decode().strip()
+        return rev + ('+' if dirty else '')
+    except Exception:
+        return 'unknown'
+
+def loadResults(path):
+    if not os.path.exists(path):
+        return []
+
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+## the latest earlier run of the same benchmark on another commit
+def findBaseline(results, current):
+    key = (current['service'], current['size'], current['detailMode'], current['trackMemory'])
+    for result in reversed(results):
+        if result['commit'] != current['commit'] and (result['service'], result['size'], result['detailMode'], result['trackMemory']) == key:
+            return result
+
+def report(result, baseline=None):
+    print("{} x {} resources, {} findings, {} regions, {} detail, output {:.1f} MB{}".format(
+        result['service'], result['size'], result['findings'], result['regions'], result['detailMode'], result['outputBytes'] / 1048576,
+        '' if baseline is None else ", vs " + baseline['commit']))
+
+    for name in STAGES:
+        entry = result['stages'].get(name)
+        if entry is None:
+            continue
+
+        line = "  {:<12}{:>10.3f}s{:>10.1f} MB".format(name, entry['seconds'], entry['peakBytes'] / 1048576)
+        previous = baseline['stages'].get(name) if baseline else None
+        if previous and previous['seconds'] > 0:
+            line += "{:>+9.1f}%".format((entry['seconds'] / previous['seconds'] - 1) * 100)
+        print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='Screener benchmarks', description='Time and memory of Reporter and PageBuilder on synthetic findings')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='--sizes 1000 10000, resources per run')
+    parser.add_argument('--service', default='iam', help='--service iam, checks come from its reporter.json')
+    parser.add_argument('--regions', type=int, default=len(REGIONS), help='--regions 16, resources are spread evenly')
+    parser.add_argument('--detail', default=None, choices=PageBuilder.DETAIL_MODES, help='detail mode of the page (default: inline up to {} resources)'.format(INLINE_MAX))
+    parser.add_argument('--no-memory', action='store_true', help='skip tracemalloc, timings are then closer to a real run')
+    parser.add_argument('--results', default=RESULTS_FILE, help='--results __fork/benchmarks.ndjson')
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    if not CheckCatalog.load().hasService(args.service):
+        raise SystemExit("No reporter.json for " + args.service)
+
+    history = loadResults(args.results)
+    common = {
+        'commit': gitRevision(),
+        'time': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': sys.platform
+    }
+
+    for size in args.sizes:
+        bench = ReportingBenchmark(args.service, size, REGIONS[:args.regions], detailMode=args.detail, trackMemory=not args.no_memory)
+        result = dict(common, **bench.run())
+        report(result, findBaseline(history, result))
+
+        if not args.no_save:
+            os.makedirs(os.path.dirname(args.results) or '.', exist_ok=True)
+            with open(args.results, 'a') as f:
+                f.write(json.dumps(result) + "\n")
+            history.append(result)
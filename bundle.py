@@ -0,0 +1,22 @@
+import os
+import argparse
+
+from utils.Config import Config
+from services.ReportBundle import ReportBundle
+import constants as _C
+
+## Shareable copy of a generated report, e.g. before copying it to S3:
+##   python3 bundle.py --output __fork/bundle && aws s3 sync __fork/bundle s3://bucket/report
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='Screener bundle', description='Self-contained, minified and precompressed copy of a generated report')
+    parser.add_argument('--input', default=Config.DIR_HTML, help='--input adminlte/html')
+    parser.add_argument('--output', default=_C.FORK_DIR + '/bundle', help='--output __fork/bundle')
+    parser.add_argument('--shared', action='store_true', help='pages share one bundle.css / bundle.js instead of inlining them')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.input):
+        raise SystemExit("Not found: " + args.input)
+
+    bundle = ReportBundle(args.input, args.output, inline=not args.shared).clean().build()
+    print("{} page(s), {} asset(s) bundled into {}, {} file(s), {:.1f} KB".format(
+        len(bundle.pages), bundle.stats['assets'], args.output, bundle.stats['files'], bundle.stats['bytes'] / 1024))
@@ -9,7 +9,10 @@ VENDOR_DIR = ROOT_DIR + '/vendor'
 HTML_FOLDER = 'adminlte/html'
 HTML_DIR = ROOT_DIR + '/' + HTML_FOLDER
 FORK_DIR = ROOT_DIR + '/__fork'
-API_JSON = FORK_DIR + '/api.json'
+API_JSON = FORK_DIR + '/api.ndjson'
+JOURNAL_FILE = FORK_DIR + '/journal.ndjson'
+FINDINGS_DB = FORK_DIR + '/findings.db'
+REPORT_MANIFEST = FORK_DIR + '/report-manifest.json'
 
 GENERAL_CONF_PATH = SERVICE_DIR + '/general.reporter.json'
 
@@ -1,44 +1,164 @@
+import os
+import importlib
+
 from utils.Config import Config
 from utils.ArguParser import ArguParser
+from utils.Journal import Journal
+from utils.TagIndex import TagIndex
+from utils.ApiWriter import ApiWriter
+from utils.FindingsDb import FindingsDb
+from services.CheckCatalog import CheckCatalog
+from services.PageBuilder import PageBuilder
 import constants as _C
 
-_cli_options = ArguParser.Load()
+## services/<service>/<Name>.py defining class <Name>, matched case insensitively
+## (services/dynamodb/DynamoDb.py), None for services not converted yet
+def getServiceClass(service):
+    folder = os.path.join(Config.DIR_SERVICE, service)
+    if not os.path.isdir(folder):
+        return None
+
+    for name in sorted(os.listdir(folder)):
+        stem, ext = os.path.splitext(name)
+        if ext == '.py' and stem.lower() == service:
+            return getattr(importlib.import_module('services.{}.{}'.format(service, stem)), stem, None)
+
+    return None
+
+## Everything runs under main(): ReportRenderer's worker processes re-import this module
+## (spawn start method, the default on macOS and Windows)
+def main():
+    _cli_options = ArguParser.Load()
+
+    debugFlag = _cli_options['debug']
+    # feedbackFlag = _cli_options['feedback']
+    testmode = _cli_options['test']
+    bucket = _cli_options['bucket']
+    runmode = _cli_options['mode']
+    filters = _cli_options['filters']
+    resumeFlag = _cli_options['resume']
+    compressFlag = _cli_options['compress']
+    databaseFlag = _cli_options['database']
+    detailMode = _cli_options['detail']
+    s3InventoryFlag = _cli_options['s3_inventory']
+    s3SampleFlag = _cli_options['s3_sample']
+
+    DEBUG = True if debugFlag in _C.CLI_TRUE_KEYWORD_ARRAY or debugFlag is True else False
+    # feedbackFlag = True if feedbackFlag in _C.CLI_TRUE_KEYWORD_ARRAY or feedbackFlag is True else False
+    testmode = True if testmode in _C.CLI_TRUE_KEYWORD_ARRAY or testmode is True else False
+    resumeFlag = True if resumeFlag in _C.CLI_TRUE_KEYWORD_ARRAY or resumeFlag is True else False
+    compressFlag = True if compressFlag in _C.CLI_TRUE_KEYWORD_ARRAY or compressFlag is True else False
+    databaseFlag = True if databaseFlag in _C.CLI_TRUE_KEYWORD_ARRAY or databaseFlag is True else False
+    s3InventoryFlag = True if s3InventoryFlag in _C.CLI_TRUE_KEYWORD_ARRAY or s3InventoryFlag is True else False
+    s3SampleFlag = True if s3SampleFlag in _C.CLI_TRUE_KEYWORD_ARRAY or s3SampleFlag is True else False
+
+    runmode = runmode if runmode in ['api-raw', 'api-full', 'report'] else 'report'
+    detailMode = detailMode if detailMode in PageBuilder.DETAIL_MODES else 'inline'
+
+    # <TODO>, yet to convert to python
+    # S3 upload specific variables 
+    # uploadToS3 = Uploader.getConfirmationToUploadToS3(bucket)
+
+    # <TODO> analyse the impact profile switching
+    profile = _cli_options['profile']
+    if profile:
+        global PHPSDK_CRED_PROFILE
+        PHPSDK_CRED_PROFILE = profile
+
+    _AWS_OPTIONS = {
+        'signature_version': Config.AWS_SDK['signature_version']
+    }
+
+    Config.init()
+    Config.set('_AWS_OPTIONS', _AWS_OPTIONS)
+    oo = Config.get('_AWS_OPTIONS')
+
+    ## --filters "env=prod,dev%team=core", compiled once and matched against the region tag index
+    Config.set('tagFilters', TagIndex.compileFilters(filters))
+
+    ## --s3-inventory / --s3-sample, read by services.s3.S3
+    Config.set('s3::inventoryReports', s3InventoryFlag)
+    Config.set('s3::sampleObjects', s3SampleFlag)
+
+    ## account id tags the api output (see merge.py), the findings database and the report's
+    ## change snapshots, and the journal (--resume never replays another account's results)
+    import boto3
+    try:
+        account = boto3.client('sts').get_caller_identity()['Account']
+    except Exception:
+        account = 'unknown'
+    Config.set('account', account)
+
+    ## Per-resource results are journaled as they complete, --resume picks up from there
+    journal = Journal(_C.JOURNAL_FILE, resume=resumeFlag, account=account)
+    Config.set('journal', journal)
+
+    ## Result sinks, fed by Service.recordResult as resources complete
+    resultSinks = []
+
+    ## api-raw / api-full stream findings to API_JSON
+    apiWriter = None
+    if runmode in ApiWriter.MODES:
+        catalog = CheckCatalog.load() if runmode == 'api-full' else None
+        apiWriter = ApiWriter(_C.API_JSON, mode=runmode, compress=compressFlag, catalog=catalog, account=account)
+        resultSinks.append(apiWriter)
+
+    ## --database, run history queried with query.py
+    findingsDb = None
+    if databaseFlag:
+        findingsDb = FindingsDb(_C.FINDINGS_DB, account=account, mode=runmode, catalog=CheckCatalog.load())
+        resultSinks.append(findingsDb)
+
+    Config.set('resultSinks', resultSinks)
+
+    ## one normalized list for the scan (journal keys) and the report, whatever the order or
+    ## spacing of --region, so --resume finds what an earlier run journaled
+    regions = tuple(sorted(set(region.strip() for region in _cli_options['region'].split(',') if region.strip())))
+    serviceNames = [service.strip().lower() for service in _cli_options['services'].split(',') if service.strip()]
 
-debugFlag = _cli_options['debug']
-# feedbackFlag = _cli_options['feedback']
-testmode = _cli_options['test']
-bucket = _cli_options['bucket']
-runmode = _cli_options['mode']
-filters = _cli_options['filters']
+    scanned = []
+    for service in serviceNames:
+        ServiceClass = getServiceClass(service)
+        if ServiceClass is None:
+            print("[Skipped] {} is not supported yet".format(service))
+            continue
 
-DEBUG = True if debugFlag in _C.CLI_TRUE_KEYWORD_ARRAY or debugFlag is True else False
-# feedbackFlag = True if feedbackFlag in _C.CLI_TRUE_KEYWORD_ARRAY or feedbackFlag is True else False
-testmode = True if testmode in _C.CLI_TRUE_KEYWORD_ARRAY or testmode is True else False
+        ## global services are scanned once, journaled under GLOBAL
+        for region in ['GLOBAL'] if service in Config.GLOBAL_SERVICES else regions:
+            o = ServiceClass(region)
+            o.advise()
+        scanned.append(service)
 
-runmode = runmode if runmode in ['api-raw', 'api-full', 'report'] else 'report'
+    ## Report stage reads back from the journal, covering resources finished by earlier (interrupted) runs
+    if runmode == 'report':
+        from services.Reporter import reporter
+        from services.ReportRenderer import ReportRenderer
 
-# <TODO>, yet to convert to python
-# S3 upload specific variables 
-# uploadToS3 = Uploader.getConfirmationToUploadToS3(bucket)
+        catalog = CheckCatalog.load()
+        serviceObjsByService = {service: journal.load(service) for service in scanned if catalog.hasService(service)}
+        services = {service: sum(len(objs) for objs in serviceObjs.values()) for service, serviceObjs in serviceObjsByService.items()}
 
-# <TODO> analyse the impact profile switching
-profile = _cli_options['profile']
-if profile:
-    global PHPSDK_CRED_PROFILE
-    PHPSDK_CRED_PROFILE = profile
+        ## service pages in worker processes, index.html from the merged dashboard
+        renderer = ReportRenderer(Config.DIR_HTML, services, list(regions), detailMode=detailMode)
+        for service, serviceObjs in serviceObjsByService.items():
+            ## "What changed" against this account's previous run
+            rep = reporter(service).process(serviceObjs).trackChanges(account)
+            rep.getSummary()
+            rep.getDetails()
+            renderer.add(rep)
 
-_AWS_OPTIONS = {
-    'signature_version': Config.AWS_SDK['signature_version']
-}
+        pages = renderer.render()
+        print("Report written to " + pages['index'] + (", unchanged: " + ", ".join(renderer.skipped) if renderer.skipped else ''))
 
-Config.init()
-Config.set('_AWS_OPTIONS', _AWS_OPTIONS)
-oo = Config.get('_AWS_OPTIONS')
+    journal.close()
 
-# print(_cli_options['region'])
+    if apiWriter is not None:
+        apiWriter.close()
+        print("API output written to " + apiWriter.path)
 
+    if findingsDb is not None:
+        findingsDb.close()
+        print("Findings saved to " + findingsDb.path + ", run #" + str(findingsDb.runId))
 
-import importlib.util
-ServiceClass = getattr(importlib.import_module('services.iam.Iam'), 'Iam')
-o = ServiceClass(_cli_options['region'])
-o.advise()
+if __name__ == "__main__":
+    main()
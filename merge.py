@@ -0,0 +1,32 @@
+import os
+import glob
+import argparse
+
+from utils.Config import Config
+from services.OrgReport import OrgReport, MAX_RESOURCES
+
+## One organization level report from many accounts' --mode api-raw|api-full outputs, e.g.
+##   python3 merge.py --output adminlte/html runs/*/api.ndjson.gz
+## Everything runs under __main__, worker processes re-import this module.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='Screener merge', description='Merge the api-raw / api-full outputs of many runs into one report')
+    parser.add_argument('inputs', nargs='+', help='api.ndjson[.gz] files, globs are expanded')
+    parser.add_argument('--output', default=Config.DIR_HTML, help='--output adminlte/html')
+    parser.add_argument('--workers', type=int, default=None, help='--workers 4, worker processes (default: min(4, cpu count))')
+    parser.add_argument('--max-resources', type=int, default=MAX_RESOURCES, help='affected resources listed per check, account and region')
+    parser.add_argument('--compress', action='store_true', help='write the service pages as .html.gz')
+    parser.add_argument('--full', action='store_true', help='rebuild every page, even those whose inputs did not change')
+    args = parser.parse_args()
+
+    paths = []
+    for pattern in args.inputs:
+        paths.extend(sorted(glob.glob(pattern)) or [pattern])
+
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        raise SystemExit("Not found: " + ", ".join(missing))
+
+    org = OrgReport(maxResources=args.max_resources)
+    org.collect(paths, workers=args.workers)
+    org.render(args.output, compress=args.compress, workers=args.workers, incremental=not args.full)
+    print("{} run(s), {} account(s) merged into {}".format(len(paths), len(org.accounts), args.output))
@@ -0,0 +1,33 @@
+import argparse
+
+from utils.FindingsDb import FindingsQuery
+import constants as _C
+
+## Findings of past runs saved with --database, e.g. all high criticality findings in Singapore:
+##   python3 query.py --criticality H --region ap-southeast-1
+parser = argparse.ArgumentParser(prog='Screener query', description='Query the findings saved by main.py --database true')
+parser.add_argument('--db', default=_C.FINDINGS_DB, help='--db __fork/findings.db')
+parser.add_argument('--run', type=int, default=None, help='--run 3, defaults to the latest completed run')
+parser.add_argument('--runs', action='store_true', help='list the recorded runs')
+parser.add_argument('--account', default=None)
+parser.add_argument('--region', default=None, help='--region ap-southeast-1')
+parser.add_argument('--service', default=None, help='--service iam')
+parser.add_argument('--check', default=None, help='--check unusedRole')
+parser.add_argument('--criticality', default=None, help='--criticality H|M|L|I')
+parser.add_argument('--category', default=None, help='--category S|R|O|P|C|T')
+parser.add_argument('--status', type=int, default=-1, help='--status -1 (failed, default)|1')
+parser.add_argument('--limit', type=int, default=None)
+args = vars(parser.parse_args())
+
+q = FindingsQuery(args['db'])
+if args['runs']:
+    for run in q.runs():
+        print("#{}\t{}\t{}\t{} -> {}".format(run['id'], run['account'], run['mode'], run['startTime'], run['endTime']))
+else:
+    filters = {name: args[name] for name in FindingsQuery.FILTERS}
+    rows = q.findings(filters, runId=args['run'], limit=args['limit'])
+    for row in rows:
+        print("\t".join(str(row[col]) for col in ['account', 'region', 'service', 'identifier', 'checkName', 'criticality', 'value']))
+    print("{} finding(s)".format(len(rows)))
+
+q.close()
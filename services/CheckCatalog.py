@@ -0,0 +1,219 @@
+import os
+import re
+import glob
+import json
+import pickle
+
+import constants as _C
+from utils.Config import Config
+from utils.Tools import _warn
+from utils.Template import Template
+
+## Every services/*/*reporter.json (plus general.reporter.json) loaded, validated and
+## precompiled once. Entries are stored in card form: category split into __categoryMain /
+## __categorySub and ref turned into __links, so reporters and PageBuilder only read them.
+## The compiled catalog is pickled under __fork and reused until a reporter.json changes.
+class CheckCatalog:
+    CACHE_KEY = 'checkCatalog'
+    CACHE_FILE = _C.FORK_DIR + '/check-catalog.pickle'
+    CACHE_VERSION = 2
+
+    REQUIRED_FIELDS = ['category', 'criticality', 'shortDesc', '^description']
+    VALID_CATEGORIES = ['R', 'S', 'O', 'P', 'C', 'T']
+    VALID_CRITICALITIES = ['H', 'M', 'L', 'I']
+    REF_PATTERN = re.compile(r'\[(.*)\]<(.*)>')
+    ## rendered by reporter._descriptionValues
+    DESCRIPTION_PLACEHOLDERS = ['COUNT', 'REGIONCOUNT', 'RESOURCES']
+
+    def __init__(self, serviceDir=Config.DIR_SERVICE, generalConf=Config.PATH_GENERAL_CONF, cacheFile=CACHE_FILE):
+        self.serviceDir = serviceDir
+        self.generalConf = generalConf
+        self.cacheFile = cacheFile
+        self.services = None
+        self.general = None
+        self.warnings = []
+
+    ## Shared instance for the run
+    @staticmethod
+    def load():
+        catalog = Config.get(CheckCatalog.CACHE_KEY, None)
+        if catalog is None:
+            catalog = CheckCatalog().build()
+            Config.set(CheckCatalog.CACHE_KEY, catalog)
+
+        return catalog
+
+    def build(self):
+        if self.services is not None:
+            return self
+
+        sources = self._sources()
+        if self._loadCache(sources):
+            return self
+
+        self.services = {}
+        self.warnings = []
+        for service, path in sources.items():
+            if path == self.generalConf:
+                continue
+
+            self.services[service] = self._compileFile(path)
+
+        self.general = self._compileFile(self.generalConf)
+        for msg in self.warnings:
+            _warn(msg)
+
+        self._saveCache(sources)
+        return self
+
+    def hasService(self, service):
+        return service in self.build().services
+
+    ## {check: entry} of the service, general checks included
+    def getChecks(self, service):
+        self.build()
+        return {**self.services.get(service, {}), **self.general}
+
+    def getCheck(self, service, check):
+        self.build()
+        entry = self.general.get(check)
+        if entry is None:
+            entry = self.services.get(service, {}).get(check)
+
+        return entry
+
+    ## {service: path}, the service name is its folder under services/
+    def _sources(self):
+        sources = {}
+        for path in sorted(glob.glob(self.serviceDir + '/*/*reporter.json')):
+            service = os.path.basename(os.path.dirname(path)).lower()
+            sources[service] = path
+
+        sources['_general'] = self.generalConf
+        return sources
+
+    def _compileFile(self, path):
+        name = os.path.relpath(path, os.path.dirname(self.serviceDir))
+        try:
+            with open(path) as f:
+                checks = json.load(f)
+        except (OSError, ValueError) as e:
+            self.warnings.append("{} could not be loaded: {}".format(name, e))
+            return {}
+
+        if not isinstance(checks, dict):
+            self.warnings.append("{} is not a JSON object".format(name))
+            return {}
+
+        compiled = {}
+        for check, attrs in checks.items():
+            compiled[check] = self._compileCheck(name, check, attrs)
+
+        return compiled
+
+    def _compileCheck(self, name, check, attrs):
+        entry = dict(attrs)
+
+        ## a few reporter.json still use the PHP era key
+        if '^description' not in entry and 'description' in entry:
+            entry['^description'] = entry.pop('description')
+
+        for field in self.REQUIRED_FIELDS:
+            if field not in entry:
+                self.warnings.append("{} <{}>::<{}> is missing".format(name, check, field))
+
+        desc = entry.get('^description')
+        if desc:
+            tpl = Template.compile(desc)
+            unknown = tpl.placeholders - set(self.DESCRIPTION_PLACEHOLDERS)
+            if unknown:
+                self.warnings.append("{} <{}> has unknown placeholders {}".format(name, check, sorted(unknown)))
+            if tpl.barePlaceholders:
+                self.warnings.append("{} <{}> has placeholders without $ {}, written as {{$NAME}}".format(name, check, sorted(tpl.barePlaceholders)))
+
+        criticality = entry.get('criticality')
+        if criticality is not None and criticality not in self.VALID_CRITICALITIES:
+            self.warnings.append("{} <{}> has invalid criticality <{}>".format(name, check, criticality))
+
+        category = entry.pop('category', None)
+        if category:
+            invalid = [c for c in category if c not in self.VALID_CATEGORIES]
+            if invalid:
+                self.warnings.append("{} <{}> has invalid category <{}>".format(name, check, category))
+
+            entry['__categoryMain'] = category[0]
+            if len(category) > 1:
+                entry['__categorySub'] = category[1:]
+
+        ref = entry.pop('ref', [])
+        if not isinstance(ref, list):
+            self.warnings.append("{} <{}>::<ref> is not a list".format(name, check))
+            ref = []
+
+        links = []
+        for link in ref:
+            output = self.REF_PATTERN.search(link)
+            if not output:
+                self.warnings.append("{} <{}> has invalid ref <{}>, expected [title]<url>".format(name, check, link))
+                continue
+
+            links.append("<a href='{}'>{}</a>".format(output.group(2), output.group(1)))
+
+        entry['__links'] = links
+        return entry
+
+    def _mtimes(self, sources):
+        mtimes = {}
+        for path in sources.values():
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+
+        return mtimes
+
+    def _loadCache(self, sources):
+        if not self.cacheFile or not os.path.exists(self.cacheFile):
+            return False
+
+        try:
+            with open(self.cacheFile, 'rb') as f:
+                cache = pickle.load(f)
+        except Exception:
+            return False
+
+        if cache.get('version') != self.CACHE_VERSION or cache.get('mtimes') != self._mtimes(sources):
+            return False
+
+        self.services = cache['services']
+        self.general = cache['general']
+        self.warnings = cache['warnings']
+        return True
+
+    def _saveCache(self, sources):
+        if not self.cacheFile:
+            return
+
+        cache = {
+            'version': self.CACHE_VERSION,
+            'mtimes': self._mtimes(sources),
+            'services': self.services,
+            'general': self.general,
+            'warnings': self.warnings
+        }
+
+        folder = os.path.dirname(self.cacheFile)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        ## parallel workers may rebuild at the same time, the rename keeps the file whole
+        tmpFile = "{}.{}".format(self.cacheFile, os.getpid())
+        with open(tmpFile, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpFile, self.cacheFile)
+
+if __name__ == "__main__":
+    catalog = CheckCatalog(cacheFile=None).build()
+    for service, checks in catalog.services.items():
+        print(service, len(checks))
+    print('general', len(catalog.general))
@@ -0,0 +1,72 @@
+from services.PageBuilder import PageBuilder
+
+## index.html, built by the parent once every service page is done, from the merged
+## utils.Dashboard counters only (no reporter needed)
+class DashboardPageBuilder(PageBuilder):
+    isHome = True
+
+    CRITICALITY_LABELS = {'H': 'High', 'M': 'Medium', 'L': 'Low', 'I': 'Informational'}
+    CATEGORY_LABELS = {'S': 'Security', 'R': 'Reliability', 'O': 'Operation Excellence', 'P': 'Performance Efficiency', 'C': 'Cost Optimization', 'T': 'Text'}
+
+    def __init__(self, services, regions, dashboard):
+        super().__init__('index', None, services, regions)
+        self.dashboard = dashboard
+
+    def init(self):
+        self.template = 'dashboard'
+
+    def getTemplateValues(self):
+        values = super().getTemplateValues()
+        values['SERVICE'] = 'Dashboard'
+        return values
+
+    def hashInputs(self, h):
+        self._hashUpdate(h, self.dashboard.toDict())
+
+    def buildContentSummary_dashboard(self):
+        output = []
+
+        criticality = self._totals(self.dashboard['CRITICALITY'], self.CRITICALITY_LABELS)
+        category = self._totals(self.dashboard['CATEGORY'], self.CATEGORY_LABELS)
+
+        items = [
+            [self.generateCard(self.getHtmlId('criticality'), self.generateDonutPieChart(criticality), cardClass='danger', title='Findings by criticality'), ''],
+            [self.generateCard(self.getHtmlId('category'), self.generateDonutPieChart(category), cardClass='info', title='Findings by category'), '']
+        ]
+        output.append(self.generateRowWithCol(size=6, items=items, rowHtmlAttr="data-context='dashboardChart'"))
+
+        card = self.generateCard(self.getHtmlId('services'), self.generateServiceTable(), cardClass='warning', title='Services', noPadding=True)
+        output.append(self.generateRowWithCol(size=12, items=[[card, '']], rowHtmlAttr="data-context='dashboardServices'"))
+
+        return output
+
+    def buildContentDetail_dashboard(self):
+        return []
+
+    def generateServiceTable(self):
+        output = []
+        output.append("<table class='table table-sm'><thead><tr>")
+        output.append("<th scope='col'>Service</th><th scope='col'>Regions</th><th scope='col'>Resources</th>")
+        for criticality in ['H', 'M', 'L', 'I']:
+            output.append("<th scope='col'>{}</th>".format(self.CRITICALITY_LABELS[criticality]))
+        output.append("</tr></thead><tbody>")
+
+        for service, regions in sorted(self.dashboard['SERV'].items()):
+            counts = self.dashboard['MAP'].get(service, {})
+            output.append("<tr><td><a href='{}.html'>{}</a></td><td>{}</td><td>{}</td>".format(service, service.upper(), len(regions), sum(r['Total'] for r in regions.values())))
+            for criticality in ['H', 'M', 'L', 'I']:
+                output.append("<td>{}</td>".format(counts.get(criticality, 0)))
+            output.append("</tr>")
+
+        output.append("</tbody></table>")
+        return "\n".join(output)
+
+    ## {region: {key: cnt}} summed over the regions, keyed by display label
+    def _totals(self, byRegion, labels):
+        totals = {}
+        for counts in byRegion.values():
+            for key, cnt in counts.items():
+                label = labels.get(key, key)
+                totals[label] = totals.get(label, 0) + cnt
+
+        return totals
@@ -1,4 +1,5 @@
 # from abc import ABC
+from services.Finding import Finding, FindingStatus
 
 class Evaluator():
     def __init__(self):
@@ -7,6 +8,10 @@ class Evaluator():
         
     def init(self):
         self.classname = type(self).__name__
+    
+    ## value is plain data (str, number, list, dict), never HTML
+    def addFinding(self, check, value, status=FindingStatus.FAIL):
+        self.results[check] = Finding(check, status, value)
         
     def run(self):
         # global CONFIG
@@ -0,0 +1,66 @@
+import re
+import json
+
+## Precomputed filters for the summary cards of a page, in card order: one bitset (list of
+## 32 bit words) per category, criticality and for low hanging fruits, the card of each
+## check, and an inverted index from resource name tokens to cards. The page JS intersects
+## bitsets instead of running attribute selectors over every card.
+class FilterIndex:
+    TOKEN_PATTERN = re.compile(r'[^0-9a-z]+')
+
+    def __init__(self):
+        self.checks = []
+        self.category = {}
+        self.criticality = {}
+        self.lhf = []
+        self.postings = {}
+
+    ## in the same order as the cards are written
+    def add(self, check, category, criticality, lhf=False, resources=[]):
+        pos = len(self.checks)
+        self.checks.append(check)
+        self.category.setdefault(category, []).append(pos)
+        self.criticality.setdefault(criticality, []).append(pos)
+        if lhf:
+            self.lhf.append(pos)
+
+        for identifier in resources:
+            for token in self.tokenize(identifier):
+                cards = self.postings.setdefault(token, [])
+                if not cards or cards[-1] != pos:
+                    cards.append(pos)
+
+        return pos
+
+    @staticmethod
+    def tokenize(text):
+        return set(token for token in FilterIndex.TOKEN_PATTERN.split(text.lower()) if token)
+
+    def bitset(self, positions):
+        words = [0] * ((len(self.checks) + 31) // 32 or 1)
+        for pos in positions:
+            words[pos >> 5] |= 1 << (pos & 31)
+
+        return words
+
+    def toDict(self, withResources=True):
+        data = {
+            'checks': self.checks,
+            'category': {key: self.bitset(positions) for key, positions in self.category.items()},
+            'criticality': {key: self.bitset(positions) for key, positions in self.criticality.items()},
+            'lhf': self.bitset(self.lhf)
+        }
+        if withResources:
+            data['resources'] = self.resourcesToDict()
+
+        return data
+
+    ## tokens sorted for prefix search (binary search on the client), postings are card positions
+    def resourcesToDict(self):
+        tokens = sorted(self.postings)
+        return {'tokens': tokens, 'postings': [self.postings[token] for token in tokens]}
+
+    ## safe inside <script>
+    @staticmethod
+    def dumps(data):
+        return json.dumps(data, separators=(',', ':')).replace('</', '<\\/')
@@ -0,0 +1,38 @@
+from enum import IntEnum
+
+class FindingStatus(IntEnum):
+    FAIL = -1
+    INFO = 0
+    PASS = 1
+
+## One check result of one resource. The value is plain data (str, number, list or dict),
+## presentation is left to the output: PageBuilder renders HTML, the API modes dump JSON.
+## Indexing keeps the historical [status, value] form working: finding[0], finding[1].
+class Finding:
+    __slots__ = ('check', 'status', 'value')
+
+    def __init__(self, check, status, value):
+        self.check = check
+        self.status = status
+        self.value = value
+
+    def __getitem__(self, i):
+        if i == 0:
+            return self.status
+        if i == 1:
+            return self.value
+        raise IndexError(i)
+
+    def __len__(self):
+        return 2
+
+    def __repr__(self):
+        return "Finding({!r}, {}, {!r})".format(self.check, self.status.name, self.value)
+
+    def toJSON(self):
+        return [int(self.status), self.value]
+
+if __name__ == "__main__":
+    import json
+    f = Finding('InlinePolicy', FindingStatus.FAIL, ['policyA', 'policyB'])
+    print(f, f[0], f[1], json.dumps({'InlinePolicy': f.toJSON()}))
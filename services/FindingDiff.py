@@ -0,0 +1,145 @@
+import os
+import json
+import pickle
+import hashlib
+import itertools
+from array import array
+
+## Stable 64 bit fingerprint, same input gives the same hash across runs and processes
+def fingerprint(*parts):
+    data = '\x1f'.join(parts).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little', signed=True)
+
+## Failed findings of one run reduced to two hash columns plus the interned labels needed to
+## show them again: hashes covers (account, region, resource, check, value), keys leaves the
+## value out so a finding whose value changed can be told apart from a new one.
+class FindingSnapshot:
+    VERSION = 1
+
+    def __init__(self, account=''):
+        self.account = account
+        self.hashes = array('q')
+        self.keys = array('q')
+        self.region = array('i')
+        self.resource = array('i')
+        self.check = array('i')
+        self.strings = {'region': [], 'resource': [], 'check': []}
+
+    ## from a reporter's services.FindingStore
+    @staticmethod
+    def fromStore(store, account=''):
+        snapshot = FindingSnapshot(account)
+        for name in ['region', 'resource', 'check']:
+            getattr(snapshot, name).extend(store.columns[name])
+            snapshot.strings[name] = list(store.tables[name].strings)
+
+        for (region, resource, check), value in zip(store.iter('region', 'resource', 'check'), store.values):
+            if not isinstance(value, str):
+                value = json.dumps(value, sort_keys=True, default=str)
+
+            snapshot.keys.append(fingerprint(account, region, resource, check))
+            snapshot.hashes.append(fingerprint(account, region, resource, check, value))
+
+        return snapshot
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def label(self, row):
+        return [self.strings['region'][self.region[row]], self.strings['resource'][self.resource[row]], self.strings['check'][self.check[row]]]
+
+    def checkOf(self, row):
+        return self.strings['check'][self.check[row]]
+
+    def save(self, path):
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        tmpFile = "{}.{}".format(path, os.getpid())
+        with open(tmpFile, 'wb') as f:
+            pickle.dump({'version': self.VERSION, 'snapshot': self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpFile, path)
+
+    @staticmethod
+    def load(path):
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception:
+            return None
+
+        if data.get('version') != FindingSnapshot.VERSION:
+            return None
+
+        return data['snapshot']
+
+## added / removed / persisted between two snapshots, computed with set operations on the
+## hash columns. A removed and an added row sharing the same key is reported as changed.
+class FindingDiff:
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+
+        oldHashes = set(old.hashes)
+        newHashes = set(new.hashes)
+        addedHashes = newHashes - oldHashes
+        removedHashes = oldHashes - newHashes
+
+        self.persisted = len(newHashes) - len(addedHashes)
+        self.added = self._rows(new, addedHashes)
+        self.removed = self._rows(old, removedHashes)
+
+        changedKeys = set(new.keys[row] for row in self.added) & set(old.keys[row] for row in self.removed)
+        self.changed = [row for row in self.added if new.keys[row] in changedKeys]
+        self.added = [row for row in self.added if new.keys[row] not in changedKeys]
+        self.removed = [row for row in self.removed if old.keys[row] not in changedKeys]
+
+    ## row positions of the given hashes, the scan is skipped when nothing changed
+    @staticmethod
+    def _rows(snapshot, hashes):
+        if not hashes:
+            return []
+
+        return list(itertools.compress(range(len(snapshot.hashes)), map(hashes.__contains__, snapshot.hashes)))
+
+    def hasChanges(self):
+        return len(self.added) + len(self.removed) + len(self.changed) > 0
+
+    ## {check: {'added': n, 'removed': n, 'changed': n}}
+    def summaryByCheck(self):
+        summary = {}
+        for name, snapshot, rows in [['added', self.new, self.added], ['removed', self.old, self.removed], ['changed', self.new, self.changed]]:
+            for row in rows:
+                counts = summary.setdefault(snapshot.checkOf(row), {'added': 0, 'removed': 0, 'changed': 0})
+                counts[name] += 1
+
+        return summary
+
+    def toDict(self):
+        return {
+            'added': [self.new.label(row) for row in self.added],
+            'removed': [self.old.label(row) for row in self.removed],
+            'changed': [self.new.label(row) for row in self.changed],
+            'persisted': self.persisted
+        }
+
+if __name__ == "__main__":
+    import time
+    from services.FindingStore import FindingStore
+
+    ## 500k findings, 0.1% with a new value and 500 resources replaced
+    stores = [FindingStore(), FindingStore()]
+    for ind, store in enumerate(stores):
+        for i in range(250000):
+            store.add('ap-southeast-1', 'Role::r' + str(i + ind * 500), 'unusedRole', -1, str(ind if i % 500 == 0 else 0) + ' days')
+            store.add('ap-southeast-1', 'Role::r' + str(i + ind * 500), 'roleLongSession', -1, 3600)
+
+    old, new = [FindingSnapshot.fromStore(store, '123456789012') for store in stores]
+    t = time.time()
+    diff = FindingDiff(old, new)
+    print("diff of {} vs {} findings in {:.3f}s".format(len(old), len(new), time.time() - t))
+    print(diff.summaryByCheck(), diff.persisted)
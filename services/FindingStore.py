@@ -0,0 +1,163 @@
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+
+## Each distinct string stored once, rows refer to it by position
+class StringTable:
+    __slots__ = ('ids', 'strings')
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def intern(self, s):
+        i = self.ids.get(s)
+        if i is None:
+            i = self.ids[s] = len(self.strings)
+            self.strings.append(s)
+
+        return i
+
+    def lookup(self, s):
+        return self.ids.get(s)
+
+    def __getitem__(self, i):
+        return self.strings[i]
+
+    def __len__(self):
+        return len(self.strings)
+
+## Findings kept column by column: region, resource and check are integer codes into their
+## string table, status is a byte, the value payloads live in a side list. A row costs a few
+## bytes in the arrays whatever the length of the strings it refers to.
+class FindingStore:
+    COLUMNS = ['region', 'resource', 'check']
+
+    def __init__(self):
+        self.tables = {name: StringTable() for name in self.COLUMNS}
+        self.columns = {name: array('i') for name in self.COLUMNS}
+        self.status = array('b')
+        self.values = []
+
+    def add(self, region, resource, check, status, value):
+        self.columns['region'].append(self.tables['region'].intern(region))
+        self.columns['resource'].append(self.tables['resource'].intern(resource))
+        self.columns['check'].append(self.tables['check'].intern(check))
+        self.status.append(status)
+        self.values.append(value)
+
+    ## results: {check: [status, value]} as produced by the evaluators
+    def addResults(self, region, resource, results, status=None):
+        regionId = self.tables['region'].intern(region)
+        resourceId = self.tables['resource'].intern(resource)
+        checks = self.tables['check']
+        for check, info in results.items():
+            if status is not None and info[0] != status:
+                continue
+
+            self.columns['region'].append(regionId)
+            self.columns['resource'].append(resourceId)
+            self.columns['check'].append(checks.intern(check))
+            self.status.append(info[0])
+            self.values.append(info[1])
+
+    def __len__(self):
+        return len(self.status)
+
+    ## {(str, ...): count} over the given columns, counted on the integer codes
+    def groupBy(self, *names):
+        counts = Counter(zip(*[self.columns[name] for name in names]))
+        tables = [self.tables[name] for name in names]
+
+        result = {}
+        for key, cnt in counts.items():
+            result[tuple(table[i] for table, i in zip(tables, key))] = cnt
+
+        return result
+
+    ## decoded rows of the given columns, in insertion order
+    def iter(self, *names):
+        strings = [self.tables[name].strings for name in names]
+        for key in zip(*[self.columns[name] for name in names]):
+            yield tuple(table[i] for table, i in zip(strings, key))
+
+    ## region -> resource -> {check: value}, built on demand from the row positions
+    def view(self, decorate=None):
+        return FindingView(self, decorate)
+
+## Read-only mapping over the store, rows are only decoded when a resource is accessed.
+## decorate(check, value) can wrap the value, e.g. with the check metadata.
+class FindingView(Mapping):
+    def __init__(self, store, decorate=None):
+        self.store = store
+        self.decorate = decorate
+        self._index = None
+
+    def _buildIndex(self):
+        if self._index is None:
+            index = {}
+            columns = self.store.columns
+            for row, key in enumerate(zip(columns['region'], columns['resource'])):
+                index.setdefault(key[0], {}).setdefault(key[1], []).append(row)
+
+            self._index = index
+
+        return self._index
+
+    def __getitem__(self, region):
+        regionId = self.store.tables['region'].lookup(region)
+        if regionId is None or regionId not in self._buildIndex():
+            raise KeyError(region)
+
+        return RegionView(self, self._index[regionId])
+
+    def __iter__(self):
+        regions = self.store.tables['region']
+        for regionId in self._buildIndex():
+            yield regions[regionId]
+
+    def __len__(self):
+        return len(self._buildIndex())
+
+    def resource(self, rows):
+        store = self.store
+        checks = store.tables['check']
+        checkColumn = store.columns['check']
+
+        result = {}
+        for row in rows:
+            check = checks[checkColumn[row]]
+            value = store.values[row]
+            result[check] = value if self.decorate is None else self.decorate(check, value)
+
+        return result
+
+    def toDict(self):
+        return {region: dict(resources.items()) for region, resources in self.items()}
+
+class RegionView(Mapping):
+    def __init__(self, view, rowsByResource):
+        self.view = view
+        self.rowsByResource = rowsByResource
+
+    def __getitem__(self, resource):
+        resourceId = self.view.store.tables['resource'].lookup(resource)
+        if resourceId is None or resourceId not in self.rowsByResource:
+            raise KeyError(resource)
+
+        return self.view.resource(self.rowsByResource[resourceId])
+
+    def __iter__(self):
+        resources = self.view.store.tables['resource']
+        for resourceId in self.rowsByResource:
+            yield resources[resourceId]
+
+    def __len__(self):
+        return len(self.rowsByResource)
+
+if __name__ == "__main__":
+    store = FindingStore()
+    store.addResults('ap-southeast-1', 'Role::admin', {'rootMfa': [-1, 'Off'], 'unusedRole': [-1, 120]})
+    store.addResults('ap-southeast-1', 'Role::ops', {'unusedRole': [-1, 95], 'passed': [1, 'On']}, status=-1)
+    print(store.groupBy('region', 'check'))
+    print(store.view().toDict())
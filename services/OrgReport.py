@@ -0,0 +1,189 @@
+import os
+import json
+import html
+import gzip
+import functools
+from multiprocessing import Pool
+
+from utils.Dashboard import Dashboard
+from utils.Template import Template
+from services.CheckCatalog import CheckCatalog
+from services.Reporter import reporter
+import constants as _C
+
+## Organization level report from many runs' api-raw / api-full outputs (utils.ApiWriter).
+## Map: one worker process per NDJSON file streams it through a reporter and returns a small
+## partial (dashboard counters, per check counts and a capped list of affected resources).
+## Reduce: the parent folds the partials as they arrive, so memory is bounded by the number
+## of distinct checks x accounts x MAX_RESOURCES, not by the size of the inputs.
+MAX_RESOURCES = 50
+
+def summarizeFile(path, maxResources=MAX_RESOURCES):
+    catalog = CheckCatalog.load()
+    reporters = {}
+    resources = {}
+    account = None
+    endTime = None
+
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            ## a scan still running may have a partially written last line
+            if not line.endswith("\n"):
+                break
+
+            entry = json.loads(line)
+            if entry.get('_summary'):
+                account = entry.get('account')
+                endTime = entry.get('endTime')
+                continue
+
+            service = entry['service']
+            rep = reporters.get(service)
+            if rep is None:
+                if not catalog.hasService(service):
+                    continue
+                rep = reporters[service] = reporter(service)
+
+            region = entry['region']
+            resources.setdefault((service, region), set()).add(entry['resource'])
+            if entry['status'] == -1:
+                rep.findings.add(region, entry['resource'], entry['check'], -1, entry['value'])
+
+    ## runs without an account in the summary are told apart by their folder name
+    account = account or os.path.basename(os.path.dirname(os.path.abspath(path)))
+
+    for (service, region), identifiers in resources.items():
+        reporters[service].regionTotal[region] = len(identifiers)
+
+    dashboard = Dashboard()
+    checks = {}
+    for service, rep in reporters.items():
+        rep.getSummary()
+        dashboard.merge(rep.getDashboard())
+
+        for check, card in rep.getCard().items():
+            affected = {}
+            count = 0
+            for region, identifiers in card['__affectedResources'].items():
+                affected[account + '/' + region] = identifiers[:maxResources]
+                count += len(identifiers)
+
+            checks.setdefault(service, {})[check] = {'count': count, 'resources': affected}
+
+    return {'account': account, 'endTime': endTime, 'dashboard': dashboard.toDict(), 'checks': checks}
+
+## Reporter look-alike for PageBuilder, cards only: resource details stay in the account reports
+class OrgServiceReport:
+    def __init__(self, service, cardSummary):
+        self.service = service
+        self.cardSummary = cardSummary
+        self.diff = None
+
+    def getCard(self):
+        return self.cardSummary
+
+    def getDetail(self):
+        return {}
+
+class OrgReport:
+    def __init__(self, maxResources=MAX_RESOURCES):
+        self.maxResources = maxResources
+        self.accounts = []
+        self.dashboard = Dashboard()
+        ## {service: {check: {'count': n, 'resources': {account/region: [identifiers]}}}}
+        self.checks = {}
+        ## {account: partial}, the run kept for each account
+        self.partials = {}
+
+    ## An account scanned more than once counts once: the run with the latest _summary.endTime
+    ## is kept (a run cut short has none and loses), the totals are refolded when it replaces one
+    def merge(self, partial):
+        account = partial['account']
+        previous = self.partials.get(account)
+        if previous is not None:
+            if (partial.get('endTime') or '') <= (previous.get('endTime') or ''):
+                print("[OrgReport] {}: run ended {} ignored, keeping the one ended {}".format(account, partial.get('endTime'), previous.get('endTime')))
+                return self
+
+            print("[OrgReport] {}: run ended {} replaced by the one ended {}".format(account, previous.get('endTime'), partial.get('endTime')))
+            self.partials[account] = partial
+            self.accounts = []
+            self.dashboard = Dashboard()
+            self.checks = {}
+            for kept in self.partials.values():
+                self._fold(kept)
+            return self
+
+        self.partials[account] = partial
+        self._fold(partial)
+        return self
+
+    def _fold(self, partial):
+        self.accounts.append(partial['account'])
+        self.dashboard.merge(partial['dashboard'])
+
+        for service, checks in partial['checks'].items():
+            target = self.checks.setdefault(service, {})
+            for check, info in checks.items():
+                merged = target.setdefault(check, {'count': 0, 'resources': {}})
+                merged['count'] += info['count']
+                merged['resources'].update(info['resources'])
+
+    ## map-reduce over the files, partials are merged in completion order
+    def collect(self, paths, workers=None):
+        workers = workers or min(4, os.cpu_count() or 1)
+        if workers == 1 or len(paths) == 1:
+            for path in paths:
+                self.merge(summarizeFile(path, self.maxResources))
+            return self
+
+        with Pool(processes=workers, maxtasksperchild=10) as pool:
+            for partial in pool.imap_unordered(functools.partial(summarizeFile, maxResources=self.maxResources), paths):
+                self.merge(partial)
+
+        return self
+
+    def getServiceReport(self, service):
+        catalog = CheckCatalog.load()
+        cards = {}
+        for check, info in self.checks.get(service, {}).items():
+            entry = catalog.getCheck(service, check)
+            if entry is None:
+                continue
+
+            card = cards[check] = dict(entry)
+            card['__affectedResources'] = info['resources']
+
+            desc = card.get('^description')
+            if desc:
+                shown = [identifier for identifiers in info['resources'].values() for identifier in identifiers][:self.maxResources]
+                card['^description'] = Template.compile(desc).render({
+                    'COUNT': "<strong><u>{}</u></strong>".format(info['count']),
+                    'REGIONCOUNT': len(info['resources']),
+                    'RESOURCES': ', '.join(html.escape(str(identifier)) for identifier in shown)
+                })
+
+        return OrgServiceReport(service, cards)
+
+    ## one worker per service page, index.html from the merged dashboard, see ReportRenderer
+    ## incremental: keep the pages whose inputs did not change since the last render
+    def render(self, outputDir, compress=False, workers=None, incremental=True):
+        from services.ReportRenderer import ReportRenderer
+
+        services = {}
+        for service, regions in self.dashboard['SERV'].items():
+            services[service] = sum(counts['Total'] for counts in regions.values())
+
+        renderer = ReportRenderer(outputDir, services, [], compress=compress, workers=workers, manifestFile=_C.REPORT_MANIFEST if incremental else None)
+        for service in self.checks:
+            report = self.getServiceReport(service)
+            regions = sorted(set(key for card in report.cardSummary.values() for key in card['__affectedResources']))
+            renderer.add(report, regions)
+
+        renderer.render(self.dashboard)
+
+        with open(os.path.join(outputDir, 'org-dashboard.json'), 'w') as f:
+            json.dump({'accounts': self.accounts, 'dashboard': self.dashboard.toDict()}, f)
+
+        return self
@@ -1,10 +1,19 @@
 import uuid
 import random
 import os
+import io
 import json
+import gzip
+import html
+import shutil
+import hashlib
+import inspect
 
 from utils.Config import Config
 from utils.Tools import _warn
+from utils.Template import Template
+from services.CheckCatalog import CheckCatalog
+from services.FilterIndex import FilterIndex
 
 class PageBuilder:
     serviceIcon = {
@@ -28,11 +37,33 @@ class PageBuilder:
 
     isHome = False
 
+    WRITE_BUFFER = 1 << 16
+
+    ## inline: one HTML card per resource; chunked: per region data/<service>/<region>-<n>.js
+    ## files rendered by the browser on demand, see buildContentDetail_chunked
+    DETAIL_MODES = ['inline', 'chunked']
+    DETAIL_CHUNK_ROWS = 1000
+    DETAIL_ROW_HEIGHT = 32
+    SUMMARY_MAX_RESOURCES = 20
+
+    ## {key: utils.Template}, see renderTemplate
+    templateCache = {}
+
+    ## {builder class: hash of its sources and templates}, see getBuildVersion
+    buildVersions = {}
+
     def __init__(self, service, reporter, services, regions):
         self.service = service
         self.services = services
         self.regions = regions
         self.reporter = reporter
+        self.checks = CheckCatalog.load().getChecks(service)
+        self.outputDir = Config.DIR_HTML
+        self.templateValues = None
+        self.compress = False
+        self.detailMode = 'inline'
+        ## files written next to the page (data/<service>/...), see ReportManifest
+        self.dataFiles = []
 
         self.idPrefix = self.service + '-'
 
@@ -45,24 +76,86 @@ class PageBuilder:
         el = el or o[0:11]
         return self.idPrefix + el
 
+    ## Sections are lists or generators of chunks, written one by one as they come so the
+    ## page never sits in memory as a whole; the footer goes last as it carries the JS the
+    ## other sections registered with addJS()
     def buildPage(self):
         self.init()
 
-        output = []
-        output.append(self.buildHeader())
-        output.append(self.buildNav())
-        output.append(self.buildBreadcrumb())
-        output.append(self.buildContentSummary())
-        output.append(self.buildContentDetail())
-        output.append(self.buildFooter())
-
-        finalHTML = ""
-        for arrayOfText in output:
-            if arrayOfText:
-                finalHTML += "\n".join(arrayOfText)
-
-        with open(Config.DIR_HTML + '/' + self.service + '.html', 'w') as f:
-            f.write(finalHTML)
+        ## chunks of an earlier build would outlive a smaller one
+        self.dataFiles = []
+        shutil.rmtree(self.getDataDir(), ignore_errors=True)
+
+        path = self.getPagePath()
+        with self._openPage(path) as f:
+            for build in [self.buildHeader, self.buildNav, self.buildBreadcrumb, self.buildContentSummary, self.buildContentDetail, self.buildFooter]:
+                chunks = build()
+                if not chunks:
+                    continue
+
+                sep = ''
+                for chunk in chunks:
+                    f.write(sep)
+                    f.write(chunk)
+                    sep = "\n"
+
+        return path
+
+    ## Hash of everything the page is built from: the reporter's findings and cards, the page
+    ## options, the check catalog entries and getBuildVersion(). Ids in the HTML are random, so
+    ## the inputs are hashed rather than the output. See ReportRenderer / ReportManifest.
+    def getInputHash(self):
+        h = hashlib.blake2b(digest_size=16)
+        for part in [self.getBuildVersion(), self.service, self.services, self.regions, self.compress, self.detailMode, self.checks]:
+            self._hashUpdate(h, part)
+
+        self.hashInputs(h)
+        return h.hexdigest()
+
+    ## reporter side, services.ReportRenderer.ReporterSnapshot hashes its columns directly
+    def hashInputs(self, h):
+        if hasattr(self.reporter, 'digest'):
+            self.reporter.digest(h)
+        else:
+            self._hashUpdate(h, [self.reporter.getCard(), self.reporter.getDetail(), self.reporter.diff.toDict() if self.reporter.diff else None])
+
+    ## templates, the page builder sources and the project version, once per process
+    def getBuildVersion(self):
+        cls = self.__class__
+        version = PageBuilder.buildVersions.get(cls)
+        if version is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(Config.ADVISOR['VERSION'].encode('utf-8'))
+
+            paths = [self._getTemplateByKey(key) for key in sorted(self.pageTemplate)]
+            paths += sorted(set(inspect.getsourcefile(klass) for klass in cls.__mro__ if klass is not object) | {inspect.getsourcefile(FilterIndex)})
+            for path in paths:
+                with open(path, 'rb') as f:
+                    h.update(f.read())
+
+            version = PageBuilder.buildVersions[cls] = h.hexdigest()
+
+        return version
+
+    @staticmethod
+    def _hashUpdate(h, part):
+        h.update(json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+        h.update(b'\x1f')
+
+    def getPagePath(self):
+        return self.outputDir + '/' + self.service + '.html' + ('.gz' if self.compress else '')
+
+    def getDataDir(self):
+        return self.outputDir + '/data/' + self.service
+
+    ## chunks are small, they are gathered in a WRITE_BUFFER sized buffer before reaching the
+    ## disk (or the compressor, which is slow with many tiny writes)
+    def _openPage(self, path):
+        if not self.compress:
+            return open(path, 'w', encoding='utf-8', buffering=self.WRITE_BUFFER)
+
+        gz = gzip.GzipFile(path, 'wb')
+        return io.TextIOWrapper(io.BufferedWriter(gz, self.WRITE_BUFFER), encoding='utf-8')
     
     def init(self):
         self.template = 'default'
@@ -84,18 +177,19 @@ class PageBuilder:
             print("[{}] Template for ContentDetail not found: {}".format(cls, method))
             
     def generateRowWithCol(self, size=12, items=[], rowHtmlAttr=''):
-        output = []
-        output.append("<div class='row' {}>".format(rowHtmlAttr))
+        return "\n".join(self.iterRowWithCol(size, items, rowHtmlAttr))
+    
+    ## generateRowWithCol one column at a time, items can be a generator
+    def iterRowWithCol(self, size=12, items=[], rowHtmlAttr=''):
+        yield "<div class='row' {}>".format(rowHtmlAttr)
 
         _size = size
         for ind, item in enumerate(items):
             if isinstance(size, list):
                 i = ind % len(size)
                 _size = size[i]
-            output.append(self.generateCol(_size, item))
-        output.append("</div>")
-
-        return "\n".join(output)
+            yield self.generateCol(_size, item)
+        yield "</div>"
         
     def generateCol(self, size=12, item=[]):
         output = []
@@ -172,8 +266,14 @@ class PageBuilder:
         for region, resource in resources.items():
             items = []
             resHtml.append(f"<dd>{region}: ")
-            for identifier in resource:
-                items.append(f"<a href='#{self.service}-{identifier}'>{identifier}</a>")
+            if self.detailMode == 'chunked':
+                ## no detail card to link to, and the list would grow with the account
+                items = [html.escape(identifier) for identifier in resource[:self.SUMMARY_MAX_RESOURCES]]
+                if len(resource) > self.SUMMARY_MAX_RESOURCES:
+                    items.append("and {} more".format(len(resource) - self.SUMMARY_MAX_RESOURCES))
+            else:
+                for identifier in resource:
+                    items.append(f"<a href='#{self.service}-{identifier}'>{identifier}</a>")
             resHtml.append(" | ".join(items))
             resHtml.append("</dd>")
 
@@ -191,14 +291,14 @@ class PageBuilder:
         return "\n".join(output)
         
     def generateDonutPieChart(self, datasets, idPrefix='', typ='doughnut'):
-        htmlId = idPrefix + typ + str(uuid.uuid1(self.__class__))
+        htmlId = idPrefix + typ + str(uuid.uuid1())
         output = []
         output.append("<div class='chart'><canvas id='{}' style='min-height: 250px; height: 250px; max-height: 250px; max-width: 100%;'></canvas>\</div>".format(htmlId))
 
         labels, enriched = self._enrichDonutPieData(datasets)
 
         self.addJS("var donutPieChartCanvas = $('#{}').get(0).getContext('2d'); var donutPieData = {{labels: {},datasets: [{}]}}".format(htmlId, json.dumps(labels), json.dumps(enriched)))
-        self.addJS("var donutPieOptions= {{maintainAspectRatio : false,responsive : true}}; new Chart(donutPieChartCanvas, {{type: '{}', data: donutPieData, options: donutPieOptions}})".format(type))
+        self.addJS("var donutPieOptions= {{maintainAspectRatio : false,responsive : true}}; new Chart(donutPieChartCanvas, {{type: '{}', data: donutPieData, options: donutPieOptions}})".format(typ))
 
         return '\n'.join(output)
         
@@ -330,7 +430,8 @@ class PageBuilder:
     def generateTable(self, resource):
         output = []
         for check, attr in resource.items():
-            criticality = attr['criticality']
+            meta = self.checks.get(check, attr)
+            criticality = meta.get('criticality')
             checkPrefix = ''
             if criticality == 'H':
                 checkPrefix = "<i style='color: #dc3545' class='icon fas fa-ban'></i> "
@@ -339,12 +440,22 @@ class PageBuilder:
 
             output.append("<tr>")
             output.append("<td>{}{}</td>".format(checkPrefix, check))
-            output.append("<td>{}</td>".format(attr['value']))
-            output.append("<td>{}</td>".format(attr['shortDesc']))
+            output.append("<td>{}</td>".format(self.renderValue(attr['value'])))
+            output.append("<td>{}</td>".format(meta.get('shortDesc')))
             output.append("</tr>")
 
         return "\n".join(output)
         
+    ## Finding values are plain data, the HTML is only produced here
+    def renderValue(self, value, sep='<br>'):
+        if isinstance(value, dict):
+            value = ["{}={}".format(k, v) for k, v in value.items()]
+        
+        if isinstance(value, list):
+            return sep.join(html.escape(str(v)) for v in value)
+        
+        return html.escape(str(value))
+        
     def _getTemplateByKey(self, key):
         path = Config.DIR_TEMPLATE + '/' + self.pageTemplate[key]
         
@@ -355,41 +466,47 @@ class PageBuilder:
             ## <TODO>
             # debug_print_backtrace()
     
+    ## {$NAME} values available to every template
+    def getTemplateValues(self):
+        return {
+            'ADVISOR_TITLE': Config.ADVISOR['TITLE'],
+            'PROJECT_TITLE': Config.ADVISOR['TITLE'],
+            'PROJECT_VERSION': Config.ADVISOR['VERSION'],
+            'ADMINLTE_VERSION': Config.ADMINLTE['VERSION'],
+            'ADMINLTE_DATERANGE': Config.ADMINLTE['DATERANGE'],
+            'ADMINLTE_URL': Config.ADMINLTE['URL'],
+            'ADMINLTE_TITLE': Config.ADMINLTE['TITLE'],
+            'SERVICE': self.service.upper(),
+            'ISHOME': 'active' if self.isHome else ''
+        }
+    
+    ## templates are read and split into segments once per process, then shared by every page
+    def renderTemplate(self, key):
+        tpl = PageBuilder.templateCache.get(key)
+        if tpl is None:
+            with open(self._getTemplateByKey(key), 'r') as f:
+                tpl = PageBuilder.templateCache[key] = Template(f.read())
+        
+        if self.templateValues is None:
+            self.templateValues = self.getTemplateValues()
+        
+        return tpl.render(self.templateValues)
+    
     def buildHeader(self):
         output = []
-        #file_get_pre_css
-        headerPreCSS = open(self._getTemplateByKey('header.precss'), 'r').read()
-        headerPreCSS = headerPreCSS.replace('{$ADVISOR_TITLE}', Config.ADVISOR['TITLE'])
-        headerPreCSS = headerPreCSS.replace('{$SERVICE}', self.service.upper())
-        output.append(headerPreCSS)
+        output.append(self.renderTemplate('header.precss'))
 
         if self.cssLib:
             for lib in self.cssLib:
                 output.append("<link ref='stylesheet' href='{}'>".format(lib))
 
-        #file_get_post_css
-        headerPostCSS = open(self._getTemplateByKey('header.postcss'), 'r').read()
-        output.append(
-            headerPostCSS.replace('{$ADVISOR_TITLE}', Config.ADVISOR['TITLE'])
-        )
+        output.append(self.renderTemplate('header.postcss'))
 
         return output
     
     def buildFooter(self):
         output = []
-        #file_get_template preInlineJS
-        preJS = open(self._getTemplateByKey('footer.prejs'), 'r').read()
-        preJS = preJS.replace('"', "'")
-
-        ADMINLTE_VERSION = Config.ADMINLTE['VERSION']
-        ADMINLTE_DATERANGE = Config.ADMINLTE['DATERANGE']
-        ADMINLTE_URL = Config.ADMINLTE['URL']
-        ADMINLTE_TITLE = Config.ADMINLTE['TITLE']
-
-        PROJECT_TITLE = Config.ADVISOR['TITLE']
-        PROJECT_VERSION = Config.ADVISOR['VERSION']
-        x = eval("f'{preJS}'")
-        output.append(x)
+        output.append(self.renderTemplate('footer.prejs'))
 
         if self.jsLib:
             for lib in self.jsLib:
@@ -399,35 +516,24 @@ class PageBuilder:
             inlineJS = '; '.join(self.js)
             output.append(f"<script>$(function(){{{inlineJS}}})</script>")
 
-        #file_get_template postInlineJS
-        postJS = open(self._getTemplateByKey('footer.postjs'), 'r').read()
-        output.append(postJS)
+        output.append(self.renderTemplate('footer.postjs'))
 
         return output    
         
     def buildBreadcrumb(self):
         output = []
-        breadcrumb = open(self._getTemplateByKey('breadcrumb'), 'r').read()
-        breadcrumb = breadcrumb.replace('{$SERVICE}', self.service.upper())
-        output.append(breadcrumb)
+        output.append(self.renderTemplate('breadcrumb'))
            
         return output
         
     def buildNav(self):
-        ISHOME = 'active' if self.isHome else ''
-
         output = []
-        #file_getsidebar
-        sidebarPRE = open(self._getTemplateByKey('sidebar.precustom'), 'r').read()
-        sidebarPRE = sidebarPRE.replace('{$ADVISOR_TITLE}', Config.ADVISOR['TITLE'])
-        sidebarPRE = sidebarPRE.replace('{$ISHOME}', ISHOME)
-        output.append(sidebarPRE)
+        output.append(self.renderTemplate('sidebar.precustom'))
 
         arr = self.buildNavCustomItems()
         output.append("\n".join(arr))
 
-        sidebarPOST = open(self._getTemplateByKey('sidebar.postcustom'), 'r').read()
-        output.append(sidebarPOST)
+        output.append(self.renderTemplate('sidebar.postcustom'))
 
         return output
     
@@ -471,7 +577,7 @@ class PageBuilder:
         self.cssLib.append(css)
         
     def checkIsLowHangingFruit(self, attr):
-        if attr['downtime'] == 0 and attr['additionalCost'] == 0 and attr['needFullTest'] == 0:
+        if attr.get('downtime', 0) == 0 and attr.get('additionalCost', 0) == 0 and attr.get('needFullTest', 0) == 0:
             return True
         else:
             return False
@@ -489,7 +595,7 @@ class PageBuilder:
             res = attrs['__affectedResources']
             for region in regions:
                 cnt = 0
-                if res[region]:
+                if res.get(region):
                     cnt = len(res[region])
                 dataSets.setdefault(region, []).append(cnt)
         
@@ -500,6 +606,11 @@ class PageBuilder:
         output.append(self.generateRowWithCol(size=12, items=items, rowHtmlAttr="data-context='summaryChart'"))
         ## Chart completed
 
+        diff = self.reporter.diff
+        if diff is not None:
+            card = self.generateChangesCard(diff)
+            output.append(self.generateRowWithCol(size=12, items=[[card, '']], rowHtmlAttr="data-context='changes'"))
+
         ## Filter
         filterTitle = "<i class='icon fas fa-search'></i> Filter"
         filterByCheck = self.generateFilterByCheck(labels)
@@ -509,6 +620,7 @@ class PageBuilder:
         
         ## SummaryCard Building
         items = []
+        filterIndex = FilterIndex()
         for label, attrs in summary.items():
             body = self.generateSummaryCardContent(attrs)
 
@@ -516,51 +628,46 @@ class PageBuilder:
             card = self.generateCard(pid=self.getHtmlId(label), html=body, cardClass='', title=label, titleBadge=badge, collapse=9, noPadding=False)
             divHtmlAttr = "data-category='" + attrs['__categoryMain'] + "' data-criticality='" + attrs['criticality'] + "'"
 
-            if self.checkIsLowHangingFruit(attrs):
+            lhf = self.checkIsLowHangingFruit(attrs)
+            if lhf:
                 divHtmlAttr += " data-lhf=1"
 
             items.append([card, divHtmlAttr])
+            filterIndex.add(label, attrs['__categoryMain'], attrs['criticality'], lhf, (identifier for identifiers in attrs['__affectedResources'].values() for identifier in identifiers))
 
         output.append(self.generateRowWithCol(size=4, items=items, rowHtmlAttr="data-context='summary'"))
+        output.append(self.generateFilterIndex(filterIndex))
         return output
-        
+
+    ## JSON for the filter JS in addSummaryControl_default; in chunked mode the resource tokens
+    ## grow with the account, they go to data/<service>/resource-index.js, loaded on first search
+    def generateFilterIndex(self, filterIndex):
+        chunked = self.detailMode == 'chunked'
+        attr = ''
+        if chunked:
+            src = 'data/' + self.service + '/resource-index.js'
+            os.makedirs(self.outputDir + '/data/' + self.service, exist_ok=True)
+            with open(self.outputDir + '/' + src, 'w', encoding='utf-8') as f:
+                f.write('filterResources(' + FilterIndex.dumps(filterIndex.resourcesToDict()) + ')')
+            self.dataFiles.append(self.outputDir + '/' + src)
+            attr = " data-resources-src='{}'".format(src)
+
+        return "<script type='application/json' id='{}filterIndex'{}>{}</script>".format(self.idPrefix, attr, FilterIndex.dumps(filterIndex.toDict(withResources=not chunked)))
+        
+    ## generator, one resource card at a time, see buildPage
     def buildContentDetail_default(self):
-        output = []
-        output.append('<h5 class="mt-4 mb-2">Detail</h5>')
+        if self.detailMode == 'chunked':
+            yield from self.buildContentDetail_chunked()
+            return
+
+        yield '<h5 class="mt-4 mb-2">Detail</h5>'
 
         details = self.reporter.getDetail()
-        count = 1
-        previousCategory = ""
+        self._detailCount = 1
+        self._previousCategory = ""
         for region, lists in details.items():
-            items = []
-            output.append("<h6 class='mt-4 mb-2'>{}</h6>".format(region))
-            for identifierx, attrs in lists.items():
-                tab = []
-                identifier = identifierx
-                category = ''
-                checkIfCategoryPresent = identifierx.split('::')
-                if len(checkIfCategoryPresent) == 2:
-                    category, identifier = checkIfCategoryPresent
-                    if not previousCategory:
-                        previousCategory = category
-
-                tab.append("<table class='table table-sm'><thead><tr>")
-                tab.append("<th scole='col'>Check</th><th scole='col'>Current Value</th><th scole='col'>Recommendation</th>")
-                tab.append("</tr></thead><tbody>")
-                tab.append(self.generateTable(attrs))
-                tab.append("</tbody></table>")
-                tab = "\n".join(tab)
-
-                if previousCategory != category and category != '' and count % 2 == 0:
-                    items.append([])
-
-                item = self.generateCard(pid=self.getHtmlId(identifierx), html=tab, cardClass='warning', title=self.generateTitleWithCategory(count, identifier, category), titleBadge='', collapse=False, noPadding=True)
-                items.append([item, ''])
-
-                previousCategory = category
-                count += 1
-
-            output.append(self.generateRowWithCol(size=6, items=items, rowHtmlAttr="data-context=detail"))
+            yield "<h6 class='mt-4 mb-2'>{}</h6>".format(region)
+            yield from self.iterRowWithCol(size=6, items=self._generateDetailItems(lists), rowHtmlAttr="data-context=detail")
         
         str = """
 $('span.detailCategory').each(function(){
@@ -569,8 +676,146 @@ $('span.detailCategory').each(function(){
 })
 """
         self.addJS(str)
-        
-        return output
+    
+    ## Detail rows (resource, check) go to data/<service>/<region>-<n>.js, DETAIL_CHUNK_ROWS per
+    ## file; the page only holds one fixed height scroll box per region. The browser draws the
+    ## rows in view and loads their chunk when first needed, so neither the HTML size nor the
+    ## DOM size depends on the number of resources. Chunks are scripts calling detailChunk()
+    ## rather than JSON, so the report still works when opened from file://
+    def buildContentDetail_chunked(self):
+        yield '<h5 class="mt-4 mb-2">Detail</h5>'
+
+        dataDir = 'data/' + self.service
+        os.makedirs(self.outputDir + '/' + dataDir, exist_ok=True)
+
+        for region, lists in self.reporter.getDetail().items():
+            src = dataDir + '/' + region + '-'
+            total = 0
+            rows = []
+            for row in self._generateDetailRows(lists):
+                rows.append(row)
+                if len(rows) == self.DETAIL_CHUNK_ROWS:
+                    self._writeDetailChunk(src, total // self.DETAIL_CHUNK_ROWS, rows)
+                    total += len(rows)
+                    rows = []
+
+            if rows:
+                self._writeDetailChunk(src, total // self.DETAIL_CHUNK_ROWS, rows)
+                total += len(rows)
+
+            yield "<h6 class='mt-4 mb-2'>{} <span class='badge badge-info'>{}</span></h6>".format(region, total)
+            yield ("<div class='card card-warning'><div class='card-body p-0 detail-lazy' data-src='{}' data-total='{}' data-chunk-rows='{}' "
+                   "style='position: relative; overflow-y: auto; height: {}px'><div style='position: relative; height: {}px'></div></div></div>").format(
+                   html.escape(src, quote=True), total, self.DETAIL_CHUNK_ROWS, min(total, 15) * self.DETAIL_ROW_HEIGHT, total * self.DETAIL_ROW_HEIGHT)
+
+        self.addJS(self.detailChunkedJS())
+
+    ## [identifier, check, criticality, value, shortDesc], values already escaped
+    def _generateDetailRows(self, lists):
+        for identifier, attrs in lists.items():
+            for check, attr in attrs.items():
+                meta = self.checks.get(check, attr)
+                yield [html.escape(identifier), check, meta.get('criticality'), self.renderValue(attr['value'], ', '), meta.get('shortDesc')]
+
+    def _writeDetailChunk(self, src, idx, rows):
+        path = self.outputDir + '/' + src + str(idx) + '.js'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('detailChunk(')
+            json.dump({'src': src, 'idx': idx, 'rows': rows}, f, separators=(',', ':'))
+            f.write(')')
+        self.dataFiles.append(path)
+
+    def detailChunkedJS(self):
+        return """
+var lazyDetail = {chunks: {}, loading: {}, views: []};
+window.detailChunk = function(d){
+  lazyDetail.chunks[d.src + d.idx] = d.rows;
+  $.each(lazyDetail.views, function(k, v){ v.draw() })
+}
+var critIcon = {H: "<i style='color: #dc3545' class='icon fas fa-ban'></i> ", M: "<i style='color: #ffc107' class='icon fas fa-exclamation-triangle'></i> "};
+$('div.detail-lazy').each(function(){
+  var box = $(this), inner = box.children().first(), rowH = """ + str(self.DETAIL_ROW_HEIGHT) + """;
+  var src = box.data('src'), total = box.data('total'), size = box.data('chunk-rows'), visible = false;
+  var load = function(idx){
+    if (lazyDetail.loading[src + idx]) return
+    lazyDetail.loading[src + idx] = 1
+    var s = document.createElement('script'); s.src = src + idx + '.js'; document.body.appendChild(s)
+  }
+  var v = {draw: function(){
+    if (!visible) return
+    var first = Math.floor(box.scrollTop() / rowH), last = Math.min(total, first + Math.ceil(box.height() / rowH) + 2), out = [];
+    for (var i = first; i < last; i++){
+      var idx = Math.floor(i / size), rows = lazyDetail.chunks[src + idx];
+      if (!rows){ load(idx); continue }
+      var r = rows[i - idx * size];
+      out.push("<div class='row m-0 border-bottom' style='position: absolute; left: 0; right: 0; top: " + (i * rowH) + "px; height: " + rowH + "px; overflow: hidden; white-space: nowrap'>"
+        + "<div class='col-md-3 text-truncate'>" + r[0] + "</div><div class='col-md-3 text-truncate'>" + (critIcon[r[2]] || '') + r[1] + "</div>"
+        + "<div class='col-md-3 text-truncate' title='" + r[3] + "'>" + r[3] + "</div><div class='col-md-3 text-truncate'>" + r[4] + "</div></div>")
+    }
+    inner.html(out.join(''))
+  }};
+  box.on('scroll', v.draw)
+  lazyDetail.views.push(v)
+  if (!('IntersectionObserver' in window)){ visible = true; v.draw(); return }
+  new IntersectionObserver(function(entries){
+    if (entries[0].isIntersecting && !visible){ visible = true; v.draw() }
+  }).observe(this)
+})
+"""
+
+    ## detail cards of one region, the numbering and category breaks run across regions
+    def _generateDetailItems(self, lists):
+        for identifierx, attrs in lists.items():
+            tab = []
+            identifier = identifierx
+            category = ''
+            checkIfCategoryPresent = identifierx.split('::')
+            if len(checkIfCategoryPresent) == 2:
+                category, identifier = checkIfCategoryPresent
+                if not self._previousCategory:
+                    self._previousCategory = category
+
+            tab.append("<table class='table table-sm'><thead><tr>")
+            tab.append("<th scole='col'>Check</th><th scole='col'>Current Value</th><th scole='col'>Recommendation</th>")
+            tab.append("</tr></thead><tbody>")
+            tab.append(self.generateTable(attrs))
+            tab.append("</tbody></table>")
+            tab = "\n".join(tab)
+
+            if self._previousCategory != category and category != '' and self._detailCount % 2 == 0:
+                yield []
+
+            item = self.generateCard(pid=self.getHtmlId(identifierx), html=tab, cardClass='warning', title=self.generateTitleWithCategory(self._detailCount, identifier, category), titleBadge='', collapse=False, noPadding=True)
+            yield [item, '']
+
+            self._previousCategory = category
+            self._detailCount += 1
+        
+    ## "What changed" since the previous run, see reporter.trackChanges
+    def generateChangesCard(self, diff, maxResources=20):
+        output = []
+        if not diff.hasChanges():
+            output.append("<p>No change since the last scan, {} finding(s) still open.</p>".format(diff.persisted))
+        else:
+            output.append("<table class='table table-sm'><thead><tr>")
+            output.append("<th scope='col'>Check</th><th scope='col'>New</th><th scope='col'>Resolved</th><th scope='col'>Value changed</th>")
+            output.append("</tr></thead><tbody>")
+            for check, counts in sorted(diff.summaryByCheck().items()):
+                output.append("<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>".format(check, counts['added'], counts['removed'], counts['changed']))
+            output.append("</tbody></table>")
+
+            changes = diff.toDict()
+            for key, title in [['added', 'New'], ['removed', 'Resolved']]:
+                labels = changes[key]
+                if not labels:
+                    continue
+
+                items = ["{} ({}, {})".format(html.escape(resource), check, region) for region, resource, check in labels[:maxResources]]
+                more = " and {} more".format(len(labels) - maxResources) if len(labels) > maxResources else ''
+                output.append("<dl><dt>{}</dt><dd>{}{}</dd></dl>".format(title, ' | '.join(items), more))
+
+        badge = "<span class='badge badge-info right'>{} unchanged</span>".format(diff.persisted)
+        return self.generateCard(pid=self.getHtmlId('changes'), html="\n".join(output), cardClass='info', title='What changed', titleBadge=badge, collapse=True, noPadding=False)
         
     def generateFilterByCheck(self, labels):
         output = []
@@ -597,8 +842,6 @@ $('span.detailCategory').each(function(){
         return str
         
     def addSummaryControl_default(self):
-        jsServIdPrefix = "#" + self.service + '-'
-
         output = []
         output.append('')
 
@@ -642,6 +885,11 @@ $('span.detailCategory').each(function(){
           </div>
       </div>
     </div>
+    <div class='col-md-4'>
+      <div class="form-group">
+        <input type="text" id="filter-resource" class="form-control form-control-sm" placeholder="Resource name...">
+      </div>
+    </div>
     <div class='col-md-4'>
       <div class="form-group clearfix">
         <div class="icheck-success d-inline">
@@ -660,7 +908,6 @@ $('span.detailCategory').each(function(){
         
         js = """
 $('.select2').select2()
-var si = $('div[data-context="summary"] div[data-category]');
 var cards = $('[data-context="summary"] div.col-md-4')
 $('input[name=radio_cs]').change(function(){
   var v = $(this).val()
@@ -676,39 +923,61 @@ $('input[name=radio_cs]').change(function(){
     i.removeClass('fa-minus').addClass('fa-plus')
   }
 })
-$('#filter-critical, #filter-pillar, #checkCtrl, #cbLowHangingFruit').change(function(){
-var cb_lhf_on = $("#cbLowHangingFruit").is(':checked')
-var pv = $('#filter-pillar').val();
-var fc = $('#filter-critical').val();
-var tiArray = $('#checkCtrl').val();
-var s = '';
-if(pv != '-') s += '[data-category="'+pv+'"]';
-if(fc != '-') s += '[data-criticality="'+fc+'"]';
-if(tiArray.length > 0){
-	si.hide()
-	$.each(tiArray, function(k, v){"""
-        txt = "id = \"{}\" + v;".format(jsServIdPrefix)
-        js += txt
-        js += """$(id).parent().addClass('showLater');
-	})
-	if(s.length > 0){
-		$('div[data-context="summary"] .showLater'+s+'').show()
-	}else{
-		$('.showLater').show()
-	}
-	$('.showLater').removeClass('showLater')
-}else if(s.length == 0){
-  si.show();
-}else{
-  si.hide();
-  $('div[data-context="summary"] div'+s+'').show()
+var fi = JSON.parse(document.getElementById('""" + self.idPrefix + """filterIndex').textContent);
+var fiCols = $('div[data-context="summary"] > div.col-md-4').get(), fiWords = Math.ceil(fi.checks.length / 32) || 1;
+var fiAll = [], fiShown = [];
+for (var w = 0; w < fiWords; w++){ fiAll.push(0); fiShown.push(0) }
+for (var p = 0; p < fi.checks.length; p++){ fiAll[p >> 5] |= 1 << (p & 31); fiShown[p >> 5] |= 1 << (p & 31) }
+var fiPos = {};
+$.each(fi.checks, function(p, check){ fiPos[check] = p });
+var fiAnd = function(a, b){
+  var o = [];
+  for (var w = 0; w < fiWords; w++) o.push(a[w] & (b ? b[w] : 0))
+  return o
+}
+var fiFromList = function(list){
+  var o = fiAnd(fiAll, null);
+  $.each(list, function(k, p){ o[p >> 5] |= 1 << (p & 31) })
+  return o
 }
-$('[data-context="summary"] .col-md-4:visible').addClass('showLater2')
-if(cb_lhf_on == true){
-  $('.showLater2').hide()
-  $('.showLater2[data-lhf=1]').show()
-  $('.showLater2').removeClass('showLater2')
+// cards of the resources whose name has a token starting with each word of the query
+var fiResources = function(q){
+  var res = fi.resources, out = null;
+  $.each(q.toLowerCase().split(/[^0-9a-z]+/), function(k, word){
+    if (!word) return
+    var lo = 0, hi = res.tokens.length, cards = [];
+    while (lo < hi){ var mid = (lo + hi) >> 1; if (res.tokens[mid] < word) lo = mid + 1; else hi = mid }
+    for (var i = lo; i < res.tokens.length && res.tokens[i].lastIndexOf(word, 0) === 0; i++) cards = cards.concat(res.postings[i])
+    var b = fiFromList(cards);
+    out = out ? fiAnd(out, b) : b
+  })
+  return out
+}
+var fiApply = function(){
+  var pv = $('#filter-pillar').val(), fc = $('#filter-critical').val(), tiArray = $('#checkCtrl').val() || [], q = $.trim($('#filter-resource').val());
+  var b = fiAll;
+  if (pv != '-') b = fiAnd(b, fi.category[pv])
+  if (fc != '-') b = fiAnd(b, fi.criticality[fc])
+  if (tiArray.length > 0) b = fiAnd(b, fiFromList($.map(tiArray, function(v){ return fiPos[v] })))
+  if ($('#cbLowHangingFruit').is(':checked')) b = fiAnd(b, fi.lhf)
+  if (q.length > 0 && fi.resources) b = fiAnd(b, fiResources(q))
+  // only the cards whose visibility changed are touched
+  for (var w = 0; w < fiWords; w++){
+    var diff = b[w] ^ fiShown[w];
+    while (diff){
+      var bit = diff & -diff, p = (w << 5) + 31 - Math.clz32(bit);
+      fiCols[p].style.display = (b[w] & bit) ? '' : 'none';
+      diff ^= bit
+    }
+  }
+  fiShown = b
 }
+$('#filter-critical, #filter-pillar, #checkCtrl, #cbLowHangingFruit').change(fiApply)
+$('#filter-resource').on('input', function(){
+  var src = document.getElementById('""" + self.idPrefix + """filterIndex').getAttribute('data-resources-src');
+  if (fi.resources || !src) return fiApply()
+  window.filterResources = function(res){ fi.resources = res; fiApply() }
+  if (!fiApply.loading){ fiApply.loading = 1; var s = document.createElement('script'); s.src = src; document.body.appendChild(s) }
 })
 """
         self.addJS(js)
@@ -0,0 +1,285 @@
+import os
+import re
+import io
+import gzip
+import shutil
+import base64
+import hashlib
+import mimetypes
+
+## Copy of a generated report (adminlte/html) that only carries what its pages use: the local
+## CSS / JS they reference, minified and concatenated, the Font Awesome rules of the icons
+## found in the pages and their fonts cut down to those glyphs, images as data URIs. With
+## inline (default) every page is one self-contained file, otherwise the pages share one
+## assets/bundle.<hash>.css and .js. Every text file gets .gz (and .br with brotli) siblings.
+## Optional: fontTools (subsetting), brotli, rjsmin / rcssmin (minifiers).
+class ReportBundle:
+    CSS_TAG = re.compile(r"""<link\b[^>]*\bhref=['"]([^'"]+\.css)['"][^>]*>""", re.I)
+    JS_TAG = re.compile(r"""<script\b[^>]*\bsrc=['"]([^'"]+\.js)['"][^>]*>\s*</script>""", re.I)
+    IMG_SRC = re.compile(r"""(<img\b[^>]*\bsrc=)(['"])([^'"]+)\2""", re.I)
+    CSS_URL = re.compile(r"""url\(\s*['"]?([^'")]+)['"]?\s*\)""")
+    ICON_RULE = re.compile(r"""((?:\.fa-[a-z0-9-]+:before,?)+)\{content:"\\([0-9a-f]+)"\}""")
+    FONT_FACE = re.compile(r"@font-face\{[^}]*\}")
+    ICON_CLASS = re.compile(r"\bfa-[a-z0-9-]+")
+
+    ## font file -> class that needs it, faces of unused styles are dropped
+    FONT_STYLES = {'fa-brands-400': 'fab', 'fa-regular-400': 'far'}
+    COMPRESS_EXT = ['.html', '.js', '.css', '.json']
+
+    ## written into every bundle, clean() only removes folders holding it
+    MARKER = '.screener-bundle'
+
+    def __init__(self, sourceDir, outputDir, inline=True):
+        source = os.path.realpath(sourceDir)
+        output = os.path.realpath(outputDir)
+        if output == source or source.startswith(output.rstrip(os.sep) + os.sep):
+            raise Exception("The bundle needs its own folder, {} is or contains {}".format(outputDir, sourceDir))
+
+        self.sourceDir = sourceDir
+        self.outputDir = outputDir
+        self.inline = inline
+        self.pages = {}
+        self.icons = set()
+        self.classes = set()
+        self.stats = {'assets': 0, 'missing': [], 'bytes': 0, 'files': 0}
+
+    def build(self):
+        os.makedirs(self.outputDir, exist_ok=True)
+        with open(os.path.join(self.outputDir, self.MARKER), 'w') as f:
+            f.write(self.sourceDir + "\n")
+
+        for name in sorted(os.listdir(self.sourceDir)):
+            if name.endswith('.html'):
+                with open(os.path.join(self.sourceDir, name), 'r', encoding='utf-8') as f:
+                    self.pages[name] = f.read()
+
+        dataDir = os.path.join(self.sourceDir, 'data')
+        texts = list(self.pages.values())
+        for root, dirs, files in os.walk(dataDir):
+            for name in files:
+                with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+                    texts.append(f.read())
+
+        for text in texts:
+            self.icons.update(self.ICON_CLASS.findall(text))
+            self.classes.update(re.findall(r"\bfa[a-z]?\b", text))
+
+        css, js = self.collectAssets()
+        if not self.inline:
+            css = "<link rel='stylesheet' href='{}'>".format(self._writeAsset('css', css))
+            js = "<script src='{}'></script>".format(self._writeAsset('js', js))
+        else:
+            css = "<style>" + css + "</style>"
+            js = "<script>" + js.replace('</script', '<\\/script') + "</script>"
+
+        for name, text in self.pages.items():
+            self._writeText(name, self.rewritePage(text, css, js))
+
+        if os.path.isdir(dataDir):
+            for root, dirs, files in os.walk(dataDir):
+                for name in files:
+                    path = os.path.join(root, name)
+                    with open(path, 'r', encoding='utf-8') as f:
+                        self._writeText(os.path.relpath(path, self.sourceDir), f.read())
+
+        return self
+
+    ## local assets in the order the pages first reference them, external URLs are kept
+    def collectAssets(self):
+        cssFiles, jsFiles = [], []
+        for text in self.pages.values():
+            for files, pattern in [[cssFiles, self.CSS_TAG], [jsFiles, self.JS_TAG]]:
+                for ref in pattern.findall(text):
+                    if not self._isLocal(ref) or ref in files:
+                        continue
+                    if not os.path.exists(os.path.join(self.sourceDir, ref)):
+                        if ref not in self.stats['missing']:
+                            self.stats['missing'].append(ref)
+                            print("[ReportBundle] {} is referenced but not found, left out".format(ref))
+                        continue
+                    files.append(ref)
+
+        css = [self.bundleCss(ref) for ref in cssFiles]
+        js = [self.bundleJs(ref) for ref in jsFiles]
+        self.stats['assets'] = len(cssFiles) + len(jsFiles)
+        self.assetRefs = set(cssFiles + jsFiles + self.stats['missing'])
+
+        return "\n".join(css), ";\n".join(js)
+
+    def rewritePage(self, text, css, js):
+        state = {'css': css, 'js': js}
+
+        ## the bundle goes where the first local tag was, the other local tags are dropped
+        def replace(kind):
+            def sub(m):
+                if m.group(1) not in self.assetRefs:
+                    return m.group(0)
+                out, state[kind] = state[kind], ''
+                return out
+            return sub
+
+        text = self.CSS_TAG.sub(replace('css'), text)
+        text = self.JS_TAG.sub(replace('js'), text)
+        return self.IMG_SRC.sub(lambda m: m.group(1) + m.group(2) + self._dataUri(m.group(3), self.sourceDir) + m.group(2), text)
+
+    def bundleCss(self, ref):
+        path = os.path.join(self.sourceDir, ref)
+        with open(path, 'r', encoding='utf-8') as f:
+            css = f.read()
+
+        if self.ICON_RULE.search(css):
+            css = self.pruneIcons(css, os.path.dirname(path))
+
+        base = os.path.dirname(path)
+        css = self.CSS_URL.sub(lambda m: "url(" + self._dataUri(m.group(1), base) + ")", css)
+        return self.minifyCss(css)
+
+    ## Font Awesome: only the icon rules used by the pages, only the faces of the styles in
+    ## use, one font format each (woff2, else woff) subset to the used glyphs
+    def pruneIcons(self, css, base):
+        codepoints = set()
+
+        def keepRule(m):
+            selectors = [s for s in m.group(1).rstrip(',').split(',') if s[1:-len(':before')] in self.icons]
+            if not selectors:
+                return ''
+            codepoints.add(int(m.group(2), 16))
+            return ','.join(selectors) + '{content:"\\' + m.group(2) + '"}'
+
+        css = self.ICON_RULE.sub(keepRule, css)
+
+        def keepFace(m):
+            face = m.group(0)
+            urls = self.CSS_URL.findall(face)
+            font = None
+            for ext in ['.woff2', '.woff', '.ttf']:
+                font = next((url for url in urls if url.endswith(ext)), None)
+                if font:
+                    break
+
+            if font is None:
+                return face
+
+            name = os.path.splitext(os.path.basename(font))[0]
+            style = self.FONT_STYLES.get(name)
+            if style and style not in self.classes:
+                return ''
+
+            data, fmt = self.subsetFont(os.path.join(base, font), codepoints)
+            src = "src:url(data:font/{};base64,{}) format(\"{}\")".format(fmt, base64.b64encode(data).decode('ascii'), fmt)
+            return re.sub(r"src:[^;}]*;?", '', face).replace('{', '{' + src + ';', 1)
+
+        return self.FONT_FACE.sub(keepFace, css)
+
+    def subsetFont(self, path, codepoints):
+        fmt = os.path.splitext(path)[1][1:]
+        try:
+            from fontTools import subset
+            from fontTools.ttLib import TTFont
+        except ImportError:
+            with open(path, 'rb') as f:
+                return f.read(), fmt
+
+        options = subset.Options()
+        font = TTFont(path)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=codepoints)
+        subsetter.subset(font)
+
+        try:
+            import brotli  # noqa: F401, woff2 needs it
+            font.flavor = 'woff2'
+        except ImportError:
+            font.flavor = 'woff'
+
+        buf = io.BytesIO()
+        font.save(buf)
+        return buf.getvalue(), font.flavor
+
+    def bundleJs(self, ref):
+        path = os.path.join(self.sourceDir, ref)
+        ## ship the vendor's minified build when there is one
+        if not path.endswith('.min.js') and os.path.exists(path[:-3] + '.min.js'):
+            path = path[:-3] + '.min.js'
+
+        with open(path, 'r', encoding='utf-8') as f:
+            js = f.read()
+
+        if path.endswith('.min.js'):
+            return js.strip()
+
+        try:
+            import rjsmin
+            return rjsmin.jsmin(js)
+        except ImportError:
+            return js.strip()
+
+    @staticmethod
+    def minifyCss(css):
+        try:
+            import rcssmin
+            return rcssmin.cssmin(css)
+        except ImportError:
+            pass
+
+        css = re.sub(r"/\*.*?\*/", '', css, flags=re.S)
+        css = re.sub(r"\s+", ' ', css)
+        return re.sub(r"\s*([{};,])\s*", r"\1", css).strip()
+
+    def _isLocal(self, ref):
+        return not re.match(r"^([a-z]+:)?//|^data:", ref, re.I)
+
+    def _dataUri(self, ref, base):
+        if not self._isLocal(ref):
+            return ref
+
+        path = os.path.join(base, ref.split('?')[0].split('#')[0])
+        if not os.path.isfile(path):
+            return ref
+
+        mime = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        with open(path, 'rb') as f:
+            return "data:{};base64,{}".format(mime, base64.b64encode(f.read()).decode('ascii'))
+
+    def _writeAsset(self, ext, text):
+        name = "assets/bundle.{}.{}".format(hashlib.blake2b(text.encode('utf-8'), digest_size=6).hexdigest(), ext)
+        self._writeText(name, text)
+        return name
+
+    def _writeText(self, name, text):
+        path = os.path.join(self.outputDir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        data = text.encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(data)
+        self.stats['files'] += 1
+        self.stats['bytes'] += len(data)
+
+        if os.path.splitext(name)[1] in self.COMPRESS_EXT:
+            self.precompress(path, data)
+
+    ## served as is by S3 / CloudFront / nginx gzip_static with the matching Content-Encoding
+    @staticmethod
+    def precompress(path, data):
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(data, 9, mtime=0))
+
+        try:
+            import brotli
+        except ImportError:
+            return
+
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+    ## removes an earlier bundle, any other non empty folder is left alone
+    def clean(self):
+        if not os.path.isdir(self.outputDir) or not os.listdir(self.outputDir):
+            return self
+
+        if not os.path.exists(os.path.join(self.outputDir, self.MARKER)):
+            raise Exception("{} is not empty and was not created by bundle.py, not removing it".format(self.outputDir))
+
+        shutil.rmtree(self.outputDir)
+        return self
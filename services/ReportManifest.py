@@ -0,0 +1,59 @@
+import os
+import json
+
+import constants as _C
+
+## {page path: {digest: input hash, files: {path: [size, mtime_ns]}}} of the pages built by
+## earlier runs, see PageBuilder.getInputHash. files are the data files written next to the
+## page (PageBuilder.dataFiles, chunked mode). A page is rebuilt when its hash changed, its
+## file is gone or one of its data files is gone or was rewritten since.
+class ReportManifest:
+    VERSION = 2
+
+    def __init__(self, path=_C.REPORT_MANIFEST):
+        self.path = path
+        self.pages = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == self.VERSION:
+                    self.pages = data['pages']
+            except Exception:
+                print("[ReportManifest] ignoring unreadable " + path)
+
+    def isFresh(self, page, digest):
+        entry = self.pages.get(page)
+        if entry is None or entry['digest'] != digest or not os.path.exists(page):
+            return False
+
+        return all(self._stat(path) == stat for path, stat in entry['files'].items())
+
+    ## files: data files of the page, None keeps the ones recorded (page left as it was)
+    def record(self, page, digest, files=None):
+        if files is None:
+            files = self.pages[page]['files'] if page in self.pages else []
+            self.pages[page] = {'digest': digest, 'files': files}
+            return
+
+        self.pages[page] = {'digest': digest, 'files': {path: self._stat(path) for path in files}}
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        return [st.st_size, st.st_mtime_ns]
+
+    def save(self):
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        tmpFile = "{}.{}".format(self.path, os.getpid())
+        with open(tmpFile, 'w') as f:
+            json.dump({'version': self.VERSION, 'pages': self.pages}, f, indent=1)
+        os.replace(tmpFile, self.path)
@@ -0,0 +1,175 @@
+import os
+import time
+from multiprocessing import Pool
+
+from utils.Dashboard import Dashboard
+from services.PageBuilder import PageBuilder
+from services.DashboardPageBuilder import DashboardPageBuilder
+from services.ReportManifest import ReportManifest
+import constants as _C
+
+## What PageBuilder reads from a finished reporter, small enough to pickle to a worker:
+## the cards, the columnar services.FindingStore and the per check detail metadata. The
+## detail dicts are rebuilt lazily on the worker side, as reporter.getDetails() does.
+class ReporterSnapshot:
+    def __init__(self, service, cardSummary, findings=None, detailMeta=None, diff=None):
+        self.service = service
+        self.cardSummary = cardSummary
+        self.findings = findings
+        self.detailMeta = detailMeta or {}
+        self.diff = diff
+        self.detail = None
+
+    ## after getSummary() and getDetails()
+    @staticmethod
+    def fromReporter(rep):
+        return ReporterSnapshot(rep.service, rep.getCard(), rep.findings, rep.detailMeta, rep.diff)
+
+    def getCard(self):
+        return self.cardSummary
+
+    def getDetail(self):
+        if self.findings is None:
+            return {}
+
+        if self.detail is None:
+            detailMeta = self.detailMeta
+            self.detail = self.findings.view(lambda check, value: dict(detailMeta[check], value=value))
+
+        return self.detail
+
+    ## render cost estimate, the biggest pages are dispatched first
+    def size(self):
+        return len(self.findings) if self.findings is not None else len(self.cardSummary)
+
+    ## feeds PageBuilder.getInputHash, the columns go in as raw bytes
+    def digest(self, h):
+        PageBuilder._hashUpdate(h, [self.cardSummary, self.detailMeta, self.diff.toDict() if self.diff else None])
+        if self.findings is None:
+            return
+
+        findings = self.findings
+        for name in findings.COLUMNS:
+            h.update(findings.columns[name].tobytes())
+            PageBuilder._hashUpdate(h, findings.tables[name].strings)
+        h.update(findings.status.tobytes())
+        PageBuilder._hashUpdate(h, findings.values)
+
+    ## detail views hold a lambda, they are never pickled
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['detail'] = None
+        return state
+
+## one task per service page, returns (service, path, seconds, data files)
+def renderPage(task):
+    t = time.time()
+    pb = pageBuilder(task)
+    path = pb.buildPage()
+
+    return task[0].service, path, time.time() - t, pb.dataFiles
+
+def pageBuilder(task):
+    snapshot, services, regions, options = task
+
+    pb = PageBuilder(snapshot.service, snapshot, services, regions)
+    for name, value in options.items():
+        setattr(pb, name, value)
+
+    return pb
+
+## Service pages are independent once reporting is over: each one is built by a worker
+## process from a ReporterSnapshot, then the parent builds index.html from the merged
+## dashboard. With enough workers the whole report takes about as long as its largest page.
+## Pages whose input hash is the one recorded in the manifest are left as they are.
+class ReportRenderer:
+    def __init__(self, outputDir, services, regions, compress=False, workers=None, detailMode='inline', manifestFile=_C.REPORT_MANIFEST):
+        if detailMode not in PageBuilder.DETAIL_MODES:
+            raise Exception("Unknown detail mode: " + str(detailMode))
+
+        self.outputDir = outputDir
+        self.services = services
+        self.regions = regions
+        self.workers = workers
+        ## PageBuilder attributes set on every page
+        self.options = {'outputDir': outputDir, 'compress': compress, 'detailMode': detailMode}
+        self.dashboard = Dashboard()
+        self.tasks = []
+        self.timings = {}
+        ## None renders every page
+        self.manifest = ReportManifest(manifestFile) if manifestFile else None
+        self.skipped = []
+
+    ## a reporter (services.Reporter) or anything with service / cardSummary / getDetail / diff
+    def add(self, rep, regions=None):
+        if hasattr(rep, 'findings'):
+            self.dashboard.merge(rep.getDashboard())
+            rep = ReporterSnapshot.fromReporter(rep)
+
+        self.tasks.append([rep, self.services, regions or self.regions, self.options])
+        return self
+
+    ## {service: path}, index.html included
+    def render(self, dashboard=None):
+        self.skipped = []
+        self.timings = {}
+        self.dataFiles = {}
+        pages = {}
+        digests = {}
+        tasks = []
+        for task in self.tasks:
+            pb = pageBuilder(task)
+            if self._isFresh(pb, digests):
+                pages[pb.service] = pb.getPagePath()
+                self.skipped.append(pb.service)
+            else:
+                tasks.append(task)
+
+        tasks.sort(key=lambda task: self._size(task[0]), reverse=True)
+        workers = min(self.workers or os.cpu_count() or 1, len(tasks))
+        if workers <= 1:
+            self._collect(pages, map(renderPage, tasks))
+        else:
+            with Pool(processes=workers) as pool:
+                self._collect(pages, pool.imap_unordered(renderPage, tasks))
+
+        pb = DashboardPageBuilder(self.services, self.regions, dashboard or self.dashboard)
+        pb.outputDir = self.outputDir
+        pb.compress = self.options['compress']
+        if self._isFresh(pb, digests):
+            self.skipped.append('index')
+        else:
+            pb.buildPage()
+            self.dataFiles[pb.getPagePath()] = pb.dataFiles
+        pages['index'] = pb.getPagePath()
+
+        if self.manifest is not None:
+            for path in pages.values():
+                self.manifest.record(path, digests[path], self.dataFiles.get(path))
+            self.manifest.save()
+
+        self.tasks = []
+        self.dashboard = Dashboard()
+        return pages
+
+    ## digests: {path: input hash}, filled for the manifest
+    def _isFresh(self, pb, digests):
+        if self.manifest is None:
+            return False
+
+        path = pb.getPagePath()
+        digests[path] = pb.getInputHash()
+        return self.manifest.isFresh(path, digests[path])
+
+    def _collect(self, pages, results):
+        for service, path, elapsed, dataFiles in results:
+            pages[service] = path
+            self.timings[service] = elapsed
+            self.dataFiles[path] = dataFiles
+
+    @staticmethod
+    def _size(rep):
+        if hasattr(rep, 'size'):
+            return rep.size()
+
+        return len(rep.getCard())
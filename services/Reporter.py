@@ -1,34 +1,65 @@
-import os
 import json
-import re
+import html
+from collections import Counter
 
-from utils.Config import Config, dashboard
+from utils.Dashboard import Dashboard
+from utils.Template import Template
+from services.CheckCatalog import CheckCatalog
+from services.FindingStore import FindingStore
+from services.Finding import FindingStatus
+from services.FindingDiff import FindingSnapshot, FindingDiff
+import constants as _C
+
+## Check metadata used for aggregation, resolved once per check
+class CheckMeta:
+    __slots__ = ('criticality', 'category', 'categoryMain')
+    
+    def __init__(self, criticality, category):
+        self.criticality = criticality
+        self.category = category
+        self.categoryMain = category[0]
 
 class reporter:
+    MAP_CATEGORIES = ['S', 'C', 'R', 'P', 'O']
+    MAP_CRITICALITIES = ['H', 'M', 'L', 'I']
+    DESCRIPTION_MAX_RESOURCES = 10
+    
     def __init__(self, service):
-        self.summary = {}
-        self.summaryRegion = {}
+        self.findings = FindingStore()
         self.detail = {}
         self.config = {}
         self.service = service
-        serviceReporterJsonPath = Config.DIR_SERVICE + '/' + service + '/' + service + '.reporter.json'
-        if not os.path.exists(serviceReporterJsonPath):
-            print("[Fatal] " + serviceReporterJsonPath + " not found")
-        self.config = json.loads(open(serviceReporterJsonPath).read())
-        if not self.config:
-            raise Exception(serviceReporterJsonPath + " does not contain valid JSON")
-        generalConfig = json.loads(open(Config.PATH_GENERAL_CONF).read())
-        self.config = {**self.config, **generalConfig}
+        
+        ## counters, filled from the store's (region, check) group-by in _aggregate()
+        self.checkMeta = {}
+        self.detailMeta = {}
+        self.criticalityCount = Counter()  # (region, criticality)
+        self.categoryCount = Counter()     # (region, mainCategory)
+        self.highCount = Counter()         # region
+        self.mapCount = Counter()          # criticality | mainCategory | ('_', mainCategory)
+        self.regionTotal = {}
+        self.dashboard = Dashboard()
+        ## the counters and the dashboard are rebuilt only after new input, see _updateDashboard
+        self.dashboardStale = True
+        self.missingChecks = set()
+        self.diff = None
+        
+        ## compiled and validated once per run by the catalog, shared by every reporter
+        catalog = CheckCatalog.load()
+        if not catalog.hasService(service):
+            raise Exception("[Fatal] no reporter.json found for " + service)
+        self.config = catalog.getChecks(service)
 
+    ## only failed checks are kept
     def process(self, serviceObjs):
+        findings = self.findings
         for region, objs in serviceObjs.items():
             for identifier, results in objs.items():
-                self._process(region, identifier, results)
-                
-            if 'SERV' not in dashboard:
-                dashboard['SERV'] = {self.service: {region: {}}}
+                findings.addResults(region, identifier, results, status=FindingStatus.FAIL)
                 
-            dashboard['SERV'][self.service][region] = {'Total': len(objs), 'H': 0}
+            self.regionTotal[region] = len(objs)
+        
+        self.dashboardStale = True
         return self
         
     def getDetail(self):
@@ -37,42 +68,55 @@ class reporter:
     def getCard(self):
         return self.cardSummary
     
-    def _process(self, region, identifier, results):
-        # print(results)
-        for key, info in results.items():
-            if info[0] == -1:
-                ## Register summary info
-                if key not in self.summaryRegion:
-                    self.summaryRegion[key] = {}
-                    self.summary[key] = []
-                    
-                if region not in self.summaryRegion[key]:
-                    self.summaryRegion[key][region] = []
-                
-                if region not in self.detail:
-                    self.detail[region] = {}
-                
-                self.summaryRegion[key][region].append(identifier)
-                self.summary[key].append(identifier)
-                
-                if identifier not in self.detail[region]:
-                    self.detail[region][identifier] = {}
-                    
-                self.detail[region][identifier][key] = info[1]
+    def _aggregate(self):
+        for (region, check), cnt in self.findings.groupBy('region', 'check').items():
+            self._count(region, self._checkMeta(check), cnt)
+    
+    def _count(self, region, meta, cnt=1):
+        critical = meta.criticality
+        mainCategory = meta.categoryMain
+        
+        self.criticalityCount[(region, critical)] += cnt
+        self.categoryCount[(region, mainCategory)] += cnt
+        if critical == 'H':
+            self.highCount[region] += cnt
+        
+        # Enhance for MAP summary, Text category is not part of it
+        if mainCategory == 'T':
+            return
+        
+        if critical == 'H':
+            self.mapCount[('_', mainCategory)] += cnt
+        self.mapCount[critical] += cnt
+        self.mapCount[mainCategory] += cnt
+    
+    def _checkMeta(self, check):
+        meta = self.checkMeta.get(check)
+        if meta is None:
+            meta = self.checkMeta[check] = CheckMeta(self._checkCriticality(check), self._checkCategory(check))
+        
+        return meta
 
+    ## missing fields are reported by the catalog, unknown checks once per reporter
     def _getConfigValue(self, check, field):
-        if check not in self.config:
-            print("<{}> not exists in {}.reporter.json".format(check, self.service))
+        entry = self._getCheckEntry(check)
+        if entry is None:
             return None
         
-        if field == 'category' and field not in self.config[check]:
-            field = '__categoryMain'
+        if field == 'category':
+            if '__categoryMain' not in entry:
+                return None
+            return entry['__categoryMain'] + entry.get('__categorySub', '')
         
-        if field not in self.config[check]:
-            print("<{}>::<{}> not exists in {}.reporter.json".format(check, field, self.service))
-            return None
+        return entry.get(field)
+    
+    def _getCheckEntry(self, check):
+        entry = self.config.get(check)
+        if entry is None and check not in self.missingChecks:
+            self.missingChecks.add(check)
+            print("<{}> not exists in {}.reporter.json".format(check, self.service))
         
-        return self.config[check][field]
+        return entry
     
     def _checkCriticality(self, check):
         return self._getConfigValue(check, 'criticality') or 'X'
@@ -81,170 +125,122 @@ class reporter:
         return self._getConfigValue(check, 'category') or 'X'
         
     def getSummary(self):
-        # Enhance for MAP summary
-        # _ : refers to HIGH category
-        if 'MAP' not in dashboard:
-            dashboard['MAP'] = {}
-            
-        dashboard['MAP'][self.service] = {
-            '_': {
-                'S': 0,
-                'C': 0,
-                'R': 0,
-                'P': 0,
-                'O': 0    
-            },
-            'H': 0,
-            'M': 0,
-            'L': 0,
-            'I': 0,
-            'S': 0,
-            'C': 0,
-            'R': 0,
-            'P': 0,
-            'O': 0    
-        }
-
-        for check, dataSet in self.summaryRegion.items():
-            for region, obj in dataSet.items():
-                itemSize = len(obj)
-
-                #check criticality
-                critical = self._checkCriticality(check)
-                if 'CRITICALITY' not in dashboard:
-                    dashboard['CRITICALITY'] = {}
-                if region not in dashboard['CRITICALITY']:
-                    dashboard['CRITICALITY'][region] = {}
-                if critical not in dashboard['CRITICALITY'][region]:
-                    dashboard['CRITICALITY'][region][critical] = 0
-                    
-                dashboard['CRITICALITY'][region][critical] += itemSize
-
-                if critical == 'H':
-                    dashboard['SERV'][self.service][region]['H'] += itemSize
-
-                #check category
-                category = self._checkCategory(check)
-                mainCategory = category[0]
-                
-                if 'CATEGORY' not in dashboard:
-                    dashboard['CATEGORY'] = {}
-                if region not in dashboard['CATEGORY']:
-                    dashboard['CATEGORY'][region] = {}
-                if mainCategory not in dashboard['CATEGORY'][region]:
-                    dashboard['CATEGORY'][region][mainCategory] = 0
-                
-                dashboard['CATEGORY'][region][mainCategory] += itemSize
-
-                # Enhance for MAP summary
-                if mainCategory == 'T':
-                    continue
-
-                if critical == 'H':
-                    dashboard['MAP'][self.service]['_'][mainCategory] += itemSize
-                else:
-                    pass
-                dashboard['MAP'][self.service][critical] += itemSize
-                dashboard['MAP'][self.service][mainCategory] += itemSize
+        self._updateDashboard()
 
         self.cardSummary = {}
-        service = self.service
         
-        sorted(self.summary)
-        for check, items in self.summary.items():
-            if check not in self.config:
-                print("<{}> not exists in {}.reporter.json".format(check, service))
+        summaryRegion = {}
+        for check, region, identifier in self.findings.iter('check', 'region', 'resource'):
+            summaryRegion.setdefault(check, {}).setdefault(region, []).append(identifier)
+        
+        pending = []
+        for check, byRegion in summaryRegion.items():
+            entry = self._getCheckEntry(check)
+            if entry is None:
                 continue
             
-            self.cardSummary[check] = self.config[check]
+            ## catalog entries are shared, the card gets its own copy
+            card = self.cardSummary[check] = dict(entry)
+            card['__affectedResources'] = byRegion
             
-            # Process Field by Field:
-            # Process description
-            desc = self._getConfigValue(check, '^description')
+            desc = card.get('^description')
             if desc:
-                COUNT = len(items)
-                COUNT = "<strong><u>{}</u></strong>".format(COUNT)
-                x = eval("\"{}\"".format(desc))
-                
-                self.cardSummary[check]['^description'] = x
-            
-            # Process category
-            category = self._getConfigValue(check, 'category')
-            if category:
-                self.cardSummary[check]['__categoryMain'] = category[0]
-                if len(category) > 1:
-                    self.cardSummary[check]['__categorySub'] = category[1:]
-                
-                del self.cardSummary[check]['category']
-            
-            # Process ref
-            ref = self._getConfigValue(check, 'ref')
-            if ref and isinstance(ref, list):
-                links = []
-                for link in ref:
-                    output = re.search(r'\[(.*)\]<(.*)>', link)
-                    if not output:
-                        continue
-                    
-                    links.append("<a href='{}'>{}</a>".format(output.group(2), output.group(1)))
-                
-                self.cardSummary[check]['__links'] = links
-                del self.cardSummary[check]['ref']
-                
-            resourceByRegion = {}
-            for region, insts in self.summaryRegion[check].items():
-                resourceByRegion[region] = insts
-                
-            self.cardSummary[check]['__affectedResources'] = resourceByRegion
-            
-        del self.summaryRegion
-        del self.summary
+                pending.append([card, Template.compile(desc), self._descriptionValues(byRegion)])
+        
+        ## descriptions rendered in one go, placeholders were parsed once per template
+        rendered = Template.renderAll([[tpl, values] for card, tpl, values in pending])
+        for (card, tpl, values), desc in zip(pending, rendered):
+            card['^description'] = desc
         
         return self
+    
+    ## Values of the {$...} placeholders allowed in ^description, see CheckCatalog.DESCRIPTION_PLACEHOLDERS
+    def _descriptionValues(self, byRegion):
+        identifiers = [identifier for insts in byRegion.values() for identifier in insts]
+        ## identifiers are resource names, escaped as PageBuilder.renderValue does
+        resources = ', '.join(html.escape(str(identifier)) for identifier in identifiers[:self.DESCRIPTION_MAX_RESOURCES])
+        if len(identifiers) > self.DESCRIPTION_MAX_RESOURCES:
+            resources += " and {} more".format(len(identifiers) - self.DESCRIPTION_MAX_RESOURCES)
+        
+        return {
+            'COUNT': "<strong><u>{}</u></strong>".format(len(identifiers)),
+            'REGIONCOUNT': len(byRegion),
+            'RESOURCES': resources
+        }
+    
+    ## Flush the single pass counters into this reporter's dashboard, the parent merges them.
+    ## Rebuilt from the store, so calling getSummary() again does not count anything twice
+    def _updateDashboard(self):
+        if not self.dashboardStale:
+            return
+        
+        for counter in [self.criticalityCount, self.categoryCount, self.highCount, self.mapCount]:
+            counter.clear()
+        self.dashboard = Dashboard()
+        self.dashboardStale = False
+        self._aggregate()
+        
+        dashboard = self.dashboard
+        for region, total in self.regionTotal.items():
+            dashboard.addServiceRegion(self.service, region, total, self.highCount[region])
+        
+        # Enhance for MAP summary
+        # _ : refers to HIGH category
+        mapCount = {'_': {cat: self.mapCount[('_', cat)] for cat in self.MAP_CATEGORIES}}
+        for key in self.MAP_CRITICALITIES + self.MAP_CATEGORIES:
+            mapCount[key] = self.mapCount[key]
+        for key, cnt in self.mapCount.items():
+            if isinstance(key, str) and key not in mapCount:
+                mapCount[key] = cnt
+        dashboard.addMap(self.service, mapCount)
+        
+        for (region, critical), cnt in self.criticalityCount.items():
+            dashboard.addCriticality(region, critical, cnt)
         
+        for (region, mainCategory), cnt in self.categoryCount.items():
+            dashboard.addCategory(region, mainCategory, cnt)
+        
+    ## region -> identifier -> {check: {value, criticality, shortDesc, ...}}, decoded lazily from the store
     def getDetails(self):
-        tmp = {}
-        for region, detail in self.detail.items():
-            for identifier, checks in detail.items():
-                # htmlAttribute = "data-resource='" + identifier + "' data-region='" + region + "'"
-                sorted(checks)
-                # del tmp[region][identifier]
-                for key, info in checks.items():
-                    arr = self.getDetailAttributeByKey(key)
-                    arr['value'] = info
-                    # self.detail[region][identifier][key] = arr
-                    if region not in tmp:
-                        tmp[region] = {}
-                        
-                    tmp[region][identifier] = {key: arr}
-                    
-        self.detail = tmp.copy()
+        for check in self.findings.tables['check'].strings:
+            self.getDetailAttributeByKey(check)
+        
+        detailMeta = self.detailMeta
+        self.detail = self.findings.view(lambda check, value: dict(detailMeta[check], value=value))
         del self.config
         
     def getDetailAttributeByKey(self, key):
-        config = {}
-        if not key in config:
+        if not key in self.detailMeta:
+            entry = self._getCheckEntry(key) or {}
             arr = {
-                'category': self._getConfigValue(key, 'category'),
-                'criticality': self._getConfigValue(key, 'criticality'),
-                'shortDesc': self._getConfigValue(key, 'shortDesc')
+                'criticality': entry.get('criticality'),
+                'shortDesc': entry.get('shortDesc')
             }
             
-            category = arr['category']
-            if category:
-                arr['__categoryMain'] = category[0]
-                if len(category) > 1:
-                    arr['__categorySub'] = category[1:]
-                
-                del arr['category']
+            for field in ['__categoryMain', '__categorySub']:
+                if field in entry:
+                    arr[field] = entry[field]
             
-            config[key] = arr
+            self.detailMeta[key] = arr
+        
+        return self.detailMeta[key]
         
-        return config[key]
+    ## Compare with the snapshot kept by the previous run of the same account and keep this
+    ## run's for the next one, self.diff stays None on the first run. Call after process().
+    def trackChanges(self, account='', snapshotFile=None):
+        snapshotFile = snapshotFile or "{}/snapshots/{}/{}.pickle".format(_C.FORK_DIR, account or 'default', self.service)
         
-    # backward-compatible for PHP global $DASHBOARD concept
+        current = FindingSnapshot.fromStore(self.findings, account)
+        previous = FindingSnapshot.load(snapshotFile)
+        if previous is not None and previous.account == account:
+            self.diff = FindingDiff(previous, current)
+        
+        current.save(snapshotFile)
+        return self
+    
+    # backward-compatible for PHP global $DASHBOARD concept, now per reporter (see Dashboard.merge)
     def getDashboard(self):
-        return dashboard
+        return self.dashboard
         
 if __name__ == "__main__":
     from services.PageBuilder import PageBuilder
@@ -1,13 +1,14 @@
 from utils.Config import Config
+from utils.TagIndex import TagIndex
 
 class Service:
     _AWS_OPTIONS = {}
     RULESPREFIX = None
     tags = []
 
-    TAGS_SEPARATOR = '%'
-    KEYVALUE_SEPARATOR = '='
-    VALUES_SEPARATOR = ','
+    TAGS_SEPARATOR = TagIndex.TAGS_SEPARATOR
+    KEYVALUE_SEPARATOR = TagIndex.KEYVALUE_SEPARATOR
+    VALUES_SEPARATOR = TagIndex.VALUES_SEPARATOR
 
     def __init__(self, region):
         global _Config
@@ -19,6 +20,13 @@ class Service:
         # __info("Scanning " + classname + suffix)
 
         self.RULESPREFIX = classname + '::rules'
+        self.serviceName = classname.lower()
+        self.region = region
+        self.journal = Config.get('journal', None)
+        ## write(service, region, identifier, results) targets: utils.ApiWriter, utils.FindingsDb
+        self.resultSinks = Config.get('resultSinks', [])
+        ## --filters, compiled once by TagIndex.compileFilters
+        self.tags = Config.get('tagFilters', [])
         self._AWS_OPTIONS = Config.get("_AWS_OPTIONS", {'PlaceHolder': 'ok'})
         self._AWS_OPTIONS['region'] = region
         
@@ -26,6 +34,43 @@ class Service:
         #    self.__AWS_OPTIONS['credentials'] = PHPSDK_CRED_PROVIDER
         # elif PHPSDK_CRED_PROFILE is not None:
         #    self.__AWS_OPTIONS['profile'] = PHPSDK_CRED_PROFILE
+    
+    ## --resume support: results already journaled by an interrupted run
+    def getJournaledResult(self, identifier):
+        if self.journal is None:
+            return None
+        
+        results = self.journal.get(self.serviceName, self.region, identifier)
+        if results is not None:
+            self._writeSinks(identifier, results)
+        
+        return results
+    
+    ## every completed resource goes through here: journal, api output, findings database
+    def recordResult(self, identifier, results):
+        if self.journal is not None:
+            self.journal.record(self.serviceName, self.region, identifier, results)
+        
+        self._writeSinks(identifier, results)
+        return results
+    
+    def _writeSinks(self, identifier, results):
+        for sink in self.resultSinks:
+            sink.write(self.serviceName, self.region, identifier, results)
+    
+    def getTagIndex(self):
+        return TagIndex.forRegion(self.region)
+    
+    ## tags: TagSet list [{'Key': .., 'Value': ..}] or {key: value}
+    def resourceHasTags(self, tags):
+        if isinstance(tags, list):
+            tags = {tag['Key']: tag['Value'] for tag in tags}
+        
+        return TagIndex.tagsMatch(tags or {}, self.tags)
+    
+    ## None when the region's tag index is unavailable, see TagIndex.isAvailable
+    def resourceArnHasTags(self, arn):
+        return self.getTagIndex().matches(arn, self.tags)
         
 if __name__ == "__main__":
     Config.init()
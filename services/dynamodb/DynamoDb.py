@@ -6,6 +6,7 @@ import math
 
 from services.Service import Service
 from utils.Config import Config
+from utils.ServiceQuota import ServiceQuota
 from services.dynamodb.drivers.DynamoDbCommon import DynamoDbCommon
 from services.dynamodb.drivers.DynamoDbGeneric import DynamoDbGeneric
 
@@ -14,36 +15,68 @@ class DynamoDb(Service):
     
     def __init__(self, region):
         super().__init__(region)
-        self.dynamoDbClient = boto3.client('dynamodb')
-        self.cloudWatchClient = boto3.client('cloudwatch')
-        self.serviceQuotaClient = boto3.client('service-quotas')
-        self.appScalingPolicyClient = boto3.client('application-autoscaling')
-        self.backupClient = boto3.client('backup')
-        self.cloudTrailClient = boto3.client('cloudtrail')
+        self.dynamoDbClient = boto3.client('dynamodb', region_name=region)
+        self.cloudWatchClient = boto3.client('cloudwatch', region_name=region)
+        self.serviceQuotaClient = boto3.client('service-quotas', region_name=region)
+        self.serviceQuota = ServiceQuota(self.serviceQuotaClient)
+        self.appScalingPolicyClient = boto3.client('application-autoscaling', region_name=region)
+        self.backupClient = boto3.client('backup', region_name=region)
+        self.cloudTrailClient = boto3.client('cloudtrail', region_name=region)
     
     
     def list_tables(self):
         tableArr = []
+        allowedTables = self.getTaggedTableNames()
+        #every table of the region counts against the quota, --filters or not
+        self.tableCount = 0
         try:
             tableNames = self.dynamoDbClient.list_tables()
             
             #append table name to array
-            for tables in tableNames['TableNames']:
-                tableDescription = self.dynamoDbClient.describe_table(TableName = tables)
-                tableArr.append(tableDescription)
+            self.tableCount += len(tableNames['TableNames'])
+            tableArr.extend(self.describe_tables(tableNames['TableNames'], allowedTables))
             
             #loop thru next page of results    
             while 'LastEvaluatedTableName' in tableNames:
                 tableNames = self.dynamoDbClient.list_tables(ExclusiveStartTableName = tableNames['LastEvaluatedTableName'],Limit = 100)
-                for tables in tableNames['TableNames']:
-                    tableDescription = self.dynamoDbClient.describe_table(TableName = tables)
-                    tableArr.append(tableDescription)
+                self.tableCount += len(tableNames['TableNames'])
+                tableArr.extend(self.describe_tables(tableNames['TableNames'], allowedTables))
             
             return tableArr 
             
         except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
             
+    def describe_tables(self, tableNames, allowedTables):
+        tableArr = []
+        for tables in tableNames:
+            #tag filter applied from the tag index, untagged tables are never described
+            if allowedTables is not None and tables not in allowedTables:
+                continue
+            
+            tableDescription = self.dynamoDbClient.describe_table(TableName = tables)
+            tableArr.append(tableDescription)
+        
+        return tableArr
+    
+    # table names matching --filters, None when no tag filter is set
+    def getTaggedTableNames(self):
+        if not self.tags:
+            return None
+        
+        arns = self.getTagIndex().filterArns(self.tags, 'arn:aws:dynamodb:' + self.region + ':')
+        if arns is None:
+            print("[DynamoDb] tag index unavailable in {}, --filters not applied to tables".format(self.region))
+            return None
+        
+        names = set()
+        for arn in arns:
+            resource = arn.split(':', 5)[5]
+            if resource.startswith('table/') and resource.count('/') == 1:
+                names.add(resource[6:])
+        
+        return names
+    
     def advise(self):
         
         objs = {}
@@ -53,16 +86,23 @@ class DynamoDb(Service):
         
         try:
             #Run generic checks
-            obj = DynamoDbGeneric(listOfTables, self.dynamoDbClient, self.cloudWatchClient, self.serviceQuotaClient, self.appScalingPolicyClient, self.backupClient, self.cloudTrailClient)
-            obj.run()
-            objs['DynamoDb::Generic'] = obj.getInfo()
-            del obj
-        
-            #Run table specific checks
+            objs['DynamoDb::Generic'] = self.getJournaledResult('DynamoDb::Generic')
+            if objs['DynamoDb::Generic'] is None:
+                obj = DynamoDbGeneric(listOfTables, self.dynamoDbClient, self.cloudWatchClient, self.serviceQuota, self.appScalingPolicyClient, self.backupClient, self.cloudTrailClient, tableCount=self.tableCount)
+                obj.run()
+                objs['DynamoDb::Generic'] = self.recordResult('DynamoDb::Generic', obj.getInfo())
+                del obj
+
+            #Run table specific checks, skipping tables already journaled by an interrupted run
             for eachTable in listOfTables:
-                obj = DynamoDbCommon(eachTable, self.dynamoDbClient, self.cloudWatchClient, self.serviceQuotaClient, self.appScalingPolicyClient, self.backupClient, self.cloudTrailClient)
+                key = 'DynamoDb::' + eachTable['Table']['TableName']
+                objs[key] = self.getJournaledResult(key)
+                if objs[key] is not None:
+                    continue
+
+                obj = DynamoDbCommon(eachTable, self.dynamoDbClient, self.cloudWatchClient, self.serviceQuota, self.appScalingPolicyClient, self.backupClient, self.cloudTrailClient)
                 obj.run()
-                objs['DynamoDb::' + eachTable['Table']['TableName']] = obj.getInfo()
+                objs[key] = self.recordResult(key, obj.getInfo())
                 del obj
             
             #Return objs
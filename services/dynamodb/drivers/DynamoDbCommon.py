@@ -7,17 +7,18 @@ from statistics import mean
 from services.Service import Service
 from utils.Config import Config
 from utils.Policy import Policy
+from utils.TagIndex import TagIndex
 from services.Evaluator import Evaluator
 
 
 class DynamoDbCommon(Evaluator):
 
-    def __init__(self, tables, dynamoDbClient, cloudWatchClient, serviceQuotaClient, appScalingPolicyClient, backupClient, cloudTrailClient):
+    def __init__(self, tables, dynamoDbClient, cloudWatchClient, serviceQuota, appScalingPolicyClient, backupClient, cloudTrailClient):
         super().__init__()
         self.tables = tables
         self.dynamoDbClient = dynamoDbClient
         self.cloudWatchClient = cloudWatchClient
-        self.serviceQuotaClient = serviceQuotaClient
+        self.serviceQuota = serviceQuota
         self.appScalingPolicyClient = appScalingPolicyClient
         self.backupClient = backupClient
         self.cloudTrailClient = cloudTrailClient
@@ -28,7 +29,7 @@ class DynamoDbCommon(Evaluator):
         #print('Checking ' + self.tables['Table']['TableName'] + ' delete protection started')
         try:
             if self.tables['Table']['DeletionProtectionEnabled'] == False:
-                self.results['deleteTableProtection'] = [-1, 'Delete protection is disabled']
+                self.addFinding('deleteTableProtection', 'Delete protection is disabled')
                 
         except botocore.exceptions.CLientError as e:
             ecode = e.response['Error']['Code']
@@ -38,11 +39,15 @@ class DynamoDbCommon(Evaluator):
     def _check_resources_for_tags(self):
         #print('Checking ' + self.tables['Table']['TableName'] + ' for resource tag started')
         try:
-            #retrieve tags for specific table by tableARN
-            result = self.dynamoDbClient.list_tags_of_resource(ResourceArn = self.tables['Table']['TableArn'])
+            #retrieve tags for specific table by tableARN from the region tag index
+            tableArn = self.tables['Table']['TableArn']
+            tags = TagIndex.forRegion(tableArn.split(':')[3]).getTags(tableArn)
+            if tags is None:
+                #index unavailable, ask the table itself
+                tags = self.dynamoDbClient.list_tags_of_resource(ResourceArn = tableArn)['Tags']
             #check tags
-            if not result['Tags']:
-                self.results['resourcesWithoutTags'] = [-1, 'No resource tag']
+            if not tags:
+                self.addFinding('resourcesWithoutTags', 'No resource tag')
         except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
             print(ecode)
@@ -81,7 +86,7 @@ class DynamoDbCommon(Evaluator):
         
             #Flag as issue if > 0 issues in the 30 days period.
             if sumTotal == 0:
-              self.results['unusedResourcesGSIRead'] = [-1, 'GSI ['+self.tables['Table']['GlobalSecondaryIndexes'][0]['IndexName']+'] with RCU of 0 over the past 30 days']
+              self.addFinding('unusedResourcesGSIRead', 'GSI ['+self.tables['Table']['GlobalSecondaryIndexes'][0]['IndexName']+'] with RCU of 0 over the past 30 days')
         
         except botocore.exceptions.CLientError as e:
             ecode = e.response['Error']['Code']
@@ -121,7 +126,7 @@ class DynamoDbCommon(Evaluator):
         
             #Flag as issue if > 0 issues in the 30 days period.
             if sumTotal == 0:
-                self.results['unusedResourcesGSIWrite'] = [-1, 'GSI ['+self.tables['Table']['GlobalSecondaryIndexes'][0]['IndexName']+'] with WCU of 0 over the past 30 days']
+                self.addFinding('unusedResourcesGSIWrite', 'GSI ['+self.tables['Table']['GlobalSecondaryIndexes'][0]['IndexName']+'] with WCU of 0 over the past 30 days')
         
         except botocore.exceptions.CLientError as e:
             ecode = e.response['Error']['Code']
@@ -133,10 +138,10 @@ class DynamoDbCommon(Evaluator):
             for tableAttributes in self.tables['Table']['AttributeDefinitions']:
                 if len(tableAttributes['AttributeName']) > 15:
                     # error attributesNamesXL for length > 15
-                    self.results['attributeNamesXL'] = [-1,  'Attribute name <' + tableAttributes['AttributeName'] + '> is longer than 15 characters.']
+                    self.addFinding('attributeNamesXL', 'Attribute name <' + tableAttributes['AttributeName'] + '> is longer than 15 characters.')
                 elif len(tableAttributes['AttributeName']) > 8:
                     # error attributesNamesL for length > 8 <= 15
-                    self.results['attributeNamesL'] = [-1, 'Attribute name : <' + tableAttributes['AttributeName'] + '> is longer than 8 characters.']
+                    self.addFinding('attributeNamesL', 'Attribute name : <' + tableAttributes['AttributeName'] + '> is longer than 8 characters.')
         
         except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
@@ -149,7 +154,7 @@ class DynamoDbCommon(Evaluator):
         
             #Check result for TimeToLiveStatus (ENABLED/DISABLED)
             if result['TimeToLiveDescription']['TimeToLiveStatus'] == 'DISABLED':
-                self.results['disabledTTL'] = [-1, 'TTL is not enabled.']
+                self.addFinding('disabledTTL', 'TTL is not enabled.')
             
         except botocore.exceptions.CLientError as e:
             ecode = e.response['Error']['Code']
@@ -161,7 +166,7 @@ class DynamoDbCommon(Evaluator):
             result = self.dynamoDbClient.describe_continuous_backups(TableName = self.tables['Table']['TableName'])
             #Check results of ContinuousBackupStatus (ENABLED/DISABLED)
             if result['ContinuousBackupsDescription']['PointInTimeRecoveryDescription']['PointInTimeRecoveryStatus'] == 'DISABLED':                    
-                self.results['disabledPointInTimeRecovery'] = [-1, 'Point In Time Recovery is disabled ']
+                self.addFinding('disabledPointInTimeRecovery', 'Point In Time Recovery is disabled ')
         except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
             print(ecode)
@@ -196,10 +201,10 @@ class DynamoDbCommon(Evaluator):
             #Check if percentage <= 18 and billingmode is on-demand
             if _percentageWrite <= 0.018 and self.tables['Table']['BillingModeSummary']['BillingMode'] == 'PROVISIONED' :
                 #Recommended for On-demand capacity
-                self.results['capacityModeOnDemand'] = [-1, 'Recommended for on-demand capacity']
+                self.addFinding('capacityModeOnDemand', 'Recommended for on-demand capacity')
             elif _percentageWrite > 0.018 and self.tables['Table']['BillingModeSummary']['BillingMode'] == 'PAY_PER_REQUEST' :
                 #Recommended for Provisioned capacity
-                self.results['capacityModeProvisioned'] = [-1, 'Recommended for provisioned capacity']
+                self.addFinding('capacityModeProvisioned', 'Recommended for provisioned capacity')
     
     
         except botocore.exception as e:
@@ -218,7 +223,7 @@ class DynamoDbCommon(Evaluator):
             
             #If results comes back with record, autoscaling is enabled
             if len(results['ScalingPolicies']) == 0 and self.tables['Table']['BillingModeSummary']['BillingMode'] == 'PROVISIONED':
-                self.results['autoScalingStatus'] = [-1 , 'Autoscaling is disabled']
+                self.addFinding('autoScalingStatus', 'Autoscaling is disabled')
                 
         except botocore.exceptions as e:
             ecode = e.response['Error']['Code']
@@ -230,7 +235,7 @@ class DynamoDbCommon(Evaluator):
             results = self.backupClient.list_recovery_points_by_resource(ResourceArn = self.tables['Table']['TableArn'])
 
             if len(results['RecoveryPoints']) < 1:
-                self.results['disabledBackup'] = [-1, 'No backup created for the table']
+                self.addFinding('disabledBackup', 'No backup created for the table')
         except botocore.exception as e:
             ecode = e.response['Error']['Code']
             print(ecode)
@@ -238,16 +243,14 @@ class DynamoDbCommon(Evaluator):
     # logic to check service limits max GSI per table
     def _check_service_limits_max_gsi_table(self):
         try:
-            #Retrieve quota for DynamoDb = L-F98FE922
-            serviceQuotasResutls = self.serviceQuotaClient.list_service_quotas(ServiceCode='dynamodb')
-            for quotas in serviceQuotasResutls['Quotas']:
-                #Check for GSI limit / table
-                if quotas['QuotaCode'] == 'L-F7858A77':
-                    y = int(80 * quotas['Value'] / 100)
-                    x = len(self.tables['Table']['GlobalSecondaryIndexes'])
-                    
-                    if x >= y:
-                        self.results['serviceLimitMaxGSIPerTable'] = [-1, str(x) + '/' + str(quotas['Value']) + ' GSI. Exceed 80% recommended GSI in the table']
+            #Retrieve quota for DynamoDb = L-F7858A77 (GSI limit / table)
+            quotaValue = self.serviceQuota.quota('dynamodb', 'L-F7858A77')
+            if quotaValue is not None:
+                y = int(80 * quotaValue / 100)
+                x = len(self.tables['Table']['GlobalSecondaryIndexes'])
+
+                if x >= y:
+                    self.addFinding('serviceLimitMaxGSIPerTable', str(x) + '/' + str(quotaValue) + ' GSI. Exceed 80% recommended GSI in the table')
                         
         except botocore.exceptions.CLientError as e:
             ecode = e.response['Error']['Code']
@@ -282,7 +285,7 @@ class DynamoDbCommon(Evaluator):
                 _sumOfConditionalCheckFailedRequest += eachDatapoints['SampleCount']
                 
             if _sumOfConditionalCheckFailedRequest >= 1.0:
-                self.results['conditionalCheckFailedRequests'] = [-1, str(_sumOfConditionalCheckFailedRequest) + ' : ConditionalCheckFailedRequest error occured over the past 7 days']
+                self.addFinding('conditionalCheckFailedRequests', str(_sumOfConditionalCheckFailedRequest) + ' : ConditionalCheckFailedRequest error occured over the past 7 days')
                     
         except botocore.exceptions.CLientError as e:
             ecode = e.response['Error']['Code']
@@ -311,7 +314,7 @@ class DynamoDbCommon(Evaluator):
                 _sampleCount += eachDatapoints['SampleCount']
             
             if _sampleCount >= 1.0:
-                self.results['userErrors'] = [-1, str(_sampleCount) + ' : SystemError resulting in HTTP500 error code over the past 7 days']
+                self.addFinding('userErrors', str(_sampleCount) + ' : SystemError resulting in HTTP500 error code over the past 7 days')
                     
         except botocore.exceptions.CLientError as e:
             ecode = e.response['Error']['Code']
@@ -374,10 +377,10 @@ class DynamoDbCommon(Evaluator):
                     _wcuLimitCount += 1
                 
             if _rcuLimitCount > 0:
-                self.results['rcuServiceLimit'] = [-1, 'You have exceeded the recommended 80% RCU limit by ' + str(_rcuLimitCount) + ' count in the past 7 days.']
+                self.addFinding('rcuServiceLimit', 'You have exceeded the recommended 80% RCU limit by ' + str(_rcuLimitCount) + ' count in the past 7 days.')
             
             if _wcuLimitCount > 0:
-                self.results['wcuServiceLimit'] = [-1, 'You have exceeded the recommended 80% WCU limit by ' + str(_wcuLimitCount) + ' count in the past 7 days.']
+                self.addFinding('wcuServiceLimit', 'You have exceeded the recommended 80% WCU limit by ' + str(_wcuLimitCount) + ' count in the past 7 days.')
             
         except botocore.exceptions.CLientError as e:
             ecode = e.response['Error']['Code']
@@ -404,16 +407,16 @@ class DynamoDbCommon(Evaluator):
                         _rcuTarget = eachScalingPolicies['TargetTrackingScalingPolicyConfiguration']['TargetValue']
                 
                 if _rcuTarget >= 80.0: 
-                    self.results['autoScalingHighUtil'] = [-1, 'High utilization policy for RCU with value ' + str(_rcuTarget)]
+                    self.addFinding('autoScalingHighUtil', 'High utilization policy for RCU with value ' + str(_rcuTarget))
             
                 if _rcuTarget <= 50.0:
-                    self.results['autoScalingLowUtil'] = [-1, 'Low utilization policy for RCU with value ' + str(_rcuTarget)]
+                    self.addFinding('autoScalingLowUtil', 'Low utilization policy for RCU with value ' + str(_rcuTarget))
             
                 if _wcuTarget >= 80.0:
-                    self.results['autoScalingHighUtil'] = [-1, 'High utilization policy for WCU with value ' + str(_wcuTarget)]
+                    self.addFinding('autoScalingHighUtil', 'High utilization policy for WCU with value ' + str(_wcuTarget))
             
                 if _wcuTarget <= 50.0:
-                    self.results['autoScalingLowUtil'] = [-1, 'Low utilization policy for WCU with value ' + str(_wcuTarget)]
+                    self.addFinding('autoScalingLowUtil', 'Low utilization policy for WCU with value ' + str(_wcuTarget))
                    
         except botocore.exceptions as e:
             ecode = e.response['Error']['Code']
@@ -447,7 +450,7 @@ class DynamoDbCommon(Evaluator):
                 _systemErrorsCount += eachDatapoints['SampleCount']
             
             if _systemErrorsCount > 0:
-                self.results['systemErrors'] = [-1,  '['+ str(_systemErrorsCount)+ '] SystemError resulting in HTTP500 error code over the past 7 days']
+                self.addFinding('systemErrors', '['+ str(_systemErrorsCount)+ '] SystemError resulting in HTTP500 error code over the past 7 days')
                     
         except botocore.exceptions.CLientError as e:
             ecode = e.response['Error']['Code']
@@ -481,7 +484,7 @@ class DynamoDbCommon(Evaluator):
                 _throttledRequestErrors += eachDatapoints['SampleCount']
             
             if _throttledRequestErrors > 0:
-                self.results['throttledRequest'] = [-1, '[' + str(_throttledRequestErrors) + '] request throttled in the past 30 days']
+                self.addFinding('throttledRequest', '[' + str(_throttledRequestErrors) + '] request throttled in the past 30 days')
                     
         except botocore.exceptions.CLientError as e:
             ecode = e.response['Error']['Code']
@@ -11,12 +11,14 @@ from services.Evaluator import Evaluator
 
 class DynamoDbGeneric(Evaluator):
     
-    def __init__(self, tables, dynamoDbClient, cloudWatchClient, serviceQuotaClient, appScalingPolicyClient, backupClient, cloudTrailClient):
+    # tableCount: every table of the region, tables may be narrowed down by --filters
+    def __init__(self, tables, dynamoDbClient, cloudWatchClient, serviceQuota, appScalingPolicyClient, backupClient, cloudTrailClient, tableCount=None):
         super().__init__()
         self.tables = tables
+        self.tableCount = len(tables) if tableCount is None else tableCount
         self.dynamoDbClient = dynamoDbClient
         self.cloudWatchClient = cloudWatchClient
-        self.serviceQuotaClient = serviceQuotaClient
+        self.serviceQuota = serviceQuota
         self.appScalingPolicyClient = appScalingPolicyClient
         self.backupClient = backupClient
         self.cloudTrailClient = cloudTrailClient
@@ -24,16 +26,14 @@ class DynamoDbGeneric(Evaluator):
     # logic to check service limits Max table / region
     def _check_service_limits_max_table_region(self):
         try:
-            #Retrieve quota for DynamoDb = L-F98FE922
-            serviceQuotasResutls = self.serviceQuotaClient.list_service_quotas(ServiceCode='dynamodb')
-            for quotas in serviceQuotasResutls['Quotas']:
-                #Check for max table / region
-                if quotas['QuotaCode'] == 'L-F98FE922':
-                    y = int(80 * quotas['Value'] / 100)
-                    x = len(self.tables)
-                    if x >= y:
-                        self.results['serviceLimitMaxTablePerRegion'] = [-1, 'You have used ' + str(x) + ' tables from available limit of ' + str(int(quotas['Value']))]
-        except botocore.exceptions.CLientError as e:
+            #Retrieve quota for DynamoDb = L-F98FE922 (max table / region)
+            quotaValue = self.serviceQuota.quota('dynamodb', 'L-F98FE922')
+            if quotaValue is not None:
+                y = int(80 * quotaValue / 100)
+                x = self.tableCount
+                if x >= y:
+                    self.addFinding('serviceLimitMaxTablePerRegion', 'You have used ' + str(x) + ' tables from available limit of ' + str(int(quotaValue)))
+        except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
             print(ecode)
             
@@ -77,7 +77,7 @@ class DynamoDbGeneric(Evaluator):
             
             
             if numOfDeleteBackup > 0:
-                self.results['trailDeleteBackup'] = [-1, 'There was ' + str(numOfDeleteBackup) + ' backup deleted in the past 30 days']
+                self.addFinding('trailDeleteBackup', 'There was ' + str(numOfDeleteBackup) + ' backup deleted in the past 30 days')
             
         except botocore.exceptions.CLientError as e:
             ecode = e.response['Error']['Code']
@@ -122,7 +122,7 @@ class DynamoDbGeneric(Evaluator):
             numOfDeleteTable = len(_deletedTablesArr)
 
             if numOfDeleteTable > 0:
-                self.results['trailDeleteTable'] = [-1, 'There was ' + str(numOfDeleteTable) + ' tables deleted in the past 30 days.']
+                self.addFinding('trailDeleteTable', 'There was ' + str(numOfDeleteTable) + ' tables deleted in the past 30 days.')
 
         except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
@@ -74,37 +74,54 @@ class Iam(Service):
     def advise(self):
         objs = {}
         
-        print('... (IAM:Account) inspecting')
-        obj = IamAccount(None, self.iamClient)
-        obj.run()
-        objs['Account::Config'] = obj.getInfo()
+        objs['Account::Config'] = self.getJournaledResult('Account::Config')
+        if objs['Account::Config'] is None:
+            print('... (IAM:Account) inspecting')
+            obj = IamAccount(None, self.iamClient)
+            obj.run()
+            objs['Account::Config'] = self.recordResult('Account::Config', obj.getInfo())
         
         users = self.getUsers()
         for user in users:
+            identifier = "root_id" if user['user'] == "<root_account>" else user['user']
+            key = 'User::' + identifier
+            objs[key] = self.getJournaledResult(key)
+            if objs[key] is not None:
+                continue
+            
             print('... (IAM::User) inspecting ' + user['user'])
             obj = IamUser(user, self.iamClient)
             obj.run()
             
-            identifier = "<b>root_id</b>" if user['user'] == "<root_account>" else user['user']
-            objs['User::' + identifier] = obj.getInfo()
+            objs[key] = self.recordResult(key, obj.getInfo())
             del obj
         
         roles = self.getRoles()
         for role in roles:
+            key = 'Role::' + role['RoleName']
+            objs[key] = self.getJournaledResult(key)
+            if objs[key] is not None:
+                continue
+            
             print('... (IAM::Role) inspecting ' + role['RoleName'])
             obj = IamRole(role, self.iamClient)
             obj.run()
             
-            objs['Role::' + role['RoleName']] = obj.getInfo()
+            objs[key] = self.recordResult(key, obj.getInfo())
             del obj
         
         groups = self.getGroups()
         for group in groups:
+            key = 'Group::' + group['GroupName']
+            objs[key] = self.getJournaledResult(key)
+            if objs[key] is not None:
+                continue
+            
             print('... (IAM::Group) inspecting ' + group['GroupName'])
             obj = IamGroup(group, self.iamClient)
             obj.run()
             
-            objs['Group::' + group['GroupName']] = obj.getInfo()
+            objs[key] = self.recordResult(key, obj.getInfo())
             del obj
         
         return objs
@@ -47,16 +47,11 @@ class IamAccount(IamCommon):
             
             score = self.passwordPolicyScoring(policies)
             
-            currVal = []
             if score <= self.PASSWORD_POLICY_MIN_SCORE:
-                for policy, num in policies.items():
-                    currVal.append(f"{policy}={num}")
-                    
-                output = '<br>'.join(currVal)
-                self.results['passwordPolicyWeak'] = [-1, output]
+                self.addFinding('passwordPolicyWeak', dict(policies))
                 
         except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
             print(ecode)
             if ecode == 'NoSuchEntity':
-                self.results['passwordPolicy'] = [-1, ecode]
\ No newline at end of file
+                self.addFinding('passwordPolicy', ecode)
\ No newline at end of file
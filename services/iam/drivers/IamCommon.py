@@ -33,7 +33,7 @@ class IamCommon(Evaluator):
             hasFullAccess = -1 # instead of false/true, easier handling on cache checking using !empty
             for policy in policies:
                 if policy['PolicyName'] == 'AdministratorAccess':
-                    self.results['FullAdminAccess'] = [-1, 'AdministratorAccess']
+                    self.addFinding('FullAdminAccess', 'AdministratorAccess')
                     continue
 
                 cache = Config.get(cachePrefix + policy['PolicyArn'], "")
@@ -62,11 +62,11 @@ class IamCommon(Evaluator):
             Config.set(cachePrefix + policy['PolicyArn'], hasFullAccess)
 
         if policyWithFullAccess:
-            self.results['ManagedPolicyFullAccessOneServ'] = [-1, '<br>'.join(policyWithFullAccess)]
+            self.addFinding('ManagedPolicyFullAccessOneServ', policyWithFullAccess)
             
     def evaluateInlinePolicy(self, inlinePolicies, identifier, entityType):
         if inlinePolicies:
-            self.results['InlinePolicy'] = [-1, '<br>'.join(inlinePolicies)]
+            self.addFinding('InlinePolicy', inlinePolicies)
             inlinePoliciesWithAdminAccess = []
             inlinePoliciesWithFullAccess = []
             for policy in inlinePolicies:
@@ -89,7 +89,7 @@ class IamCommon(Evaluator):
                     inlinePoliciesWithAdminAccess.append(policy)
                 
             if inlinePoliciesWithFullAccess:
-                self.results['InlinePolicyFullAccessOneServ'] = [-1, '<br>'.join(inlinePoliciesWithFullAccess)]
+                self.addFinding('InlinePolicyFullAccessOneServ', inlinePoliciesWithFullAccess)
             
             if inlinePoliciesWithAdminAccess:
-                self.results['InlinePolicyFullAdminAccess'] = [-1, '<br>'.join(inlinePoliciesWithAdminAccess)]
\ No newline at end of file
+                self.addFinding('InlinePolicyFullAdminAccess', inlinePoliciesWithAdminAccess)
\ No newline at end of file
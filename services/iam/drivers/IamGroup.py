@@ -17,7 +17,7 @@ class IamGroup(IamCommon):
         resp = self.iamClient.get_group(GroupName = group)
         users = resp.get('Users')
         if len(users) == 0:
-            self.results['groupEmptyUsers'] = [-1, 'No users']
+            self.addFinding('groupEmptyUsers', 'No users')
             
     def _checkGroupPolicyPermission(self):
         group = self.group['GroupName']
@@ -24,10 +24,10 @@ class IamRole(IamCommon):
         self.role['RoleLastUsed'] = detail['RoleLastUsed']
         
     #def _checkMocktest(self):
-    #    self.results['Mocktest'] = [-1, 'GG']
+    #    self.addFinding('Mocktest', 'GG')
     
     #def _checkMocktest2(self):    
-    #    self.results['Mocktest2'] = [-1, 'GG']
+    #    self.addFinding('Mocktest2', 'GG')
         
     def _checkRoleOldAge(self):
         c = self.iamClient
@@ -39,7 +39,7 @@ class IamRole(IamCommon):
             days = diff.days
             
             if days > self.MAXROLENOTUSEDDAYS:
-                self.results['unusedRole'] = [-1, "<b>{}</b> days passed".format(days)]
+                self.addFinding('unusedRole', "{} days passed".format(days))
                 
             return
         
@@ -48,11 +48,11 @@ class IamRole(IamCommon):
         days = diff.days
         
         if days > 30:
-            self.results['unusedRole'] = [-1, "{} days".format(days)]
+            self.addFinding('unusedRole', "{} days".format(days))
     
     def _checkLongSessionDuration(self):
         if self.role['MaxSessionDuration'] > self.MAXSESSIONDURATION:
-            self.results['roleLongSession'] = [-1, self.role['MaxSessionDuration']]
+            self.addFinding('roleLongSession', self.role['MaxSessionDuration'])
             
     def _checkRolePolicy(self):
         role = self.role['RoleName']
@@ -18,7 +18,7 @@ class IamUser(IamCommon):
     def _checkHasMFA(self):
         xkey = "rootMfaActive" if self.user['user'] == "<root_account>" else "mfaActive"
         if self.user['mfa_active'] == 'false':
-            self.results[xkey] = [-1, 'Inactive']
+            self.addFinding(xkey, 'Inactive')
 
     def _checkConsoleLastAccess(self):
         key = ''
@@ -38,7 +38,7 @@ class IamUser(IamCommon):
             key = False
             
         if key != False:
-            self.results[key] = [-1, daySinceLastAccess]
+            self.addFinding(key, daySinceLastAccess)
             
     def _checkPasswordLastChange(self):
         if self.user['password_last_changed'] in self.ENUM_NO_INFO:
@@ -54,7 +54,7 @@ class IamUser(IamCommon):
             key = False
             
         if key != False:
-            self.results[key] = [-1, daySinceLastChange]
+            self.addFinding(key, daySinceLastChange)
     
     def _checkUserInGroup(self):
         user = self.user['user']
@@ -64,7 +64,7 @@ class IamUser(IamCommon):
         resp = self.iamClient.list_groups_for_user(UserName = user)
         groups = resp.get('Groups')
         if not groups:
-            self.results['userNotUsingGroup'] = [-1, '-']
+            self.addFinding('userNotUsingGroup', '-')
             
     def _checkUserPolicy(self):
         user = self.user['user']
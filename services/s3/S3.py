@@ -1,5 +1,6 @@
 import boto3
 import botocore
+from botocore.config import Config as BotoConfig
 
 import json
 import time
@@ -7,62 +8,101 @@ import time
 from utils.Config import Config
 from utils.Tools import _pr
 from services.Service import Service
+from services.s3.drivers.S3BucketRegistry import S3BucketRegistry
+from services.s3.drivers.S3BucketConfigCollector import S3BucketConfigCollector
+from services.s3.drivers.S3Bucket import S3Bucket
+from services.s3.drivers.S3ObjectSampler import S3ObjectSampler
+from services.s3.drivers.S3InventoryReport import S3InventoryReport
+
 class S3(Service):
     def __init__(self, region):
         super().__init__(region)
         self.region = region
         
-        self.s3Client = boto3.client('s3')
+        ## sized for the registry's get_bucket_location fan-out
+        self.s3Client = boto3.client('s3', config=BotoConfig(
+            max_pool_connections=S3BucketRegistry.MAX_WORKERS
+        ))
         self.s3Control = boto3.client('s3control')
         
+        ## regional client sized for the bucket configuration fan-out and the sampler's head calls
+        self.s3RegionalClient = boto3.client('s3', region_name=region, config=BotoConfig(
+            max_pool_connections=S3BucketConfigCollector.MAX_WORKERS + S3ObjectSampler.MAX_WORKERS
+        ))
+        
         # buckets = Config.get('s3::buckets', [])
     
-    def getResources():
-        buckets = Config.get('s3::buckets', [])
-        # $buckets = ['ap-southeast-1' => ['kuettai-personal']];
-        if not buckets:
-            buckets = []
-            results = self.s3Client.list_buckets()
-            
-            arr = results.get('Buckets')
-            while results.get('Maker') is not None:
-                results = self.s3Client.list_buckets(
-                    Maker = results.get('Maker')
-                )    
-                arr = arr + results.get('Buckets')
-            
-            for ind, bucket in enumerate(arr):
-                loc = self.s3Client.get_bucket_location(
-                    Bucket = bucket['Name'] 
-                )
-                
-                reg = loc.get('LocationConstraint')
-                buckets[reg].append(arr[ind])
-            
-            Config.set('s3::buckets', buckets)
-        
-        if self.region in buckets:
-            _buckets = buckets[self.region]
-        else:
+    def getResources(self):
+        ## account-wide inventory, built once per run and shared by every regional S3 scan
+        _buckets = S3BucketRegistry(self.s3Client, account=Config.get('account', None)).getBuckets(self.region)
+        if not _buckets:
             return []
             
         if not self.tags:
             return _buckets
         
+        ## tag index lookup, untagged buckets are skipped without any S3 call
+        tagIndex = self.getTagIndex()
         filteredBuckets = []
         for bucket in _buckets:
-            try:
-                result = self.s3Client.get_bucket_tagging(Bucket = bucket['Name'])
-                tags =result.get('TagSet')
+            if tagIndex.isAvailable():
+                matched = tagIndex.matches('arn:aws:s3:::' + bucket['Name'], self.tags)
+            else:
+                matched = self.resourceHasTags(self.getBucketTags(bucket['Name']))
             
-                if self.resourceHasTags(tags):
-                    filteredBuckets.append(bucket)
-            except S3E as e:
-                ## Do nothing, no tags has been define;clear
-                pass
+            if matched:
+                filteredBuckets.append(bucket)
             
         return filteredBuckets    
+    
+    ## per bucket fallback when the region's tag index could not be built
+    def getBucketTags(self, bucketName):
+        try:
+            return self.s3Client.get_bucket_tagging(Bucket = bucketName).get('TagSet')
+        except botocore.exceptions.ClientError as e:
+            ## NoSuchTagSet: no tags defined
+            return []
+    
+    def advise(self):
+        objs = {}
+        
+        pendingBuckets = []
+        for bucket in self.getResources():
+            key = 'Bucket::' + bucket['Name']
+            objs[key] = self.getJournaledResult(key)
+            if objs[key] is None:
+                pendingBuckets.append(bucket)
+        
+        ## object level statistics, opt-in: the bucket's S3 Inventory report when it publishes one,
+        ## else sampling, which costs up to S3ObjectSampler.MAX_LIST_CALLS + SAMPLE_SIZE calls per bucket
+        inventory = sampler = None
+        if Config.get('s3::inventoryReports', False):
+            inventory = S3InventoryReport(self.s3RegionalClient)
+        if Config.get('s3::sampleObjects', False):
+            sampler = S3ObjectSampler(self.s3RegionalClient)
+        
+        def objectSample(name):
+            sample = inventory.collect(name) if inventory is not None else None
+            if sample is None and sampler is not None:
+                sample = sampler.sample(name)
+            return sample
+        
+        ## sampling runs in the collector's pool, next to the configuration calls
+        collector = S3BucketConfigCollector(self.s3RegionalClient, objectSampler=objectSample if inventory or sampler else None)
+        for bucketConfig in collector.collect(pendingBuckets):
+            print('... (S3::Bucket) inspecting ' + bucketConfig.name)
+            
+            obj = S3Bucket(bucketConfig, self.s3RegionalClient)
+            obj.run()
+            
+            key = 'Bucket::' + bucketConfig.name
+            objs[key] = self.recordResult(key, obj.getInfo())
+            del obj
+        
+        return objs
         
 if __name__ == "__main__":
+    Config.init()
     o = S3('ap-southeast-1')
-    o.advise()
\ No newline at end of file
+    out = o.advise()
+    _pr(out)
\ No newline at end of file
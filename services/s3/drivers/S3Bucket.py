@@ -7,10 +7,138 @@ from utils.Config import Config
 from utils.Policy import Policy
 from services.Evaluator import Evaluator
 
+## Checks run on the configuration pre-fetched by S3BucketConfigCollector, no API calls here.
+## An attribute left as None means the GET call failed (e.g. AccessDenied) and the check is skipped.
 class S3Bucket(Evaluator):
-    def __init__(self, bucket, s3Client):
+    STANDARD_STORAGE_RATIO = 0.5
+    ## grantee groups of http://acs.amazonaws.com/groups/global/
+    PUBLIC_ACL_GROUPS = ['AllUsers', 'AuthenticatedUsers']
+
+    def __init__(self, bucketConfig, s3Client):
         super().__init__()
-        self.bucket = bucket
+        self.bucketConfig = bucketConfig
+        self.bucket = bucketConfig.name
         self.s3Client = s3Client
-        
-        self.init()
\ No newline at end of file
+
+        self.init()
+
+    def _checkEncrypted(self):
+        if self.bucketConfig.encryption == []:
+            self.addFinding('ServerSideEncrypted', 'Off')
+
+    def _checkPublicAccessBlock(self):
+        pab = self.bucketConfig.publicAccessBlock
+        if pab is None:
+            return
+
+        disabled = []
+        for setting in ['BlockPublicAcls', 'IgnorePublicAcls', 'BlockPublicPolicy', 'RestrictPublicBuckets']:
+            if pab.get(setting) != True:
+                disabled.append(setting)
+
+        if disabled:
+            self.addFinding('PublicAccessBlock', disabled)
+
+    def _checkVersioning(self):
+        versioning = self.bucketConfig.versioning
+        if versioning is None:
+            return
+
+        if versioning['Status'] != 'Enabled':
+            self.addFinding('BucketVersioning', versioning['Status'])
+
+        if versioning['MFADelete'] != 'Enabled':
+            self.addFinding('MFADelete', versioning['MFADelete'])
+
+    def _checkObjectLock(self):
+        objectLock = self.bucketConfig.objectLock
+        if objectLock is None:
+            return
+
+        if objectLock.get('ObjectLockEnabled') != 'Enabled':
+            self.addFinding('ObjectLock', 'Off')
+
+    def _checkReplication(self):
+        if self.bucketConfig.replication == []:
+            self.addFinding('BucketReplication', 'Off')
+
+    def _checkLifecycle(self):
+        if self.bucketConfig.lifecycle == []:
+            self.addFinding('BucketLifecycle', 'Off')
+
+    def _checkLogging(self):
+        if self.bucketConfig.logging == {}:
+            self.addFinding('BucketLogging', 'Off')
+
+    ## ACLs stay in effect unless object ownership is BucketOwnerEnforced (no rule: ObjectWriter)
+    def _checkAclsDisabled(self):
+        rules = self.bucketConfig.ownershipControls
+        if rules is None:
+            return
+
+        ownership = rules[0].get('ObjectOwnership', 'ObjectWriter') if rules else 'ObjectWriter'
+        if ownership != 'BucketOwnerEnforced':
+            self.addFinding('AclsDisabled', ownership)
+
+    def _checkPublicAclGrants(self):
+        grants = self.bucketConfig.acl
+        if grants is None:
+            return
+
+        public = []
+        for grant in grants:
+            group = grant.get('Grantee', {}).get('URI', '').rsplit('/', 1)[-1]
+            if group in self.PUBLIC_ACL_GROUPS:
+                public.append("{}:{}".format(group, grant.get('Permission')))
+
+        if public:
+            self.addFinding('PublicAclGrants', public)
+
+    def _checkTlsEnforced(self):
+        policy = self.bucketConfig.policy
+        if policy is None:
+            return
+
+        statements = policy.get('Statement', [])
+        statements = statements if isinstance(statements, list) else [statements]
+        for statement in statements:
+            if statement.get('Effect') != 'Deny':
+                continue
+
+            secureTransport = statement.get('Condition', {}).get('Bool', {}).get('aws:SecureTransport')
+            if secureTransport in ['false', False]:
+                return
+
+        self.addFinding('TlsEnforced', 'Off')
+
+    ## Object level checks, estimates from S3ObjectSampler
+    def _checkUnencryptedObjects(self):
+        sample = self.bucketConfig.objectSample
+        if sample is None or sample.sampleSize == 0:
+            return
+
+        ratio, low, high = sample.unencryptedRatio()
+        if sample.encryption.get('NONE', 0) == 0:
+            return
+
+        ## the interval only holds for a sample drawn over the whole bucket
+        if sample.complete:
+            self.addFinding('UnencryptedObjects', "~{:.0%} of objects (95% CI {:.0%}-{:.0%}, sample of {})".format(ratio, low, high, sample.sampleSize))
+        else:
+            self.addFinding('UnencryptedObjects', "{} unencrypted in a sample of {} (partial scan, lower bound)".format(sample.encryption['NONE'], sample.sampleSize))
+
+    def _checkIntelligentTiering(self):
+        sample = self.bucketConfig.objectSample
+        if sample is None or sample.scannedBytes == 0:
+            return
+
+        if sample.storageClassRatio('INTELLIGENT_TIERING') == 0 and sample.storageClassRatio('STANDARD') >= self.STANDARD_STORAGE_RATIO:
+            self.addFinding('ObjectsInIntelligentTier', "{:.0%} of scanned bytes in STANDARD".format(sample.storageClassRatio('STANDARD')))
+
+    def _checkStaleMultipartUploads(self):
+        sample = self.bucketConfig.objectSample
+        if sample is None or not sample.multipartListed:
+            return
+
+        if sample.staleMultipartUploads > 0:
+            self.addFinding('StaleMultipartUploads', sample.staleMultipartUploads)
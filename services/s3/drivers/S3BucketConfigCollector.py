@@ -0,0 +1,130 @@
+import copy
+import json
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import boto3
+import botocore
+
+## Pre-fetched configuration of a single bucket, consumed by S3Bucket.
+## Every attribute holds the typed "not configured" value when the bucket has no such
+## configuration, and None only when the call itself failed (see errors).
+class S3BucketConfig:
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.name = bucket['Name']
+        self.errors = {}
+
+        for attr in S3BucketConfigCollector.OPERATIONS:
+            setattr(self, attr, None)
+
+        ## S3ObjectSample, only when object sampling is enabled (see objectSampler)
+        self.objectSample = None
+
+## Issues the per-bucket GET calls concurrently. All (bucket, call) pairs share one pool, so
+## calls of the next buckets are already in flight while the slow calls of earlier buckets
+## finish; the pool size is the global concurrency cap.
+## objectSampler: bucket name -> S3ObjectSample or None, run in the same pool as one more call
+## per bucket so a slow sample does not hold back the configuration of the next buckets.
+class S3BucketConfigCollector:
+    MAX_WORKERS = 32
+    OBJECT_SAMPLE = 'objectSample'
+
+    ## attr: [client method, response extractor, "not configured" error codes, empty value]
+    OPERATIONS = {
+        'encryption': ['get_bucket_encryption', lambda r: r['ServerSideEncryptionConfiguration']['Rules'], ['ServerSideEncryptionConfigurationNotFoundError'], []],
+        'versioning': ['get_bucket_versioning', lambda r: {'Status': r.get('Status', 'Off'), 'MFADelete': r.get('MFADelete', 'Disabled')}, [], {}],
+        'publicAccessBlock': ['get_public_access_block', lambda r: r['PublicAccessBlockConfiguration'], ['NoSuchPublicAccessBlockConfiguration'], {}],
+        'ownershipControls': ['get_bucket_ownership_controls', lambda r: r['OwnershipControls']['Rules'], ['OwnershipControlsNotFoundError'], []],
+        'logging': ['get_bucket_logging', lambda r: r.get('LoggingEnabled', {}), [], {}],
+        'lifecycle': ['get_bucket_lifecycle_configuration', lambda r: r.get('Rules', []), ['NoSuchLifecycleConfiguration'], []],
+        'policy': ['get_bucket_policy', lambda r: json.loads(r['Policy']), ['NoSuchBucketPolicy'], {}],
+        'acl': ['get_bucket_acl', lambda r: r.get('Grants', []), [], []],
+        'replication': ['get_bucket_replication', lambda r: r['ReplicationConfiguration'].get('Rules', []), ['ReplicationConfigurationNotFoundError'], []],
+        'objectLock': ['get_object_lock_configuration', lambda r: r['ObjectLockConfiguration'], ['ObjectLockConfigurationNotFoundError'], {}]
+    }
+
+    def __init__(self, s3Client, maxWorkers=MAX_WORKERS, objectSampler=None):
+        self.s3Client = s3Client
+        self.maxWorkers = maxWorkers
+        self.objectSampler = objectSampler
+
+    ## Yields one S3BucketConfig per bucket as soon as all of its calls returned
+    def collect(self, buckets):
+        buckets = iter(buckets)
+        maxInflight = self.maxWorkers * 2
+        configs = {}
+        remaining = {}
+        queue = []
+        pending = set()
+        operations = list(self.OPERATIONS)
+        if self.objectSampler is not None:
+            operations.append(self.OBJECT_SAMPLE)
+
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            while True:
+                while len(pending) < maxInflight:
+                    if not queue:
+                        bucket = next(buckets, None)
+                        if bucket is None:
+                            break
+
+                        cfg = S3BucketConfig(bucket)
+                        configs[cfg.name] = cfg
+                        remaining[cfg.name] = len(operations)
+                        queue = [(cfg.name, attr) for attr in operations]
+
+                    name, attr = queue.pop(0)
+                    pending.add(executor.submit(self._fetch, name, attr))
+
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, attr, value, ecode = future.result()
+                    cfg = configs[name]
+                    setattr(cfg, attr, value)
+                    if ecode is not None:
+                        cfg.errors[attr] = ecode
+
+                    remaining[name] -= 1
+                    if remaining[name] == 0:
+                        del remaining[name]
+                        yield configs.pop(name)
+
+    def _fetch(self, name, attr):
+        if attr == self.OBJECT_SAMPLE:
+            return self._fetchObjectSample(name)
+
+        method, extract, notConfigured, emptyValue = self.OPERATIONS[attr]
+        try:
+            resp = getattr(self.s3Client, method)(Bucket = name)
+            return name, attr, extract(resp), None
+        except botocore.exceptions.ClientError as e:
+            ecode = e.response['Error']['Code']
+            if ecode in notConfigured:
+                return name, attr, copy.copy(emptyValue), None
+
+            return name, attr, None, ecode
+        except botocore.exceptions.BotoCoreError as e:
+            ## EndpointConnectionError, ReadTimeoutError, ... recorded by class name
+            return name, attr, None, type(e).__name__
+        except Exception as e:
+            ## unexpected response shape (KeyError / TypeError / ValueError in the extractor),
+            ## one bad call must not abort the whole collection
+            print("[S3BucketConfigCollector] {} {}: {}".format(name, method, repr(e)))
+            return name, attr, None, type(e).__name__
+
+    ## the samplers record their own call errors, anything else leaves the bucket unsampled
+    def _fetchObjectSample(self, name):
+        try:
+            return name, self.OBJECT_SAMPLE, self.objectSampler(name), None
+        except Exception as e:
+            print("[S3BucketConfigCollector] {} object sample: {}".format(name, repr(e)))
+            return name, self.OBJECT_SAMPLE, None, type(e).__name__
+
+if __name__ == "__main__":
+    c = boto3.client('s3')
+    buckets = c.list_buckets().get('Buckets')
+    for cfg in S3BucketConfigCollector(c).collect(buckets):
+        print(cfg.name, cfg.versioning, cfg.errors)
@@ -0,0 +1,158 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import botocore
+
+import constants as _C
+from utils.Config import Config
+
+## Account-wide bucket inventory: list buckets once, resolve regions concurrently and keep
+## the bucket->region map on disk so later runs only resolve newly created buckets.
+## Every regional S3 scan then takes its slice from the per-run cache.
+## The disk cache is kept per account, each bucket with the time its region was resolved.
+## s3Client needs max_pool_connections >= maxWorkers (see S3), or calls queue for a connection.
+class S3BucketRegistry:
+    CACHE_KEY = 's3::buckets'
+    CACHE_FILE = _C.FORK_DIR + '/s3-bucket-regions.json'
+    CACHE_VERSION = 2
+    CACHE_TTL = 7 * 24 * 60 * 60
+    MAX_WORKERS = 32
+    PAGE_SIZE = 1000
+
+    def __init__(self, s3Client, account=None, maxWorkers=MAX_WORKERS, cacheFile=CACHE_FILE, cacheTtl=CACHE_TTL):
+        self.s3Client = s3Client
+        self.account = account or 'unknown'
+        self.maxWorkers = maxWorkers
+        self.cacheFile = cacheFile
+        self.cacheTtl = cacheTtl
+
+    def getBuckets(self, region=None):
+        buckets = Config.get(self.CACHE_KEY, None)
+        if buckets is None:
+            buckets = self.buildIndex()
+            Config.set(self.CACHE_KEY, buckets)
+
+        if region is None:
+            return buckets
+
+        return buckets.get(region, [])
+
+    def buildIndex(self):
+        arr = self.listBuckets()
+        known = self._loadRegionCache()
+        now = time.time()
+
+        ## {name: [region, resolved at]}
+        regionByName = {}
+        unresolved = []
+        for bucket in arr:
+            name = bucket['Name']
+            if bucket.get('BucketRegion'):
+                regionByName[name] = [bucket['BucketRegion'], now]
+            elif name in known:
+                regionByName[name] = known[name]
+            else:
+                unresolved.append(name)
+
+        if unresolved:
+            with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+                for name, reg in zip(unresolved, executor.map(self._getBucketRegion, unresolved)):
+                    if reg is not None:
+                        regionByName[name] = [reg, now]
+
+        buckets = {}
+        for bucket in arr:
+            entry = regionByName.get(bucket['Name'])
+            if entry is None:
+                continue
+
+            buckets.setdefault(entry[0], []).append(bucket)
+
+        self._saveRegionCache(regionByName)
+        return buckets
+
+    def listBuckets(self):
+        try:
+            results = self.s3Client.list_buckets(MaxBuckets=self.PAGE_SIZE)
+        except botocore.exceptions.ParamValidationError:
+            ## older botocore, ListBuckets is not paginated and has no BucketRegion
+            return self.s3Client.list_buckets().get('Buckets', [])
+
+        arr = results.get('Buckets', [])
+        while results.get('ContinuationToken') is not None:
+            results = self.s3Client.list_buckets(
+                MaxBuckets = self.PAGE_SIZE,
+                ContinuationToken = results.get('ContinuationToken')
+            )
+            arr = arr + results.get('Buckets', [])
+
+        return arr
+
+    def _getBucketRegion(self, name):
+        try:
+            loc = self.s3Client.get_bucket_location(Bucket = name)
+        except botocore.exceptions.ClientError as e:
+            ecode = e.response['Error']['Code']
+            print("[S3BucketRegistry] Unable to locate bucket {}: {}".format(name, ecode))
+            return None
+        except botocore.exceptions.BotoCoreError as e:
+            print("[S3BucketRegistry] Unable to locate bucket {}: {}".format(name, type(e).__name__))
+            return None
+
+        reg = loc.get('LocationConstraint')
+        if not reg:
+            return 'us-east-1'
+
+        if reg == 'EU':
+            return 'eu-west-1'
+
+        return reg
+
+    ## {name: [region, resolved at]} of this account, entries older than cacheTtl are dropped
+    def _loadRegionCache(self):
+        now = time.time()
+        entries = self._readCache().get(self.account, {})
+        return {name: entry for name, entry in entries.items() if now - entry[1] <= self.cacheTtl}
+
+    ## {account: {name: [region, resolved at]}}, anything unreadable or older counts as empty
+    def _readCache(self):
+        if not self.cacheFile or not os.path.exists(self.cacheFile):
+            return {}
+
+        try:
+            with open(self.cacheFile, 'r') as f:
+                cache = json.load(f)
+        except ValueError:
+            return {}
+
+        if not isinstance(cache, dict) or cache.get('version') != self.CACHE_VERSION:
+            return {}
+
+        return cache.get('accounts', {})
+
+    def _saveRegionCache(self, regionByName):
+        if not self.cacheFile:
+            return
+
+        folder = os.path.dirname(self.cacheFile)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        ## only buckets still listed are kept, deleted buckets fall out of the cache; other
+        ## accounts are left as they are
+        accounts = self._readCache()
+        accounts[self.account] = regionByName
+
+        tmpFile = "{}.{}".format(self.cacheFile, os.getpid())
+        with open(tmpFile, 'w') as f:
+            json.dump({'version': self.CACHE_VERSION, 'accounts': accounts}, f)
+        os.replace(tmpFile, self.cacheFile)
+
+if __name__ == "__main__":
+    Config.init()
+    o = S3BucketRegistry(boto3.client('s3'))
+    for reg, buckets in o.getBuckets().items():
+        print(reg, len(buckets))
@@ -0,0 +1,243 @@
+import io
+import os
+import re
+import csv
+import gzip
+import json
+import shutil
+import tempfile
+
+import boto3
+import botocore
+
+from services.s3.drivers.S3ObjectSampler import S3ObjectSample, S3ObjectSampler
+
+## Object level statistics from the bucket's own S3 Inventory report instead of listing it.
+## The latest manifest.json is located from the inventory configuration, then every data file
+## is streamed and parsed row by row into an S3ObjectSample (gzip is decompressed on the fly,
+## so memory does not grow with the report size). ORC and Parquet need pyarrow.
+class S3InventoryReport:
+    FIELDS = ['Size', 'StorageClass', 'EncryptionStatus']
+    ## ORC / Parquet inventories use snake case column names
+    COLUMNAR_FIELDS = {'size': 'Size', 'storage_class': 'StorageClass', 'encryption_status': 'EncryptionStatus'}
+    ENCRYPTION_STATUS = {'NOT-SSE': 'NONE', 'SSE-S3': 'AES256', 'SSE-KMS': 'aws:kms', 'DSSE-KMS': 'aws:kms:dsse', 'SSE-C': 'SSE-C'}
+    MANIFEST_FOLDER = re.compile(r'/\d{4}-\d{2}-\d{2}T\d{2}-\d{2}Z/$')
+    BATCH_SIZE = 65536
+
+    def __init__(self, s3Client):
+        self.s3Client = s3Client
+
+    def collect(self, bucket):
+        config = self.findConfiguration(bucket)
+        if config is None:
+            return None
+
+        manifest = self.latestManifest(bucket, config)
+        if manifest is None:
+            return None
+
+        destBucket, manifest = manifest
+        fileFormat = manifest.get('fileFormat', '')
+        if not self.canParse(fileFormat):
+            print("[S3InventoryReport] {} inventory of {} cannot be read here, falling back".format(fileFormat, bucket))
+            return None
+
+        ## a data file that cannot be read leaves the statistics partial (complete = False);
+        ## when none can be read (e.g. AccessDenied or PermanentRedirect on a destination bucket
+        ## in another region) or one is corrupt the caller falls back to sampling
+        stats = S3ObjectSample(bucket)
+        parsed = 0
+        for dataFile in manifest.get('files', []):
+            try:
+                body = self.s3Client.get_object(Bucket=destBucket, Key=dataFile['key'])['Body']
+                self.parse(body, fileFormat, manifest.get('fileSchema', ''), stats)
+                parsed += 1
+            except botocore.exceptions.ClientError as e:
+                ecode = e.response['Error']['Code']
+                print("[S3InventoryReport] {} in {}: {}".format(dataFile['key'], destBucket, ecode))
+                stats.complete = False
+            except (botocore.exceptions.BotoCoreError, OSError, EOFError) as e:
+                print("[S3InventoryReport] {} in {}: {}".format(dataFile['key'], destBucket, e))
+                stats.complete = False
+            except (ValueError, csv.Error) as e:
+                ## malformed row or encoding (UnicodeDecodeError is a ValueError), the counts
+                ## already added from this file cannot be told apart
+                print("[S3InventoryReport] {} in {} is corrupt, falling back: {}".format(dataFile['key'], destBucket, repr(e)))
+                return None
+
+        if parsed == 0:
+            return None
+
+        S3ObjectSampler(self.s3Client).scanMultipartUploads(stats, bucket)
+        return stats
+
+    ## CSV always, ORC / Parquet when pyarrow is installed
+    def canParse(self, fileFormat):
+        fileFormat = fileFormat.upper()
+        if fileFormat == 'CSV':
+            return True
+
+        if fileFormat not in ['ORC', 'PARQUET']:
+            return False
+
+        try:
+            import pyarrow  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    ## Enabled inventory configuration carrying the fields we aggregate, None if there is none
+    def findConfiguration(self, bucket):
+        params = {'Bucket': bucket}
+        candidates = []
+        try:
+            while True:
+                resp = self.s3Client.list_bucket_inventory_configurations(**params)
+                for config in resp.get('InventoryConfigurationList', []):
+                    if config.get('IsEnabled') and config.get('Destination', {}).get('S3BucketDestination'):
+                        candidates.append(config)
+
+                if not resp.get('IsTruncated'):
+                    break
+
+                params['ContinuationToken'] = resp['NextContinuationToken']
+        except botocore.exceptions.ClientError as e:
+            ecode = e.response['Error']['Code']
+            print("[S3InventoryReport] list_bucket_inventory_configurations on {}: {}".format(bucket, ecode))
+            return None
+        except botocore.exceptions.BotoCoreError as e:
+            print("[S3InventoryReport] list_bucket_inventory_configurations on {}: {}".format(bucket, type(e).__name__))
+            return None
+
+        if not candidates:
+            return None
+
+        candidates.sort(key=lambda c: len(set(c.get('OptionalFields', [])) & set(self.FIELDS)), reverse=True)
+        return candidates[0]
+
+    ## [destination bucket, manifest dict] of the most recent delivery
+    def latestManifest(self, bucket, config):
+        dest = config['Destination']['S3BucketDestination']
+        destBucket = dest['Bucket'].split(':::')[-1]
+        prefix = dest.get('Prefix', '')
+        base = (prefix.rstrip('/') + '/' if prefix else '') + bucket + '/' + config['Id'] + '/'
+
+        folders = []
+        params = {'Bucket': destBucket, 'Prefix': base, 'Delimiter': '/'}
+        try:
+            while True:
+                resp = self.s3Client.list_objects_v2(**params)
+                for p in resp.get('CommonPrefixes', []):
+                    if self.MANIFEST_FOLDER.search(p['Prefix']):
+                        folders.append(p['Prefix'])
+
+                if not resp.get('IsTruncated'):
+                    break
+
+                params['ContinuationToken'] = resp['NextContinuationToken']
+
+            if not folders:
+                return None
+
+            ## folder names are ISO timestamps, lexical max is the latest delivery
+            resp = self.s3Client.get_object(Bucket=destBucket, Key=max(folders) + 'manifest.json')
+            return [destBucket, json.loads(resp['Body'].read())]
+        except botocore.exceptions.ClientError as e:
+            ecode = e.response['Error']['Code']
+            print("[S3InventoryReport] manifest of {} in {}: {}".format(bucket, destBucket, ecode))
+            return None
+        except botocore.exceptions.BotoCoreError as e:
+            print("[S3InventoryReport] manifest of {} in {}: {}".format(bucket, destBucket, e))
+            return None
+        except ValueError as e:
+            print("[S3InventoryReport] manifest of {} in {} is not valid JSON: {}".format(bucket, destBucket, e))
+            return None
+
+    ## Local data file, e.g. downloaded with `aws s3 cp`, handy to test offline
+    def parseFile(self, path, fileFormat, fileSchema='', stats=None):
+        if stats is None:
+            stats = S3ObjectSample(os.path.basename(path))
+
+        with open(path, 'rb') as f:
+            return self.parse(f, fileFormat, fileSchema, stats)
+
+    def parse(self, stream, fileFormat, fileSchema, stats):
+        fileFormat = fileFormat.upper()
+        if fileFormat == 'CSV':
+            return self._parseCsv(stream, fileSchema, stats)
+
+        if fileFormat in ['ORC', 'PARQUET']:
+            return self._parseColumnar(stream, fileFormat, stats)
+
+        raise Exception("Unsupported inventory format: " + fileFormat)
+
+    def _parseCsv(self, stream, fileSchema, stats):
+        columns = [c.strip() for c in fileSchema.split(',')]
+        pos = {field: columns.index(field) for field in self.FIELDS if field in columns}
+
+        for row in csv.reader(io.TextIOWrapper(self._decompress(stream), encoding='utf-8', newline='')):
+            self._addRow(stats, [row[pos[field]] if field in pos and pos[field] < len(row) else None for field in self.FIELDS])
+
+        return stats
+
+    def _parseColumnar(self, stream, fileFormat, stats):
+        try:
+            if fileFormat == 'PARQUET':
+                import pyarrow.parquet
+            else:
+                import pyarrow.orc
+        except ImportError:
+            print("[S3InventoryReport] pyarrow is required to read {} inventory reports".format(fileFormat))
+            return stats
+
+        ## both readers need a seekable file, spool to disk rather than memory
+        with tempfile.TemporaryFile() as tmp:
+            shutil.copyfileobj(stream, tmp)
+            tmp.seek(0)
+
+            if fileFormat == 'PARQUET':
+                pf = pyarrow.parquet.ParquetFile(tmp)
+                columns = [c for c in self.COLUMNAR_FIELDS if c in pf.schema_arrow.names]
+                batches = pf.iter_batches(batch_size=self.BATCH_SIZE, columns=columns)
+            else:
+                of = pyarrow.orc.ORCFile(tmp)
+                columns = [c for c in self.COLUMNAR_FIELDS if c in of.schema.names]
+                batches = (of.read_stripe(i, columns=columns) for i in range(of.nstripes))
+
+            for batch in batches:
+                data = batch.to_pydict()
+                values = [data.get(c, [None] * batch.num_rows) for c in self.COLUMNAR_FIELDS]
+                for row in zip(*values):
+                    self._addRow(stats, row)
+
+        return stats
+
+    ## row: [Size, StorageClass, EncryptionStatus]
+    def _addRow(self, stats, row):
+        size, storageClass, encryption = row
+        stats.addObject({'Size': int(size or 0), 'StorageClass': storageClass or 'STANDARD'})
+
+        if encryption:
+            encryption = self.ENCRYPTION_STATUS.get(encryption, encryption)
+            stats.sampleSize += 1
+            stats.encryption[encryption] = stats.encryption.get(encryption, 0) + 1
+
+    def _decompress(self, stream):
+        head = stream.peek(2)[:2] if hasattr(stream, 'peek') else b''
+        if head == b'\x1f\x8b':
+            return gzip.GzipFile(fileobj=stream)
+
+        if hasattr(stream, 'peek'):
+            return stream
+
+        ## S3 StreamingBody cannot peek, inventory CSV files are always gzipped
+        return gzip.GzipFile(fileobj=stream)
+
+if __name__ == "__main__":
+    import sys
+    o = S3InventoryReport(boto3.client('s3'))
+    if len(sys.argv) > 3:
+        print(o.parseFile(sys.argv[1], sys.argv[2], sys.argv[3]).toDict())
+    else:
+        stats = o.collect(sys.argv[1])
+        print(stats.toDict() if stats else 'No inventory report')
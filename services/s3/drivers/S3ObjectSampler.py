@@ -0,0 +1,225 @@
+import math
+import random
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import botocore
+
+## 95% Wilson score interval for a sampled proportion
+def wilsonInterval(hits, n, z=1.96):
+    if n == 0:
+        return [0.0, 0.0, 1.0]
+
+    p = hits / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return [p, max(0.0, centre - margin), min(1.0, centre + margin)]
+
+## Estimates produced by S3ObjectSampler for one bucket. Listing counters (storage class,
+## size) cover every key scanned; encryption is estimated from the head_object sample.
+class S3ObjectSample:
+    ## upper bounds of the size histogram buckets, in bytes
+    SIZE_BUCKETS = [128 * 1024, 1024 * 1024, 16 * 1024 * 1024, 128 * 1024 * 1024, 1024 * 1024 * 1024]
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.listCalls = 0
+        self.complete = True
+        self.scannedObjects = 0
+        self.scannedBytes = 0
+        self.storageClass = {}
+        self.storageClassBytes = {}
+        self.sizeHistogram = [0] * (len(self.SIZE_BUCKETS) + 1)
+
+        self.sampleSize = 0
+        self.encryption = {}
+        self.headErrors = 0
+
+        ## counters are only meaningful once list_multipart_uploads answered (multipartListed)
+        self.multipartListed = False
+        self.multipartUploads = 0
+        self.staleMultipartUploads = 0
+        self.multipartComplete = True
+
+    def addObject(self, obj):
+        size = obj.get('Size', 0)
+        storageClass = obj.get('StorageClass', 'STANDARD')
+
+        self.scannedObjects += 1
+        self.scannedBytes += size
+        self.storageClass[storageClass] = self.storageClass.get(storageClass, 0) + 1
+        self.storageClassBytes[storageClass] = self.storageClassBytes.get(storageClass, 0) + size
+
+        idx = 0
+        while idx < len(self.SIZE_BUCKETS) and size > self.SIZE_BUCKETS[idx]:
+            idx += 1
+        self.sizeHistogram[idx] += 1
+
+    ## [ratio, low, high] of objects without server side encryption
+    def unencryptedRatio(self):
+        return wilsonInterval(self.encryption.get('NONE', 0), self.sampleSize)
+
+    def storageClassRatio(self, storageClass):
+        if self.scannedBytes == 0:
+            return 0.0
+
+        return self.storageClassBytes.get(storageClass, 0) / self.scannedBytes
+
+    def toDict(self):
+        low, high = self.unencryptedRatio()[1:]
+        return {
+            'scannedObjects': self.scannedObjects,
+            'scannedBytes': self.scannedBytes,
+            'complete': self.complete,
+            'storageClass': self.storageClass,
+            'sizeHistogram': self.sizeHistogram,
+            'sampleSize': self.sampleSize,
+            'encryption': self.encryption,
+            'unencryptedRatio': [low, high],
+            'staleMultipartUploads': self.staleMultipartUploads if self.multipartListed else None
+        }
+
+## Streams list_objects_v2 pages into a fixed size reservoir, so memory stays at
+## sampleSize keys whatever the bucket size, and caps the number of list calls per bucket.
+## When the bucket is larger than the list budget, the budget is spread over the top level
+## prefixes so the scanned part is not only the lexicographic head of the bucket.
+class S3ObjectSampler:
+    SAMPLE_SIZE = 200
+    MAX_LIST_CALLS = 20
+    MAX_MULTIPART_CALLS = 5
+    MAX_WORKERS = 16
+    STALE_MULTIPART_DAYS = 7
+
+    def __init__(self, s3Client, sampleSize=SAMPLE_SIZE, maxListCalls=MAX_LIST_CALLS, maxWorkers=MAX_WORKERS, seed=None):
+        self.s3Client = s3Client
+        self.sampleSize = sampleSize
+        self.maxListCalls = maxListCalls
+        self.maxWorkers = maxWorkers
+        self.random = random.Random(seed)
+
+    def sample(self, bucket):
+        result = S3ObjectSample(bucket)
+        reservoir = []
+
+        ## first call splits the bucket into its top level prefixes
+        resp = self._list(result, Bucket=bucket, Delimiter='/')
+        if resp is None:
+            self.scanMultipartUploads(result, bucket)
+            return result
+
+        prefixes = [p['Prefix'] for p in resp.get('CommonPrefixes', [])]
+        if resp.get('IsTruncated'):
+            ## more root level keys (and possibly prefixes) than one page, plain scan of the bucket
+            prefixes = ['']
+        else:
+            self._consume(result, reservoir, resp)
+
+        budget = self.maxListCalls - result.listCalls
+        if len(prefixes) > budget:
+            result.complete = False
+            prefixes = self.random.sample(prefixes, budget)
+
+        for ind, prefix in enumerate(prefixes):
+            ## leftover calls of small prefixes go to the next ones
+            budget = self.maxListCalls - result.listCalls
+            calls = max(1, budget // (len(prefixes) - ind))
+            self._scanPrefix(result, reservoir, bucket, prefix, calls)
+
+        self._headSample(result, reservoir)
+        self.scanMultipartUploads(result, bucket)
+        return result
+
+    def _scanPrefix(self, result, reservoir, bucket, prefix, calls):
+        params = {'Bucket': bucket, 'Prefix': prefix}
+        for i in range(calls):
+            resp = self._list(result, **params)
+            if resp is None:
+                return
+
+            self._consume(result, reservoir, resp)
+            if not resp.get('IsTruncated'):
+                return
+
+            params['ContinuationToken'] = resp['NextContinuationToken']
+
+        result.complete = False
+
+    def _list(self, result, **params):
+        result.listCalls += 1
+        try:
+            return self.s3Client.list_objects_v2(**params)
+        except botocore.exceptions.ClientError as e:
+            ecode = e.response['Error']['Code']
+            print("[S3ObjectSampler] list_objects_v2 on {}: {}".format(params['Bucket'], ecode))
+            result.complete = False
+            return None
+        except botocore.exceptions.BotoCoreError as e:
+            ## ReadTimeoutError, EndpointConnectionError, ... the sample stays partial
+            print("[S3ObjectSampler] list_objects_v2 on {}: {}".format(params['Bucket'], type(e).__name__))
+            result.complete = False
+            return None
+
+    ## reservoir sampling (algorithm R) over every key listed
+    def _consume(self, result, reservoir, resp):
+        for obj in resp.get('Contents', []):
+            result.addObject(obj)
+            if len(reservoir) < self.sampleSize:
+                reservoir.append(obj['Key'])
+                continue
+
+            j = self.random.randrange(result.scannedObjects)
+            if j < self.sampleSize:
+                reservoir[j] = obj['Key']
+
+    def _headSample(self, result, reservoir):
+        if not reservoir:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            for encryption in executor.map(lambda key: self._headEncryption(result.bucket, key), reservoir):
+                if encryption is None:
+                    result.headErrors += 1
+                    continue
+
+                result.sampleSize += 1
+                result.encryption[encryption] = result.encryption.get(encryption, 0) + 1
+
+    def _headEncryption(self, bucket, key):
+        try:
+            resp = self.s3Client.head_object(Bucket=bucket, Key=key)
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError):
+            return None
+
+        return resp.get('ServerSideEncryption', 'NONE')
+
+    ## also used by S3InventoryReport, inventories do not list uploads in progress
+    def scanMultipartUploads(self, result, bucket):
+        threshold = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=self.STALE_MULTIPART_DAYS)
+        params = {'Bucket': bucket}
+        for i in range(self.MAX_MULTIPART_CALLS):
+            try:
+                resp = self.s3Client.list_multipart_uploads(**params)
+            except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError):
+                result.multipartComplete = False
+                return
+
+            result.multipartListed = True
+            for upload in resp.get('Uploads', []):
+                result.multipartUploads += 1
+                if upload['Initiated'] < threshold:
+                    result.staleMultipartUploads += 1
+
+            if not resp.get('IsTruncated'):
+                return
+
+            params['KeyMarker'] = resp.get('NextKeyMarker')
+            params['UploadIdMarker'] = resp.get('NextUploadIdMarker')
+
+        result.multipartComplete = False
+
+if __name__ == "__main__":
+    import sys
+    o = S3ObjectSampler(boto3.client('s3'))
+    print(o.sample(sys.argv[1]).toDict())
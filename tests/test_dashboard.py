@@ -0,0 +1,67 @@
+import itertools
+import unittest
+
+from utils.Dashboard import Dashboard
+
+class DashboardTest(unittest.TestCase):
+    def parts(self):
+        a = Dashboard()
+        a.addServiceRegion('iam', 'GLOBAL', 10, 3)
+        a.addCriticality('GLOBAL', 'H', 3)
+        a.addCategory('GLOBAL', 'S', 3)
+        a.addMap('iam', {'H': 3, 'S': 3, '_': {'S': 3}})
+
+        b = Dashboard()
+        b.addServiceRegion('ec2', 'ap-southeast-1', 5, 1)
+        b.addCriticality('ap-southeast-1', 'H', 1)
+        b.addCriticality('ap-southeast-1', 'M', 2)
+        b.addMap('ec2', {'H': 1, 'M': 2})
+
+        c = Dashboard()
+        c.addServiceRegion('ec2', 'ap-southeast-1', 2, 0)
+        c.addServiceRegion('ec2', 'us-east-1', 4, 2)
+        c.addCriticality('ap-southeast-1', 'M', 1)
+        c.addCategory('ap-southeast-1', 'R', 1)
+        c.addMap('ec2', {'M': 1, 'R': 1})
+
+        return [a, b, c]
+
+    def test_merge_sums_leaves(self):
+        merged = Dashboard.mergeAll(self.parts())
+
+        self.assertEqual(merged['SERV'], {
+            'iam': {'GLOBAL': {'Total': 10, 'H': 3}},
+            'ec2': {'ap-southeast-1': {'Total': 7, 'H': 1}, 'us-east-1': {'Total': 4, 'H': 2}}
+        })
+        self.assertEqual(merged['CRITICALITY'], {'GLOBAL': {'H': 3}, 'ap-southeast-1': {'H': 1, 'M': 3}})
+        self.assertEqual(merged['CATEGORY'], {'GLOBAL': {'S': 3}, 'ap-southeast-1': {'R': 1}})
+        self.assertEqual(merged['MAP']['ec2'], {'H': 1, 'M': 3, 'R': 1})
+
+    def test_merge_order(self):
+        expected = Dashboard.mergeAll(self.parts()).toDict()
+        for order in itertools.permutations(range(3)):
+            parts = self.parts()
+            self.assertEqual(Dashboard.mergeAll([parts[i] for i in order]).toDict(), expected)
+
+        ## (a + b) + c == a + (b + c)
+        a, b, c = self.parts()
+        self.assertEqual(a.merge(b.merge(c)).toDict(), expected)
+
+    def test_merge_leaves_source(self):
+        a, b, c = self.parts()
+        before = b.serialize()
+        a.merge(b)
+        a.merge(b)
+
+        self.assertEqual(b.serialize(), before)
+        self.assertEqual(a['CRITICALITY']['ap-southeast-1'], {'H': 2, 'M': 4})
+
+    def test_merge_dict(self):
+        a, b, c = self.parts()
+        merged = Dashboard().merge(a.toDict()).merge(Dashboard.unserialize(b.serialize()))
+
+        self.assertEqual(merged.toDict(), Dashboard.mergeAll([a, b]).toDict())
+        self.assertEqual(Dashboard(a.toDict()).toDict(), a.toDict())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+
+from services.FindingStore import FindingStore
+from services.FindingDiff import FindingSnapshot, FindingDiff, fingerprint
+from services.Reporter import reporter
+
+ACCOUNT = '123456789012'
+
+def snapshot(rows, account=ACCOUNT):
+    store = FindingStore()
+    for region, resource, check, value in rows:
+        store.add(region, resource, check, -1, value)
+
+    return FindingSnapshot.fromStore(store, account)
+
+class FindingDiffTest(unittest.TestCase):
+    def test_fingerprint(self):
+        self.assertEqual(fingerprint('a', 'b'), fingerprint('a', 'b'))
+        ## parts are separated, moving a character between them gives another hash
+        self.assertNotEqual(fingerprint('ab', 'c'), fingerprint('a', 'bc'))
+
+    def test_added_removed_changed(self):
+        old = snapshot([
+            ['GLOBAL', 'User::alice', 'mfaActive', 'Off'],
+            ['GLOBAL', 'User::bob', 'mfaActive', 'Off'],
+            ['GLOBAL', 'Role::ops', 'unusedRole', 90]
+        ])
+        new = snapshot([
+            ['GLOBAL', 'Role::ops', 'unusedRole', 120],
+            ['GLOBAL', 'User::alice', 'mfaActive', 'Off'],
+            ['GLOBAL', 'User::carol', 'mfaActive', 'Off']
+        ])
+        diff = FindingDiff(old, new)
+
+        self.assertTrue(diff.hasChanges())
+        self.assertEqual(diff.toDict(), {
+            'added': [['GLOBAL', 'User::carol', 'mfaActive']],
+            'removed': [['GLOBAL', 'User::bob', 'mfaActive']],
+            'changed': [['GLOBAL', 'Role::ops', 'unusedRole']],
+            'persisted': 1
+        })
+        self.assertEqual(diff.summaryByCheck(), {
+            'mfaActive': {'added': 1, 'removed': 1, 'changed': 0},
+            'unusedRole': {'added': 0, 'removed': 0, 'changed': 1}
+        })
+
+    def test_no_changes(self):
+        rows = [['GLOBAL', 'User::alice', 'mfaActive', 'Off'], ['GLOBAL', 'Role::ops', 'unusedRole', {'days': 90, 'tags': ['a']}]]
+        diff = FindingDiff(snapshot(rows), snapshot(list(reversed(rows))))
+
+        self.assertFalse(diff.hasChanges())
+        self.assertEqual(diff.persisted, 2)
+
+    def test_value_types(self):
+        ## non-string values are compared on their JSON form, key order does not matter
+        old = snapshot([['GLOBAL', 'Role::ops', 'unusedRole', {'a': 1, 'b': 2}], ['GLOBAL', 'Role::dev', 'unusedRole', 90]])
+        new = snapshot([['GLOBAL', 'Role::ops', 'unusedRole', {'b': 2, 'a': 1}], ['GLOBAL', 'Role::dev', 'unusedRole', [90]]])
+        diff = FindingDiff(old, new)
+
+        self.assertEqual(diff.toDict()['changed'], [['GLOBAL', 'Role::dev', 'unusedRole']])
+        self.assertEqual(diff.persisted, 1)
+
+    def test_account_in_fingerprint(self):
+        rows = [['GLOBAL', 'User::alice', 'mfaActive', 'Off']]
+        diff = FindingDiff(snapshot(rows, '111111111111'), snapshot(rows, '222222222222'))
+
+        self.assertEqual(len(diff.added), 1)
+        self.assertEqual(len(diff.removed), 1)
+        self.assertEqual(diff.changed, [])
+
+class SnapshotFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'snapshots', 'iam.pickle')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_save_load(self):
+        snap = snapshot([['GLOBAL', 'User::alice', 'mfaActive', 'Off']])
+        snap.save(self.path)
+        loaded = FindingSnapshot.load(self.path)
+
+        self.assertEqual(list(loaded.hashes), list(snap.hashes))
+        self.assertEqual(loaded.label(0), ['GLOBAL', 'User::alice', 'mfaActive'])
+        self.assertEqual(loaded.account, ACCOUNT)
+
+    def test_load_unreadable(self):
+        self.assertIsNone(FindingSnapshot.load(self.path))
+
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'wb') as f:
+            f.write(b'not a pickle')
+        self.assertIsNone(FindingSnapshot.load(self.path))
+
+    def test_track_changes(self):
+        first = reporter('iam').process({'GLOBAL': {'User::alice': {'mfaActive': [-1, 'Off']}}})
+        first.trackChanges(ACCOUNT, self.path)
+        self.assertIsNone(first.diff)
+
+        second = reporter('iam').process({'GLOBAL': {'User::bob': {'mfaActive': [-1, 'Off']}}})
+        second.trackChanges(ACCOUNT, self.path)
+        self.assertEqual(second.diff.toDict(), {
+            'added': [['GLOBAL', 'User::bob', 'mfaActive']],
+            'removed': [['GLOBAL', 'User::alice', 'mfaActive']],
+            'changed': [],
+            'persisted': 0
+        })
+
+        ## the snapshot of another account is not compared, it is replaced
+        other = reporter('iam').process({'GLOBAL': {'User::bob': {'mfaActive': [-1, 'Off']}}})
+        other.trackChanges('210987654321', self.path)
+        self.assertIsNone(other.diff)
+        self.assertEqual(FindingSnapshot.load(self.path).account, '210987654321')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import unittest
+
+from services.Finding import Finding, FindingStatus
+from services.FindingStore import FindingStore, StringTable
+
+class StringTableTest(unittest.TestCase):
+    def test_intern_once(self):
+        table = StringTable()
+        self.assertEqual(table.intern('a'), 0)
+        self.assertEqual(table.intern('b'), 1)
+        self.assertEqual(table.intern('a'), 0)
+
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table[1], 'b')
+        self.assertEqual(table.lookup('b'), 1)
+        self.assertIsNone(table.lookup('c'))
+
+class FindingTest(unittest.TestCase):
+    def test_indexing(self):
+        f = Finding('InlinePolicy', FindingStatus.FAIL, ['policyA'])
+        self.assertEqual(f[0], -1)
+        self.assertEqual(f[1], ['policyA'])
+        self.assertEqual(len(f), 2)
+        with self.assertRaises(IndexError):
+            f[2]
+
+        status, value = f
+        self.assertEqual([status, value], [FindingStatus.FAIL, ['policyA']])
+
+    def test_json(self):
+        f = Finding('unusedRole', FindingStatus.FAIL, {'days': 120})
+        self.assertEqual(json.dumps(f.toJSON()), '[-1, {"days": 120}]')
+
+class FindingStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = FindingStore()
+        self.store.addResults('ap-southeast-1', 'Role::admin', {'rootMfa': [-1, 'Off'], 'unusedRole': [-1, 120]})
+        self.store.addResults('ap-southeast-1', 'Role::ops', {'unusedRole': [-1, 95], 'passed': [1, 'On']}, status=-1)
+        self.store.addResults('us-east-1', 'Role::admin', {'unusedRole': Finding('unusedRole', FindingStatus.FAIL, 30)})
+
+    def test_status_filter(self):
+        self.assertEqual(len(self.store), 4)
+        self.assertNotIn('passed', self.store.tables['check'].strings)
+
+    def test_group_by(self):
+        self.assertEqual(self.store.groupBy('region', 'check'), {
+            ('ap-southeast-1', 'rootMfa'): 1,
+            ('ap-southeast-1', 'unusedRole'): 2,
+            ('us-east-1', 'unusedRole'): 1
+        })
+        self.assertEqual(self.store.groupBy('resource'), {('Role::admin',): 3, ('Role::ops',): 1})
+
+    def test_iter_in_insertion_order(self):
+        self.assertEqual(list(self.store.iter('resource', 'check')), [
+            ('Role::admin', 'rootMfa'),
+            ('Role::admin', 'unusedRole'),
+            ('Role::ops', 'unusedRole'),
+            ('Role::admin', 'unusedRole')
+        ])
+
+    def test_view(self):
+        view = self.store.view()
+        self.assertEqual(sorted(view), ['ap-southeast-1', 'us-east-1'])
+        self.assertEqual(view['ap-southeast-1']['Role::admin'], {'rootMfa': 'Off', 'unusedRole': 120})
+        self.assertEqual(view['us-east-1']['Role::admin'], {'unusedRole': 30})
+        self.assertEqual(len(view['ap-southeast-1']), 2)
+
+        ## interned in another region, not present in this one
+        with self.assertRaises(KeyError):
+            view['us-east-1']['Role::ops']
+        with self.assertRaises(KeyError):
+            view['eu-west-1']
+
+    def test_view_decorate(self):
+        view = self.store.view(lambda check, value: {'check': check, 'value': value})
+        self.assertEqual(view['ap-southeast-1']['Role::ops'], {'unusedRole': {'check': 'unusedRole', 'value': 95}})
+
+if __name__ == '__main__':
+    unittest.main()
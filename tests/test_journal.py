@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+
+from utils.Journal import Journal
+from services.Finding import Finding, FindingStatus
+
+ACCOUNT = '123456789012'
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'journal', 'scan.ndjson')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open(self, resume=True, account=ACCOUNT):
+        journal = Journal(self.path, resume=resume, account=account)
+        self.addCleanup(journal.close)
+        return journal
+
+    def test_record_and_get(self):
+        journal = self.open(resume=False)
+        journal.record('iam', 'GLOBAL', 'User::alice', {'mfaActive': Finding('mfaActive', FindingStatus.FAIL, 'Off')})
+
+        self.assertTrue(journal.isDone('iam', 'GLOBAL', 'User::alice'))
+        self.assertFalse(journal.isDone('iam', 'GLOBAL', 'User::bob'))
+        self.assertEqual(journal.get('iam', 'GLOBAL', 'User::alice'), {'mfaActive': [-1, 'Off']})
+        self.assertIsNone(journal.get('iam', 'GLOBAL', 'User::bob'))
+
+    def test_resume(self):
+        journal = self.open(resume=False)
+        journal.record('iam', 'GLOBAL', 'User::alice', {'mfaActive': [-1, 'Off']})
+        journal.record('s3', 'ap-southeast-1', 'bucket', {'PublicAccessBlock': [-1, 'Off']})
+        journal.close()
+
+        journal = self.open()
+        self.assertTrue(journal.isDone('iam', 'GLOBAL', 'User::alice'))
+        journal.record('iam', 'GLOBAL', 'User::bob', {'mfaActive': [-1, 'Off']})
+
+        self.assertEqual(journal.load('iam'), {'GLOBAL': {'User::alice': {'mfaActive': [-1, 'Off']}, 'User::bob': {'mfaActive': [-1, 'Off']}}})
+        self.assertEqual(journal.load('s3'), {'ap-southeast-1': {'bucket': {'PublicAccessBlock': [-1, 'Off']}}})
+
+    def test_latest_line_wins(self):
+        journal = self.open(resume=False)
+        journal.record('iam', 'GLOBAL', 'User::alice', {'mfaActive': [-1, 'Off']})
+        journal.record('iam', 'GLOBAL', 'User::alice', {'mfaActive': [1, 'On']})
+        journal.close()
+
+        journal = self.open()
+        self.assertEqual(journal.get('iam', 'GLOBAL', 'User::alice'), {'mfaActive': [1, 'On']})
+        self.assertEqual(journal.load('iam'), {'GLOBAL': {'User::alice': {'mfaActive': [1, 'On']}}})
+
+    def test_without_resume(self):
+        journal = self.open(resume=False)
+        journal.record('iam', 'GLOBAL', 'User::alice', {'mfaActive': [-1, 'Off']})
+        journal.close()
+
+        journal = self.open(resume=False)
+        self.assertFalse(journal.isDone('iam', 'GLOBAL', 'User::alice'))
+        self.assertEqual(journal.load('iam'), {})
+
+    def test_other_account(self):
+        journal = self.open(resume=False)
+        journal.record('iam', 'GLOBAL', 'User::alice', {'mfaActive': [-1, 'Off']})
+        journal.close()
+
+        journal = self.open(account='210987654321')
+        self.assertFalse(journal.isDone('iam', 'GLOBAL', 'User::alice'))
+        journal.close()
+
+        ## the journal was started over for the other account
+        journal = self.open(account='210987654321')
+        self.assertEqual(journal.load('iam'), {})
+
+    def test_without_header(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write('{"service": "iam", "region": "GLOBAL", "resource": "User::alice", "results": {}}\n')
+
+        journal = self.open()
+        self.assertFalse(journal.isDone('iam', 'GLOBAL', 'User::alice'))
+
+    def test_torn_and_unreadable_lines(self):
+        journal = self.open(resume=False)
+        journal.record('iam', 'GLOBAL', 'User::alice', {'mfaActive': [-1, 'Off']})
+        journal.close()
+        with open(self.path, 'ab') as f:
+            f.write(b'not json\n')
+            f.write(b'{"service": "iam", "region": "GLOBAL", "resource": "User::carol", "results": {}}\n')
+            f.write(b'{"service": "iam", "region": "GLO')
+
+        journal = self.open()
+        self.assertTrue(journal.isDone('iam', 'GLOBAL', 'User::alice'))
+        self.assertTrue(journal.isDone('iam', 'GLOBAL', 'User::carol'))
+
+        ## the torn tail is dropped, the next record starts on its own line
+        journal.record('iam', 'GLOBAL', 'User::bob', {'mfaActive': [-1, 'Off']})
+        journal.close()
+
+        journal = self.open()
+        self.assertEqual(sorted(journal.load('iam')['GLOBAL']), ['User::alice', 'User::bob', 'User::carol'])
+        self.assertEqual(journal.get('iam', 'GLOBAL', 'User::bob'), {'mfaActive': [-1, 'Off']})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import json
+import tempfile
+import unittest
+
+from services.OrgReport import OrgReport, summarizeFile
+
+def partial(account, endTime, count, high=None):
+    high = count if high is None else high
+    return {
+        'account': account,
+        'endTime': endTime,
+        'dashboard': {'SERV': {'iam': {'GLOBAL': {'Total': count, 'H': high}}}, 'CRITICALITY': {'GLOBAL': {'H': high}}},
+        'checks': {'iam': {'mfaActive': {'count': count, 'resources': {account + '/GLOBAL': ['User::u' + str(i) for i in range(count)]}}}}
+    }
+
+class OrgReportMergeTest(unittest.TestCase):
+    def test_accounts_summed(self):
+        org = OrgReport().merge(partial('111111111111', '2024-01-01T00:00:00', 2)).merge(partial('222222222222', '2024-01-01T00:00:00', 3))
+
+        self.assertEqual(org.accounts, ['111111111111', '222222222222'])
+        self.assertEqual(org.dashboard['CRITICALITY'], {'GLOBAL': {'H': 5}})
+        self.assertEqual(org.checks['iam']['mfaActive']['count'], 5)
+        self.assertEqual(sorted(org.checks['iam']['mfaActive']['resources']), ['111111111111/GLOBAL', '222222222222/GLOBAL'])
+
+    def test_later_run_replaces(self):
+        org = OrgReport()
+        org.merge(partial('111111111111', '2024-01-01T00:00:00', 2))
+        org.merge(partial('222222222222', '2024-01-01T00:00:00', 3))
+        org.merge(partial('111111111111', '2024-02-01T00:00:00', 1))
+
+        self.assertEqual(sorted(org.accounts), ['111111111111', '222222222222'])
+        self.assertEqual(org.dashboard['SERV']['iam']['GLOBAL'], {'Total': 4, 'H': 4})
+        self.assertEqual(org.checks['iam']['mfaActive']['count'], 4)
+        self.assertEqual(org.checks['iam']['mfaActive']['resources']['111111111111/GLOBAL'], ['User::u0'])
+
+    def test_older_run_ignored(self):
+        org = OrgReport()
+        org.merge(partial('111111111111', '2024-02-01T00:00:00', 1))
+        org.merge(partial('111111111111', '2024-01-01T00:00:00', 2))
+        org.merge(partial('111111111111', '2024-02-01T00:00:00', 2))
+
+        self.assertEqual(org.accounts, ['111111111111'])
+        self.assertEqual(org.dashboard['CRITICALITY'], {'GLOBAL': {'H': 1}})
+        self.assertEqual(org.checks['iam']['mfaActive']['count'], 1)
+
+    def test_run_without_end_time(self):
+        ## a run cut short has no endTime, it loses against a finished one whatever the order
+        for order in [[0, 1], [1, 0]]:
+            runs = [partial('111111111111', None, 5), partial('111111111111', '2024-01-01T00:00:00', 2)]
+            org = OrgReport()
+            for i in order:
+                org.merge(runs[i])
+
+            self.assertEqual(org.accounts, ['111111111111'])
+            self.assertEqual(org.checks['iam']['mfaActive']['count'], 2)
+            self.assertEqual(org.dashboard['CRITICALITY'], {'GLOBAL': {'H': 2}})
+
+    def test_merge_order(self):
+        runs = [
+            partial('111111111111', '2024-01-01T00:00:00', 2),
+            partial('222222222222', '2024-01-01T00:00:00', 3),
+            partial('111111111111', '2024-03-01T00:00:00', 4),
+            partial('111111111111', '2024-02-01T00:00:00', 1)
+        ]
+
+        results = []
+        for order in [[0, 1, 2, 3], [3, 2, 1, 0], [2, 0, 3, 1]]:
+            org = OrgReport()
+            for i in order:
+                org.merge(runs[i])
+            results.append([sorted(org.accounts), org.dashboard.toDict(), org.checks])
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+        self.assertEqual(results[0][2]['iam']['mfaActive']['count'], 7)
+
+class SummarizeFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, lines, tail=''):
+        path = os.path.join(self.tmp.name, 'api-raw.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(line) + "\n" for line in lines) + tail)
+        return path
+
+    def test_summarize(self):
+        path = self.write([
+            {'_summary': True, 'account': '111111111111', 'endTime': '2024-01-01T00:00:00'},
+            {'service': 'iam', 'region': 'GLOBAL', 'resource': 'User::alice', 'check': 'mfaActive', 'status': -1, 'value': 'Off'},
+            {'service': 'iam', 'region': 'GLOBAL', 'resource': 'User::bob', 'check': 'mfaActive', 'status': -1, 'value': 'Off'},
+            {'service': 'iam', 'region': 'GLOBAL', 'resource': 'User::bob', 'check': 'rootMfaActive', 'status': 1, 'value': 'On'},
+            {'service': 'unknown', 'region': 'GLOBAL', 'resource': 'x', 'check': 'y', 'status': -1, 'value': 1}
+        ], tail='{"service": "iam", "region"')
+
+        result = summarizeFile(path, maxResources=1)
+
+        self.assertEqual(result['account'], '111111111111')
+        self.assertEqual(result['endTime'], '2024-01-01T00:00:00')
+        self.assertEqual(result['dashboard']['SERV'], {'iam': {'GLOBAL': {'Total': 2, 'H': 2}}})
+        self.assertEqual(result['checks'], {'iam': {'mfaActive': {'count': 2, 'resources': {'111111111111/GLOBAL': ['User::alice']}}}})
+
+if __name__ == '__main__':
+    unittest.main()
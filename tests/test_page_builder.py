@@ -0,0 +1,65 @@
+import os
+import re
+import gzip
+import tempfile
+import unittest
+
+from services.Reporter import reporter
+from services.PageBuilder import PageBuilder
+
+## element ids are random, uuid4 via getHtmlId and uuid1 for the charts
+HTML_IDS = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|iam-[0-9a-f]{11}')
+
+class PageBuilderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rep = reporter('iam').process({
+            'GLOBAL': {
+                'User::alice': {'mfaActive': [-1, 'Off'], 'InlinePolicy': [-1, ['<p1>', 'p&2']]},
+                'User::bob': {'mfaActive': [-1, 'Off'], 'rootMfaActive': [1, 'On']}
+            }
+        })
+        self.rep.getSummary()
+        self.rep.getDetails()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, compress=False):
+        pb = PageBuilder('iam', self.rep, {'iam': 2}, ['GLOBAL'])
+        pb.outputDir = self.tmp.name
+        pb.compress = compress
+        path = pb.buildPage()
+
+        opener = gzip.open if compress else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            return path, f.read()
+
+    def test_page(self):
+        path, page = self.build()
+
+        self.assertEqual(os.path.basename(path), 'iam.html')
+        self.assertTrue(page.rstrip().endswith('</html>'))
+        self.assertIn("id='iam-User::alice'", page)
+        self.assertIn("id='iam-User::bob'", page)
+        self.assertNotIn('rootMfaActive', page)
+        ## finding values are escaped
+        self.assertIn('&lt;p1&gt;<br>p&amp;2', page)
+        self.assertNotIn('<p1>', page)
+
+    def test_compressed_page(self):
+        plainPath, plain = self.build()
+        gzPath, compressed = self.build(compress=True)
+
+        self.assertEqual(os.path.basename(gzPath), 'iam.html.gz')
+        self.assertEqual(HTML_IDS.sub('', compressed), HTML_IDS.sub('', plain))
+
+    def test_render_value(self):
+        pb = PageBuilder('iam', self.rep, {'iam': 2}, ['GLOBAL'])
+
+        self.assertEqual(pb.renderValue('<b>'), '&lt;b&gt;')
+        self.assertEqual(pb.renderValue(['a', 1]), 'a<br>1')
+        self.assertEqual(pb.renderValue({'k': '<v>'}, ', '), 'k=&lt;v&gt;')
+
+if __name__ == '__main__':
+    unittest.main()
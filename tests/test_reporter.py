@@ -0,0 +1,66 @@
+import unittest
+
+from services.Reporter import reporter
+
+## iam checks: mfaActive H/S, passwordPolicy M/S, InlinePolicy L/O
+SERVICE_OBJS = {
+    'GLOBAL': {
+        'User::alice': {'mfaActive': [-1, 'Off'], 'InlinePolicy': [-1, ['p1']], 'rootMfaActive': [1, 'On']},
+        'User::bob': {'mfaActive': [-1, 'Off']},
+        'Account::root': {'passwordPolicy': [-1, 'Off']}
+    }
+}
+
+class ReporterTest(unittest.TestCase):
+    def setUp(self):
+        self.rep = reporter('iam').process(SERVICE_OBJS)
+
+    def test_counts(self):
+        self.rep.getSummary()
+        dashboard = self.rep.getDashboard()
+
+        self.assertEqual(dashboard['SERV'], {'iam': {'GLOBAL': {'Total': 3, 'H': 2}}})
+        self.assertEqual(dashboard['CRITICALITY'], {'GLOBAL': {'H': 2, 'M': 1, 'L': 1}})
+        self.assertEqual(dashboard['CATEGORY'], {'GLOBAL': {'S': 3, 'O': 1}})
+
+        mapCount = dashboard['MAP']['iam']
+        self.assertEqual(mapCount['H'], 2)
+        self.assertEqual(mapCount['S'], 3)
+        self.assertEqual(mapCount['_']['S'], 2)
+
+    def test_cards(self):
+        self.rep.getSummary()
+        cards = self.rep.getCard()
+
+        self.assertEqual(sorted(cards), ['InlinePolicy', 'mfaActive', 'passwordPolicy'])
+        self.assertEqual(cards['mfaActive']['__affectedResources'], {'GLOBAL': ['User::alice', 'User::bob']})
+        self.assertIn('<strong><u>2</u></strong>', cards['mfaActive']['^description'])
+
+    def test_summary_twice(self):
+        self.rep.getSummary()
+        first = self.rep.getDashboard().toDict()
+        self.rep.getSummary()
+
+        self.assertEqual(self.rep.getDashboard().toDict(), first)
+        self.assertEqual(self.rep.getDashboard()['CRITICALITY']['GLOBAL']['H'], 2)
+
+    def test_summary_after_more_input(self):
+        self.rep.getSummary()
+        self.rep.process({'us-east-1': {'User::carol': {'mfaActive': [-1, 'Off']}}})
+        self.rep.getSummary()
+
+        dashboard = self.rep.getDashboard()
+        self.assertEqual(dashboard['CRITICALITY']['GLOBAL']['H'], 2)
+        self.assertEqual(dashboard['CRITICALITY']['us-east-1']['H'], 1)
+        self.assertEqual(dashboard['MAP']['iam']['H'], 3)
+
+    def test_description_values(self):
+        values = self.rep._descriptionValues({'GLOBAL': ['<b>x</b>', 'y&z'], 'us-east-1': ['r' + str(i) for i in range(12)]})
+
+        self.assertEqual(values['COUNT'], '<strong><u>14</u></strong>')
+        self.assertEqual(values['REGIONCOUNT'], 2)
+        self.assertTrue(values['RESOURCES'].startswith('&lt;b&gt;x&lt;/b&gt;, y&amp;z, r0'))
+        self.assertTrue(values['RESOURCES'].endswith('r7 and 4 more'))
+
+if __name__ == '__main__':
+    unittest.main()
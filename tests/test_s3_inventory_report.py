@@ -0,0 +1,131 @@
+import io
+import os
+import gzip
+import datetime
+import tempfile
+import unittest
+
+import botocore.exceptions
+
+from services.s3.drivers.S3InventoryReport import S3InventoryReport
+from services.s3.drivers.S3Bucket import S3Bucket
+from services.s3.drivers.S3BucketConfigCollector import S3BucketConfig
+
+SCHEMA = 'Bucket, Key, Size, LastModifiedDate, StorageClass, EncryptionStatus'
+ROWS = [
+    '"bucket","a.txt","100","2024-01-01T00:00:00.000Z","STANDARD","SSE-S3"',
+    '"bucket","b.txt","2048","2024-01-01T00:00:00.000Z","GLACIER","NOT-SSE"',
+    '"bucket","c/d.txt","0","2024-01-01T00:00:00.000Z","STANDARD","SSE-KMS"',
+]
+
+## get_object of the listed data files and list_multipart_uploads (uploads None: AccessDenied),
+## findConfiguration / latestManifest are replaced in the tests
+class FakeS3:
+    def __init__(self, files, uploads=[]):
+        self.files = files
+        self.uploads = uploads
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.files:
+            raise botocore.exceptions.ClientError({'Error': {'Code': 'AccessDenied', 'Message': ''}}, 'GetObject')
+        with open(self.files[Key], 'rb') as f:
+            return {'Body': io.BytesIO(f.read())}
+
+    def list_multipart_uploads(self, Bucket):
+        if self.uploads is None:
+            raise botocore.exceptions.ClientError({'Error': {'Code': 'AccessDenied', 'Message': ''}}, 'ListMultipartUploads')
+        return {'Uploads': self.uploads, 'IsTruncated': False}
+
+    def list_bucket_inventory_configurations(self, Bucket):
+        raise botocore.exceptions.EndpointConnectionError(endpoint_url='https://s3.example')
+
+class S3InventoryReportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csvGz = os.path.join(self.tmp.name, 'data.csv.gz')
+        with gzip.open(self.csvGz, 'wt', encoding='utf-8') as f:
+            f.write("\n".join(ROWS) + "\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def collect(self, manifest, files, uploads=[]):
+        o = S3InventoryReport(FakeS3(files, uploads))
+        o.findConfiguration = lambda bucket: {}
+        o.latestManifest = lambda bucket, config: ('dest', manifest)
+        return o.collect('bucket')
+
+    def test_parse_gzip_csv(self):
+        stats = S3InventoryReport(None).parseFile(self.csvGz, 'CSV', SCHEMA)
+
+        self.assertEqual(stats.scannedObjects, 3)
+        self.assertEqual(stats.scannedBytes, 2148)
+        self.assertEqual(stats.storageClass, {'STANDARD': 2, 'GLACIER': 1})
+        self.assertEqual(stats.sampleSize, 3)
+        self.assertEqual(stats.encryption, {'AES256': 1, 'NONE': 1, 'aws:kms': 1})
+
+    def test_parse_plain_csv_without_encryption_column(self):
+        path = os.path.join(self.tmp.name, 'data.csv')
+        with open(path, 'w') as f:
+            f.write('"bucket","a.txt","100"\n')
+
+        stats = S3InventoryReport(None).parseFile(path, 'csv', 'Bucket, Key, Size')
+        self.assertEqual(stats.scannedObjects, 1)
+        self.assertEqual(stats.sampleSize, 0)
+
+    def test_collect_unsupported_format_falls_back(self):
+        manifest = {'fileFormat': 'JSON', 'files': [{'key': 'data.csv.gz'}]}
+        self.assertIsNone(self.collect(manifest, {'data.csv.gz': self.csvGz}))
+
+    def test_collect_skips_unreadable_files(self):
+        manifest = {'fileFormat': 'CSV', 'fileSchema': SCHEMA, 'files': [{'key': 'data.csv.gz'}, {'key': 'denied.csv.gz'}]}
+        stats = self.collect(manifest, {'data.csv.gz': self.csvGz})
+
+        self.assertEqual(stats.scannedObjects, 3)
+        self.assertFalse(stats.complete)
+
+    def test_collect_nothing_readable_falls_back(self):
+        manifest = {'fileFormat': 'CSV', 'fileSchema': SCHEMA, 'files': [{'key': 'denied.csv.gz'}]}
+        self.assertIsNone(self.collect(manifest, {}))
+
+    def test_collect_corrupt_file_falls_back(self):
+        path = os.path.join(self.tmp.name, 'corrupt.csv.gz')
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.write('"bucket","a.txt","not-a-size","2024-01-01T00:00:00.000Z","STANDARD","SSE-S3"\n')
+
+        manifest = {'fileFormat': 'CSV', 'fileSchema': SCHEMA, 'files': [{'key': 'data.csv.gz'}, {'key': 'corrupt.csv.gz'}]}
+        self.assertIsNone(self.collect(manifest, {'data.csv.gz': self.csvGz, 'corrupt.csv.gz': path}))
+
+    def test_collect_undecodable_file_falls_back(self):
+        path = os.path.join(self.tmp.name, 'latin1.csv.gz')
+        with gzip.open(path, 'wb') as f:
+            f.write(b'"bucket","caf\xe9.txt","1","2024-01-01T00:00:00.000Z","STANDARD","SSE-S3"\n')
+
+        manifest = {'fileFormat': 'CSV', 'fileSchema': SCHEMA, 'files': [{'key': 'latin1.csv.gz'}]}
+        self.assertIsNone(self.collect(manifest, {'latin1.csv.gz': path}))
+
+    def test_find_configuration_connection_error(self):
+        self.assertIsNone(S3InventoryReport(FakeS3({})).findConfiguration('bucket'))
+
+    def test_collect_lists_multipart_uploads(self):
+        old = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=30)
+        manifest = {'fileFormat': 'CSV', 'fileSchema': SCHEMA, 'files': [{'key': 'data.csv.gz'}]}
+        stats = self.collect(manifest, {'data.csv.gz': self.csvGz}, uploads=[{'Initiated': old}])
+
+        self.assertTrue(stats.multipartListed)
+        self.assertEqual(stats.staleMultipartUploads, 1)
+
+    def test_stale_multipart_check_skipped_when_not_listed(self):
+        manifest = {'fileFormat': 'CSV', 'fileSchema': SCHEMA, 'files': [{'key': 'data.csv.gz'}]}
+        stats = self.collect(manifest, {'data.csv.gz': self.csvGz}, uploads=None)
+        self.assertFalse(stats.multipartListed)
+        self.assertIsNone(stats.toDict()['staleMultipartUploads'])
+
+        cfg = S3BucketConfig({'Name': 'bucket'})
+        cfg.objectSample = stats
+        bucket = S3Bucket(cfg, None)
+        bucket._checkStaleMultipartUploads()
+        self.assertNotIn('StaleMultipartUploads', bucket.getInfo())
+
+if __name__ == '__main__':
+    unittest.main()
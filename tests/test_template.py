@@ -0,0 +1,40 @@
+import unittest
+
+from utils.Template import Template
+
+class TemplateTest(unittest.TestCase):
+    def test_segments(self):
+        tpl = Template("You have {$COUNT} tables in {$REGIONCOUNT} regions")
+
+        self.assertEqual(tpl.segments, ['You have ', 'COUNT', ' tables in ', 'REGIONCOUNT', ' regions'])
+        self.assertEqual(tpl.placeholders, {'COUNT', 'REGIONCOUNT'})
+
+    def test_render(self):
+        tpl = Template("{$COUNT} of {$COUNT} in {$REGIONCOUNT}, {$UNKNOWN} stays")
+
+        self.assertEqual(tpl.render({'COUNT': 3, 'REGIONCOUNT': 2}), "3 of 3 in 2, {$UNKNOWN} stays")
+        self.assertEqual(tpl.render({}), tpl.text)
+
+    def test_values_inserted_as_given(self):
+        ## values are not parsed again, nor evaluated
+        tpl = Template("{$RESOURCES}")
+        self.assertEqual(tpl.render({'RESOURCES': '{$COUNT} &lt;b&gt;'}), '{$COUNT} &lt;b&gt;')
+        self.assertEqual(Template("{$COUNT}").render({'COUNT': '__import__("os")'}), '__import__("os")')
+
+    def test_no_placeholder(self):
+        tpl = Template("{COUNT} tables, $COUNT, {$lower}")
+
+        self.assertEqual(tpl.segments, [tpl.text])
+        self.assertEqual(tpl.render({'COUNT': 1, 'lower': 2}), tpl.text)
+        self.assertEqual(tpl.barePlaceholders, {'COUNT'})
+
+    def test_compile_shared(self):
+        text = "{$COUNT} shared"
+        self.assertIs(Template.compile(text), Template.compile(text))
+
+    def test_render_all(self):
+        a, b = Template.compile("{$COUNT} a"), Template.compile("{$COUNT} b")
+        self.assertEqual(Template.renderAll([[a, {'COUNT': 1}], [b, {'COUNT': 2}]]), ['1 a', '2 b'])
+
+if __name__ == '__main__':
+    unittest.main()
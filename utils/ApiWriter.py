@@ -0,0 +1,125 @@
+import os
+import json
+import gzip
+import time
+import datetime
+
+from .Journal import Journal
+
+## --mode api-raw|api-full output: one JSON line per (service, region, resource, check),
+## written as each resource completes, so memory stays constant and consumers can tail the
+## file while the scan is running. The last line is a summary record ("_summary": true).
+##
+## api-raw carries the status and value only, api-full adds the check metadata (criticality,
+## category, shortDesc) taken from the catalog, see services.CheckCatalog.
+class ApiWriter:
+    MODES = ['api-raw', 'api-full']
+    FLUSH_LINES = 500
+    FLUSH_INTERVAL = 5
+
+    def __init__(self, path, mode='api-raw', compress=False, catalog=None, account=None, flushLines=FLUSH_LINES, flushInterval=FLUSH_INTERVAL):
+        if mode not in self.MODES:
+            raise Exception("Unsupported api mode: " + mode)
+
+        if mode == 'api-full' and catalog is None:
+            raise Exception("api-full needs the check catalog")
+
+        self.mode = mode
+        self.catalog = catalog
+        self.account = account
+        self.flushLines = flushLines
+        self.flushInterval = flushInterval
+
+        self.path = path + '.gz' if compress and not path.endswith('.gz') else path
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        if compress:
+            self.f = gzip.open(self.path, 'wt', encoding='utf-8')
+        else:
+            self.f = open(self.path, 'w', encoding='utf-8')
+
+        self.pendingLines = 0
+        self.lastFlush = time.monotonic()
+        self.startTime = self._now()
+        ## {service: {'resources': n, 'findings': {status: n}}}
+        self.summary = {}
+
+    def write(self, service, region, identifier, results):
+        counts = self.summary.setdefault(service, {'resources': 0, 'findings': {}})
+        counts['resources'] += 1
+
+        lines = []
+        for check, info in results.items():
+            status = int(info[0])
+            entry = {
+                'service': service,
+                'region': region,
+                'resource': identifier,
+                'check': check,
+                'status': status,
+                'value': info[1]
+            }
+
+            if self.mode == 'api-full':
+                self._addCheckMeta(entry, service, check)
+
+            lines.append(json.dumps(entry, default=Journal._encode))
+            findings = counts['findings']
+            findings[status] = findings.get(status, 0) + 1
+
+        if lines:
+            self.f.write("\n".join(lines) + "\n")
+            self.pendingLines += len(lines)
+
+        self._maybeFlush()
+
+    def _addCheckMeta(self, entry, service, check):
+        meta = self.catalog.getCheck(service, check) or {}
+        entry['criticality'] = meta.get('criticality')
+        entry['category'] = meta.get('__categoryMain', '') + meta.get('__categorySub', '') or None
+        entry['shortDesc'] = meta.get('shortDesc')
+
+    def _maybeFlush(self):
+        if self.pendingLines >= self.flushLines or time.monotonic() - self.lastFlush >= self.flushInterval:
+            self.flush()
+
+    ## gzip flushes with Z_SYNC_FLUSH, what is written so far can be decompressed
+    def flush(self):
+        self.f.flush()
+        self.pendingLines = 0
+        self.lastFlush = time.monotonic()
+
+    def close(self):
+        if self.f.closed:
+            return
+
+        resources = 0
+        findings = 0
+        for counts in self.summary.values():
+            resources += counts['resources']
+            findings += sum(counts['findings'].values())
+
+        summary = {
+            '_summary': True,
+            'mode': self.mode,
+            'account': self.account,
+            'startTime': self.startTime,
+            'endTime': self._now(),
+            'resources': resources,
+            'findings': findings,
+            'services': self.summary
+        }
+
+        self.f.write(json.dumps(summary) + "\n")
+        self.f.close()
+
+    def _now(self):
+        return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+if __name__ == "__main__":
+    w = ApiWriter('/tmp/api.ndjson', compress=True)
+    w.write('iam', 'GLOBAL', 'Role::admin', {'unusedRole': [-1, '120 days'], 'roleLongSession': [1, 3600]})
+    w.close()
+    print(gzip.open(w.path, 'rt').read())
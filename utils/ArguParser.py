@@ -47,7 +47,7 @@ class ArguParser:
         "mode": {
             "required": False,
             "default": "report",
-            "help": "--mode report|api|api_full"
+            "help": "--mode report|api-raw|api-full"
         },
         "profile": {
             "required": False,
@@ -60,6 +60,45 @@ class ArguParser:
         "filters": {
             "required": False,
             "default": False
+        },
+        ## no short flag, -r is taken by --region
+        "resume": {
+            "required": False,
+            "default": False,
+            "short": None,
+            "help": "--resume true|false, skip resources already journaled by an interrupted run"
+        },
+        "compress": {
+            "required": False,
+            "default": False,
+            "short": None,
+            "help": "--compress true|false, gzip the api-raw|api-full output"
+        },
+        "database": {
+            "required": False,
+            "default": False,
+            "short": None,
+            "help": "--database true|false, keep this run's findings in __fork/findings.db, see query.py"
+        },
+        ## -d is taken by --debug
+        "detail": {
+            "required": False,
+            "default": "inline",
+            "short": None,
+            "help": "--detail inline|chunked, chunked loads each region's resources on demand, for very large accounts"
+        },
+        ## object level S3 checks, off by default: they cost extra calls per bucket
+        "s3-inventory": {
+            "required": False,
+            "default": False,
+            "short": None,
+            "help": "--s3-inventory true|false, read object statistics from the buckets' S3 Inventory reports"
+        },
+        "s3-sample": {
+            "required": False,
+            "default": False,
+            "short": None,
+            "help": "--s3-sample true|false, sample objects of buckets without an inventory report (list + head calls)"
         }
     }
 
@@ -68,17 +107,25 @@ class ArguParser:
         parser = argparse.ArgumentParser(prog='Screener', description='Service-Screener, open-source to check your AWS environment against AWS Well-Architected Pillars')
     
         for k, v in ArguParser.CLI_ARGUMENT_RULES.items():
-            parser.add_argument('-' + k[:1], '--' + k, required=v['required'], default=v['default'], help=v.get('help', None))
+            parser.add_argument(*ArguParser._flags(k, v), required=v['required'], default=v['default'], help=v.get('help', None))
         
         args = vars(parser.parse_args())
         
         return args
+    
+    @staticmethod
+    def _flags(k, v):
+        short = v.get('short', k[:1])
+        if short is None:
+            return ['--' + k]
+        
+        return ['-' + short, '--' + k]
         
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(prog='Screener', description='Service-Screener, open-source to check your AWS environment against AWS Well-Architected Pillars')
     
     for k, v in ArguParser.CLI_ARGUMENT_RULES.items():
-        parser.add_argument('-' + k[:1], '--' + k, required=v['required'], default=v['default'], help=v.get('help', None))
+        parser.add_argument(*ArguParser._flags(k, v), required=v['required'], default=v['default'], help=v.get('help', None))
     
     args = parser.parse_args()
     print(args.region)
\ No newline at end of file
@@ -99,7 +99,6 @@ class Config:
         
         return defaultValue
 
-dashboard = {}
 Config.init()
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+import json
+
+## Dashboard counters (SERV, MAP, CRITICALITY, CATEGORY) owned by whoever fills them.
+## Every worker (service, region, process) fills its own instance, ships it with toDict(),
+## and the parent folds them together with merge(). All leaves are counts that are summed,
+## so merging is associative and commutative and the merge order does not matter.
+class Dashboard:
+    SECTIONS = ['SERV', 'MAP', 'CRITICALITY', 'CATEGORY']
+
+    def __init__(self, data=None):
+        self.data = {section: {} for section in self.SECTIONS}
+        if data:
+            self.merge(data)
+
+    ## backward-compatible dict access, dashboard['CRITICALITY'][region]...
+    def __getitem__(self, section):
+        return self.data[section]
+
+    def __contains__(self, section):
+        return section in self.data
+
+    def get(self, section, defaultValue=None):
+        return self.data.get(section, defaultValue)
+
+    def addServiceRegion(self, service, region, total, high):
+        self._add(self.data['SERV'], {service: {region: {'Total': total, 'H': high}}})
+
+    def addMap(self, service, counts):
+        self._add(self.data['MAP'], {service: counts})
+
+    def addCriticality(self, region, criticality, cnt):
+        self._add(self.data['CRITICALITY'], {region: {criticality: cnt}})
+
+    def addCategory(self, region, category, cnt):
+        self._add(self.data['CATEGORY'], {region: {category: cnt}})
+
+    def merge(self, other):
+        if isinstance(other, Dashboard):
+            other = other.data
+
+        self._add(self.data, other)
+        return self
+
+    @staticmethod
+    def mergeAll(dashboards):
+        merged = Dashboard()
+        for dashboard in dashboards:
+            merged.merge(dashboard)
+
+        return merged
+
+    def toDict(self):
+        return self.data
+
+    def serialize(self):
+        return json.dumps(self.data, separators=(',', ':'))
+
+    @staticmethod
+    def unserialize(s):
+        return Dashboard(json.loads(s))
+
+    @staticmethod
+    def _add(target, source):
+        for key, val in source.items():
+            if isinstance(val, dict):
+                Dashboard._add(target.setdefault(key, {}), val)
+            else:
+                target[key] = target.get(key, 0) + val
+
+if __name__ == "__main__":
+    a = Dashboard()
+    a.addCriticality('ap-southeast-1', 'H', 2)
+    b = Dashboard()
+    b.addCriticality('ap-southeast-1', 'H', 3)
+    b.addServiceRegion('iam', 'GLOBAL', 10, 3)
+    print(Dashboard.mergeAll([a, Dashboard.unserialize(b.serialize())]).toDict())
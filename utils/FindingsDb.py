@@ -0,0 +1,199 @@
+import os
+import json
+import sqlite3
+import datetime
+
+from .Journal import Journal
+
+## Optional run history (--database): every run, resource, check and finding in SQLite under
+## __fork. Rows are buffered and inserted with executemany() in one transaction per batch,
+## so the scan does not wait on the disk for each resource. See query.py to read it back.
+class FindingsDb:
+    BATCH_SIZE = 1000
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            account TEXT,
+            mode TEXT,
+            startTime TEXT,
+            endTime TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS resources (
+            id INTEGER PRIMARY KEY,
+            account TEXT NOT NULL,
+            region TEXT NOT NULL,
+            service TEXT NOT NULL,
+            identifier TEXT NOT NULL,
+            UNIQUE (account, region, service, identifier)
+        )""",
+        """CREATE TABLE IF NOT EXISTS checks (
+            id INTEGER PRIMARY KEY,
+            service TEXT NOT NULL,
+            name TEXT NOT NULL,
+            criticality TEXT,
+            category TEXT,
+            shortDesc TEXT,
+            UNIQUE (service, name)
+        )""",
+        """CREATE TABLE IF NOT EXISTS findings (
+            runId INTEGER NOT NULL REFERENCES runs(id),
+            resourceId INTEGER NOT NULL REFERENCES resources(id),
+            checkId INTEGER NOT NULL REFERENCES checks(id),
+            status INTEGER NOT NULL,
+            value TEXT
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_resources_scope ON resources (account, region, service)",
+        ## --region / --service without --account cannot use the scope index
+        "CREATE INDEX IF NOT EXISTS idx_resources_region ON resources (region, service)",
+        "CREATE INDEX IF NOT EXISTS idx_resources_service ON resources (service)",
+        "CREATE INDEX IF NOT EXISTS idx_checks_criticality ON checks (criticality, service)",
+        "CREATE INDEX IF NOT EXISTS idx_findings_run ON findings (runId, checkId)",
+        "CREATE INDEX IF NOT EXISTS idx_findings_resource ON findings (resourceId)"
+    ]
+
+    def __init__(self, path, account='unknown', mode='report', catalog=None, batchSize=BATCH_SIZE):
+        self.path = path
+        self.account = account
+        self.catalog = catalog
+        self.batchSize = batchSize
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            for statement in self.SCHEMA:
+                self.conn.execute(statement)
+
+            cur = self.conn.execute("INSERT INTO runs (account, mode, startTime) VALUES (?, ?, ?)", (account, mode, self._now()))
+            self.runId = cur.lastrowid
+
+        self.resourceIds = {}
+        self.checkIds = {}
+        self.pending = []
+
+    ## same signature as ApiWriter.write, registered as a result sink by main.py
+    def write(self, service, region, identifier, results):
+        resourceId = self._resourceId(service, region, identifier)
+        for check, info in results.items():
+            value = info[1] if isinstance(info[1], str) else json.dumps(info[1], default=Journal._encode)
+            self.pending.append((self.runId, resourceId, self._checkId(service, check), int(info[0]), value))
+
+        if len(self.pending) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        with self.conn:
+            self.conn.executemany("INSERT INTO findings (runId, resourceId, checkId, status, value) VALUES (?, ?, ?, ?, ?)", self.pending)
+        self.pending = []
+
+    def close(self):
+        if self.conn is None:
+            return
+
+        self.flush()
+        with self.conn:
+            self.conn.execute("UPDATE runs SET endTime = ? WHERE id = ?", (self._now(), self.runId))
+        self.conn.close()
+        self.conn = None
+
+    def _resourceId(self, service, region, identifier):
+        key = (region, service, identifier)
+        resourceId = self.resourceIds.get(key)
+        if resourceId is None:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO resources (account, region, service, identifier) VALUES (?, ?, ?, ?)",
+                (self.account, region, service, identifier)
+            )
+            if cur.rowcount == 1:
+                resourceId = cur.lastrowid
+            else:
+                ## seen by an earlier run
+                resourceId = self.conn.execute(
+                    "SELECT id FROM resources WHERE account = ? AND region = ? AND service = ? AND identifier = ?",
+                    (self.account, region, service, identifier)
+                ).fetchone()[0]
+            self.resourceIds[key] = resourceId
+
+        return resourceId
+
+    ## check metadata is refreshed from the catalog once per run
+    def _checkId(self, service, check):
+        key = (service, check)
+        checkId = self.checkIds.get(key)
+        if checkId is None:
+            meta = (self.catalog.getCheck(service, check) if self.catalog else None) or {}
+            category = meta.get('__categoryMain', '') + meta.get('__categorySub', '') or None
+            self.conn.execute(
+                "INSERT INTO checks (service, name, criticality, category, shortDesc) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (service, name) DO UPDATE SET criticality = excluded.criticality, category = excluded.category, shortDesc = excluded.shortDesc",
+                (service, check, meta.get('criticality'), category, meta.get('shortDesc'))
+            )
+            checkId = self.conn.execute("SELECT id FROM checks WHERE service = ? AND name = ?", (service, check)).fetchone()[0]
+            self.checkIds[key] = checkId
+
+        return checkId
+
+    def _now(self):
+        return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+## Read side, used by query.py
+class FindingsQuery:
+    FILTERS = {
+        'account': 'r.account',
+        'region': 'r.region',
+        'service': 'r.service',
+        'check': 'c.name',
+        'criticality': 'c.criticality',
+        'category': 'substr(c.category, 1, 1)',
+        'status': 'f.status'
+    }
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise Exception(path + " not found, run the screener with --database true first")
+
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+
+    def runs(self, limit=20):
+        return self.conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+
+    def latestRunId(self):
+        row = self.conn.execute("SELECT max(id) FROM runs WHERE endTime IS NOT NULL").fetchone()
+        return row[0]
+
+    ## filters: {name: value} with names from FILTERS, runId None means the latest completed run
+    def findings(self, filters=None, runId=None, limit=None):
+        filters = filters or {}
+        if runId is None:
+            runId = self.latestRunId()
+
+        where = ['f.runId = ?']
+        params = [runId]
+        for name, value in filters.items():
+            if value is None:
+                continue
+
+            where.append(self.FILTERS[name] + ' = ?')
+            params.append(value)
+
+        sql = (
+            "SELECT r.account, r.region, r.service, r.identifier, c.name AS checkName, c.criticality, c.category, f.status, f.value "
+            "FROM findings f JOIN resources r ON r.id = f.resourceId JOIN checks c ON c.id = f.checkId "
+            "WHERE " + " AND ".join(where) + " ORDER BY r.region, r.service, r.identifier, c.name"
+        )
+        if limit:
+            sql += " LIMIT " + str(int(limit))
+
+        return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,134 @@
+import os
+import json
+
+## Append-only journal of per-resource results, one JSON line per (service, region, resource).
+## Each line is flushed as soon as the resource finishes, so an interrupted scan only has to
+## redo the resources that never made it into the file (see --resume).
+##
+## The first line is a header naming the account, a journal of another account (or without
+## header) is discarded on resume. Only the byte offset of each line is kept in memory, the
+## results are read back from the file when asked for.
+class Journal:
+    VERSION = 1
+
+    def __init__(self, path, resume=False, account=None):
+        self.path = path
+        self.account = account
+        ## (service, region, identifier) -> offset of its latest line
+        self.offsets = {}
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        if resume and not self._load():
+            resume = False
+
+        self.f = open(path, 'ab' if resume else 'wb')
+        if not resume:
+            self._write({'_journal': True, 'version': self.VERSION, 'account': account})
+        self.reader = open(path, 'rb')
+
+    ## False when the journal cannot be resumed (missing, other account, unknown format)
+    def _load(self):
+        if not os.path.exists(self.path):
+            return False
+
+        validBytes = 0
+        with open(self.path, 'rb') as f:
+            header = self._parse(f.readline())
+            if header is None or not header.get('_journal') or header.get('version') != self.VERSION:
+                print("[Journal] {} has no header, starting over".format(self.path))
+                return False
+
+            if header.get('account') != self.account:
+                print("[Journal] {} belongs to account {}, not {}, starting over".format(self.path, header.get('account'), self.account))
+                return False
+
+            validBytes = f.tell()
+            for line in iter(f.readline, b''):
+                ## last line of an interrupted run may be partially written
+                if not line.endswith(b"\n"):
+                    break
+
+                entry = self._parse(line)
+                if entry is None:
+                    print("[Journal] skipping unreadable line at byte {}".format(validBytes))
+                else:
+                    self.offsets[(entry['service'], entry['region'], entry['resource'])] = validBytes
+                validBytes += len(line)
+
+        ## drop the partial tail so new records start on a fresh line
+        with open(self.path, 'r+b') as f:
+            f.truncate(validBytes)
+
+        return True
+
+    def isDone(self, service, region, identifier):
+        return (service, region, identifier) in self.offsets
+
+    def get(self, service, region, identifier):
+        offset = self.offsets.get((service, region, identifier))
+        if offset is None:
+            return None
+
+        self.reader.seek(offset)
+        return self._parse(self.reader.readline())['results']
+
+    def record(self, service, region, identifier, results):
+        entry = {
+            'service': service,
+            'region': region,
+            'resource': identifier,
+            'results': results
+        }
+
+        self.offsets[(service, region, identifier)] = self._write(entry)
+
+    ## Rebuild the {region: {identifier: results}} structure expected by reporter.process(),
+    ## streamed from the file, the latest line of each resource wins
+    def load(self, service):
+        serviceObjs = {}
+        self.reader.seek(0)
+        self.reader.readline()
+
+        offset = self.reader.tell()
+        for line in iter(self.reader.readline, b''):
+            entry = self._parse(line)
+            if entry is not None and entry['service'] == service:
+                key = (service, entry['region'], entry['resource'])
+                if self.offsets.get(key) == offset:
+                    serviceObjs.setdefault(entry['region'], {})[entry['resource']] = entry['results']
+            offset += len(line)
+
+        return serviceObjs
+
+    def close(self):
+        for f in [self.f, self.reader]:
+            if not f.closed:
+                f.close()
+
+    ## offset of the line written
+    def _write(self, entry):
+        offset = self.f.tell()
+        self.f.write((json.dumps(entry, default=self._encode) + "\n").encode('utf-8'))
+        self.f.flush()
+        return offset
+
+    @staticmethod
+    def _parse(line):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None
+
+        return entry if isinstance(entry, dict) else None
+
+    ## Finding objects (services.Finding) serialize to their [status, value] form
+    @staticmethod
+    def _encode(o):
+        toJSON = getattr(o, 'toJSON', None)
+        if toJSON is not None:
+            return toJSON()
+
+        return str(o)
@@ -0,0 +1,52 @@
+import boto3
+import botocore
+
+from .Config import Config
+
+## Shared Service Quotas lookup, one fully paginated fetch per (region, service) per run.
+## Applied quotas (account level) override the AWS default quotas, so codes that have
+## never been raised are still answered from the defaults.
+class ServiceQuota:
+    CACHE_PREFIX = 'quota::'
+
+    def __init__(self, serviceQuotaClient=None, region=None):
+        if serviceQuotaClient is None:
+            serviceQuotaClient = boto3.client('service-quotas', region_name=region)
+
+        self.serviceQuotaClient = serviceQuotaClient
+        self.region = region or serviceQuotaClient.meta.region_name
+
+    def quota(self, service, code, defaultValue=None):
+        index = self.getIndex(service)
+        if code not in index:
+            return defaultValue
+
+        return index[code]
+
+    def getIndex(self, service):
+        cacheKey = self.CACHE_PREFIX + self.region + '::' + service
+        index = Config.get(cacheKey, None)
+        if index is None:
+            index = {}
+            self._fetch('list_aws_default_service_quotas', service, index)
+            self._fetch('list_service_quotas', service, index)
+
+            Config.set(cacheKey, index)
+
+        return index
+
+    def _fetch(self, operation, service, index):
+        try:
+            paginator = self.serviceQuotaClient.get_paginator(operation)
+            for page in paginator.paginate(ServiceCode=service):
+                for quota in page.get('Quotas', []):
+                    index[quota['QuotaCode']] = quota['Value']
+        except botocore.exceptions.ClientError as e:
+            ecode = e.response['Error']['Code']
+            print("[ServiceQuota] {} on {}::{}: {}".format(operation, self.region, service, ecode))
+
+if __name__ == "__main__":
+    Config.init()
+    o = ServiceQuota(region='ap-southeast-1')
+    print(o.quota('dynamodb', 'L-F98FE922'))
+    print(o.quota('dynamodb', 'L-F7858A77'))
@@ -0,0 +1,122 @@
+import boto3
+import botocore
+
+from .Config import Config
+
+## Region-wide ARN -> tags index built from a single paginated Resource Groups Tagging API
+## scan. Tag filters and tag related checks read from here instead of calling the per-resource
+## tagging APIs (get_bucket_tagging, list_tags_of_resource, ...).
+##
+## Resources that were never tagged are not returned by the Tagging API, they simply have no
+## entry in the index. When the scan fails (access denied, throttling, an error halfway through
+## the pages) the index is marked failed and nothing is cached: callers check isAvailable() and
+## fall back to the per-resource APIs instead of reading every resource as untagged.
+class TagIndex:
+    CACHE_PREFIX = 'tags::'
+
+    TAGS_SEPARATOR = '%'
+    KEYVALUE_SEPARATOR = '='
+    VALUES_SEPARATOR = ','
+
+    def __init__(self, region, taggingClient=None):
+        self.region = region
+        self.taggingClient = taggingClient
+        self.index = None
+        self.failed = False
+
+    @staticmethod
+    def forRegion(region, taggingClient=None):
+        cacheKey = TagIndex.CACHE_PREFIX + region
+        tagIndex = Config.get(cacheKey, None)
+        if tagIndex is None:
+            tagIndex = TagIndex(region, taggingClient)
+            Config.set(cacheKey, tagIndex)
+
+        return tagIndex
+
+    def build(self):
+        if self.index is not None:
+            return self.index
+
+        if self.taggingClient is None:
+            self.taggingClient = boto3.client('resourcegroupstaggingapi', region_name=self.region)
+
+        index = {}
+        try:
+            paginator = self.taggingClient.get_paginator('get_resources')
+            for page in paginator.paginate(ResourcesPerPage=100):
+                for res in page.get('ResourceTagMappingList', []):
+                    index[res['ResourceARN']] = {tag['Key']: tag['Value'] for tag in res.get('Tags', [])}
+        except botocore.exceptions.ClientError as e:
+            ecode = e.response['Error']['Code']
+            print("[TagIndex] get_resources on {}: {}, tag index unavailable".format(self.region, ecode))
+            self.failed = True
+        except botocore.exceptions.BotoCoreError as e:
+            print("[TagIndex] get_resources on {}: {}, tag index unavailable".format(self.region, e))
+            self.failed = True
+
+        ## a partial index would read as untagged resources
+        self.index = {} if self.failed else index
+        return self.index
+
+    def isAvailable(self):
+        self.build()
+        return not self.failed
+
+    ## None when the index is unavailable, {} when the resource has no tag
+    def getTags(self, arn):
+        index = self.build()
+        if self.failed:
+            return None
+
+        return index.get(arn, {})
+
+    def hasTags(self, arn):
+        tags = self.getTags(arn)
+        return None if tags is None else len(tags) > 0
+
+    ## None when the index is unavailable
+    def matches(self, arn, filters):
+        tags = self.getTags(arn)
+        return None if tags is None else TagIndex.tagsMatch(tags, filters)
+
+    ## ARNs with the given prefix (e.g. 'arn:aws:dynamodb:') that satisfy the filters, None when
+    ## the index is unavailable
+    def filterArns(self, filters, prefix=''):
+        index = self.build()
+        if self.failed:
+            return None
+
+        return [arn for arn, tags in index.items() if arn.startswith(prefix) and TagIndex.tagsMatch(tags, filters)]
+
+    ## --filters "env=prod,dev%team=core" -> [['env', {'prod', 'dev'}], ['team', {'core'}]]
+    ## every key has to be present (AND), with any of its values (OR)
+    @staticmethod
+    def compileFilters(text):
+        filters = []
+        if not text:
+            return filters
+
+        for tag in text.split(TagIndex.TAGS_SEPARATOR):
+            if TagIndex.KEYVALUE_SEPARATOR not in tag:
+                continue
+
+            key, values = tag.split(TagIndex.KEYVALUE_SEPARATOR, 1)
+            filters.append([key.strip(), set(v.strip() for v in values.split(TagIndex.VALUES_SEPARATOR))])
+
+        return filters
+
+    @staticmethod
+    def tagsMatch(tags, filters):
+        for key, values in filters:
+            if tags.get(key) not in values:
+                return False
+
+        return True
+
+if __name__ == "__main__":
+    Config.init()
+    filters = TagIndex.compileFilters('env=prod,dev%team=core')
+    print(filters)
+    o = TagIndex.forRegion('ap-southeast-1')
+    print(o.filterArns(filters))
@@ -0,0 +1,48 @@
+import re
+
+## Text with {$NAME} placeholders, split once into literal / placeholder segments so rendering
+## is a join instead of a scan (or an eval). Unknown placeholders are left as they are.
+class Template:
+    PLACEHOLDER = re.compile(r'\{\$([A-Z_]+)\}')
+    ## {NAME} without the $, never rendered, see CheckCatalog
+    BARE_PLACEHOLDER = re.compile(r'\{([A-Z_]+)\}')
+
+    ## compiled templates by source text, shared by every caller in the process
+    compiled = {}
+
+    def __init__(self, text):
+        self.text = text
+        ## even indexes are literals, odd indexes are placeholder names
+        self.segments = self.PLACEHOLDER.split(text)
+        self.placeholders = set(self.segments[1::2])
+        self.barePlaceholders = set(self.BARE_PLACEHOLDER.findall(text))
+
+    @staticmethod
+    def compile(text):
+        tpl = Template.compiled.get(text)
+        if tpl is None:
+            tpl = Template.compiled[text] = Template(text)
+
+        return tpl
+
+    def render(self, values):
+        segments = self.segments
+        if len(segments) == 1:
+            return self.text
+
+        output = list(segments)
+        for i in range(1, len(segments), 2):
+            name = segments[i]
+            output[i] = str(values[name]) if name in values else '{$' + name + '}'
+
+        return ''.join(output)
+
+    ## [[template, values], ...] -> [str, ...]
+    @staticmethod
+    def renderAll(pairs):
+        return [tpl.render(values) for tpl, values in pairs]
+
+if __name__ == "__main__":
+    tpl = Template.compile("You have {$COUNT} tables in {$REGIONCOUNT} regions, {$UNKNOWN} stays")
+    print(tpl.segments)
+    print(tpl.render({'COUNT': 3, 'REGIONCOUNT': 2}))